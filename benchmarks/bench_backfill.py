@@ -0,0 +1,78 @@
+"""
+Benchmark: backfill throughput and scaling with worker processes.
+
+A synthetic archive is written once (split into files and row groups like a
+folder of archived runs), then backfilled from scratch with each worker
+count. Reports rows/sec for both passes (IDF counting and scoring), the
+speedup over one worker and the largest worker's peak RSS, which should stay
+flat as the archive grows.
+
+Usage:
+    python benchmarks/bench_backfill.py [--rows 2000000] [--workers 1 2 4 8] [--task-rows 200000]
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from synthetic import make_corpus  # noqa: E402
+from backfill import backfill  # noqa: E402
+
+
+def write_archive(directory, rows, files, row_group_size):
+    """Synthetic archive of ``rows`` tweets in ``files`` Parquet files, generated file by file."""
+    os.makedirs(directory, exist_ok=True)
+    per_file = -(-rows // files)
+    for i in range(files):
+        n = min(per_file, rows - i * per_file)
+        if n <= 0:
+            break
+        table = pa.Table.from_pandas(make_corpus(n, seed=i), preserve_index=False)
+        pq.write_table(table, os.path.join(directory, f"run-{i:04d}.parquet"), row_group_size=row_group_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--row-group-size", type=int, default=50_000)
+    parser.add_argument("--task-rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_backfill_")
+    try:
+        archive = os.path.join(work, "archive")
+        write_archive(archive, args.rows, args.files, args.row_group_size)
+        print(f"{os.cpu_count()} CPUs, {args.rows:,} rows in {args.files} files\n")
+        print(f"{'workers':>7} {'seconds':>9} {'rows/sec':>12} {'speedup':>8} {'worker peak RSS MB':>19}")
+
+        baseline = None
+        for workers in args.workers:
+            output = os.path.join(work, f"out-{workers}")
+            start = time.perf_counter()
+            result = backfill(archive, output, workers=workers, task_rows=args.task_rows)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            # Largest peak of any worker process so far (ru_maxrss is in KiB on Linux)
+            rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            print(f"{workers:>7} {elapsed:>9.2f} {result['rows_in'] / elapsed:>12,.0f} "
+                  f"{baseline / elapsed:>7.2f}x {rss_mb:>19.0f}")
+            shutil.rmtree(output)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
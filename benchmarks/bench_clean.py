@@ -0,0 +1,104 @@
+"""
+Benchmark: original pandas clean() vs the Arrow cleaning engine.
+
+Each (engine, size) pair runs in a fresh subprocess so peak RSS is measured
+in isolation. Outputs of both engines are compared by a hash of the cleaned
+frame, and once more value by value on object-dtype input with missing
+content (which the hash does not tell apart from NaN).
+
+Usage:
+    python benchmarks/bench_clean.py [--sizes 100000 1000000 10000000]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+
+def legacy_clean(df):
+    """The pandas implementation clean() had before the Arrow engine."""
+    import pandas as pd
+
+    df['content'] = df['content'].str.replace(r"http\S+", "", regex=True)
+    df['content'] = df['content'].str.replace(r"[^a-zA-Z0-9@#\s]", " ", regex=True)
+    df['content'] = df['content'].str.lower()
+    df.drop_duplicates(subset=["content", "timestamp"], inplace=True)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors="coerce")
+    return df
+
+
+def object_dtype_matches(rows=10_000):
+    """True if both engines return the same values and dtypes for object-dtype content with None."""
+    from synthetic import make_corpus
+    from processing.cleaner import clean
+
+    df = make_corpus(rows)
+    df["content"] = df["content"].astype(object)
+    df.loc[df.index[::97], "content"] = None
+    expected, out = legacy_clean(df.copy()), clean(df.copy())
+    return (out["content"].dtype == expected["content"].dtype
+            and out["content"].tolist() == expected["content"].tolist()
+            and out["timestamp"].equals(expected["timestamp"]))
+
+
+def run_child(engine, rows):
+    import pandas as pd
+    from synthetic import make_corpus
+    from processing.cleaner import clean
+
+    df = make_corpus(rows)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fn = legacy_clean if engine == "pandas" else clean
+
+    start = time.perf_counter()
+    out = fn(df)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "engine": engine,
+        "rows": rows,
+        "rows_out": len(out),
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "corpus_rss_mb": rss_before / 1024,
+        "checksum": int(pd.util.hash_pandas_object(out[["content", "timestamp"]]).sum()),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--child", nargs=2, metavar=("ENGINE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args.child[0], int(args.child[1]))
+
+    print(f"{'engine':<7} {'rows':>10} {'rows/sec':>12} {'peak RSS MB':>12} {'corpus MB':>10}")
+    status = 0
+    for rows in args.sizes:
+        results = {}
+        for engine in ("pandas", "arrow"):
+            out = subprocess.run([sys.executable, __file__, "--child", engine, str(rows)],
+                                 capture_output=True, text=True, check=True)
+            r = results[engine] = json.loads(out.stdout)
+            print(f"{engine:<7} {rows:>10} {r['rows_per_sec']:>12,.0f} {r['peak_rss_mb']:>12.0f} {r['corpus_rss_mb']:>10.0f}")
+        if results["pandas"]["checksum"] != results["arrow"]["checksum"]:
+            print(f"⚠️ outputs differ at {rows} rows")
+            status = 1
+    if not object_dtype_matches():
+        print("⚠️ outputs differ on object-dtype content with missing values")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
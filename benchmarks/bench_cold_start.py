@@ -0,0 +1,129 @@
+"""
+Cold-start cost of the pipeline's entry points, each in a fresh interpreter.
+
+Short-lived batch workers pay interpreter start and imports on every run,
+so this times, as the median of --repeats fresh processes:
+
+  python            an empty interpreter (the floor)
+  import main       main.py's module-level imports, now that the scraper
+                    and plotting layers are loaded only when used
+  eager imports     what importing main.py used to load: Selenium,
+                    webdriver_manager, matplotlib and scikit-learn
+  process           `main.py process` end to end on a --rows tweet Parquet
+                    file; "startup" is its wall time outside the run's stages
+
+It also checks that `main.py process` never loads Selenium, webdriver_manager
+or matplotlib (reported as heavy_modules, and the exit code is non-zero if
+any appear).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--repeats 5] [--rows 1000] [--output cold_start.json]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# Modules the process-only path must not import
+HEAVY_MODULES = ("selenium", "webdriver_manager", "matplotlib")
+EAGER_IMPORTS = ("main, scraper.twitter_scraper, scraper.pool, scraper.driver_setup, webdriver_manager.chrome, "
+                 "analysis.visualization, sklearn.feature_extraction.text")
+# Runs main.py process in-process, then prints the heavy modules it loaded
+LEAK_CHECK = f"""
+import json, runpy, sys
+sys.argv = ["main.py", "process"] + sys.argv[1:]
+try:
+    runpy.run_path({str(SRC / "main.py")!r}, run_name="__main__")
+except SystemExit as e:
+    if e.code:
+        raise
+print(json.dumps(sorted(m for m in sys.modules if m.split(".")[0] in {HEAVY_MODULES!r})))
+"""
+
+
+def _env():
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")]))}
+
+
+def timed(args, cwd, repeats):
+    """Median wall seconds of ``repeats`` runs of ``python *args``, and the last run's stdout."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, *args], cwd=cwd, env=_env(), capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if out.returncode != 0:
+            raise RuntimeError((out.stderr.strip() or f"exit code {out.returncode}").splitlines()[-1])
+    return statistics.median(times), out.stdout
+
+
+def stage_seconds(workdir):
+    """Wall seconds spent inside the stages of the newest run metrics report."""
+    reports = sorted(glob.glob(os.path.join(workdir, "data", "metrics", "run_*.json")), key=os.path.getmtime)
+    with open(reports[-1]) as f:
+        return sum(s["wall_seconds"] for s in json.load(f)["stages"])
+
+
+def measure(repeats=5, rows=1000):
+    """
+    Time every entry point; returns one dict per command (name, seconds, and extras).
+    """
+    from synthetic import make_corpus
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "tweets.parquet")
+        make_corpus(rows).to_parquet(source)
+
+        for name, args in (("python", ["-c", "pass"]),
+                           ("import main", ["-c", "import main"]),
+                           ("eager imports", ["-c", f"import {EAGER_IMPORTS}"])):
+            results.append({"command": name, "seconds": timed(args, workdir, repeats)[0]})
+
+        seconds, _ = timed([str(SRC / "main.py"), "process", source, "--output", "signals"], workdir, repeats)
+        startup = seconds - stage_seconds(workdir)
+        _, stdout = timed(["-c", LEAK_CHECK, source, "--output", "signals"], workdir, 1)
+        heavy = json.loads(stdout.strip().splitlines()[-1])
+        results.append({"command": "process", "rows": rows, "seconds": seconds, "startup_seconds": startup,
+                        "heavy_modules": heavy})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = measure(args.repeats, args.rows)
+    print(f"{'command':<15} {'seconds':>8}")
+    for r in results:
+        extra = ""
+        if "startup_seconds" in r:
+            extra = f"  ({r['startup_seconds']:.2f} s startup, {r['rows']:,} rows)"
+        print(f"{r['command']:<15} {r['seconds']:>8.2f}{extra}")
+
+    heavy = next(r["heavy_modules"] for r in results if r["command"] == "process")
+    if heavy:
+        print(f"\n❌ main.py process loaded {', '.join(heavy)}")
+    else:
+        print(f"\n✅ main.py process loaded none of {', '.join(HEAVY_MODULES)}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 1 if heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
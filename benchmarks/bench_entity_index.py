@@ -0,0 +1,134 @@
+"""
+Benchmark: EntityIndex ingest rate, query latency and size on disk.
+
+Synthetic tweets over 30 days draw hashtags, mentions and authors from
+Zipf-distributed pools (a few hot tags, a long tail), are ingested in
+scrape-sized batches, and then sliced the way dashboards ask:
+one tag's last hour, two entities co-mentioned in the last hour, and the
+top co-occurring hashtags of one tag today. Each query is also answered by
+a full scan of the same columns for comparison.
+
+Usage:
+    python benchmarks/bench_entity_index.py [--tweets 1000000 5000000] [--batch 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.compute as pc  # noqa: E402
+
+from analysis.entity_index import EntityIndex  # noqa: E402
+
+DAYS = 30
+START = 1_764_720_000  # 2025-12-03 00:00 UTC
+
+
+def zipf_pick(rng, pool, size, a=1.3):
+    """String array of ``size`` Zipf-distributed picks from ``pool``."""
+    indices = np.minimum(rng.zipf(a, size) - 1, len(pool) - 1)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(pool)).cast(pa.string())
+
+
+def make_entities(rows, seed=0):
+    """Arrow table of hashtags (1-4), mentions (0-2), username, timestamp and tweet_id."""
+    rng = np.random.default_rng(seed)
+    tags = ["#banknifty", "#nifty", "#optionselling", "#sensex", "#nifty50", "#intraday"] + [f"#tag{i}" for i in range(2_000)]
+    users = ["@someanalyst", "@nseindia"] + [f"@user{i}" for i in range(20_000)]
+    authors = [f"author{i}" for i in range(50_000)]
+
+    def lists(pool, low, high):
+        counts = rng.integers(low, high + 1, rows)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+        return pa.ListArray.from_arrays(pa.array(offsets), zipf_pick(rng, pool, int(counts.sum())))
+
+    ts = np.sort(START + rng.integers(0, DAYS * 86_400, rows))
+    return pa.table({
+        "hashtags": lists(tags, 1, 4),
+        "mentions": lists(users, 0, 2),
+        "username": zipf_pick(rng, authors, rows),
+        "timestamp": pa.array(ts.astype("datetime64[s]")).cast(pa.timestamp("us", tz="UTC")),
+        "tweet_id": pa.array(np.arange(rows).astype(str)),
+    })
+
+
+def timed(fn, repeat=5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def scan_rows(table, column, entity):
+    """Baseline without an index: rows whose list column contains ``entity``."""
+    values = table[column].combine_chunks()
+    hits = np.asarray(pc.equal(pc.list_flatten(values), entity))
+    return np.unique(np.asarray(pc.list_parent_indices(values))[hits])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tweets", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--batch", type=int, default=5_000, help="tweets per add_batch call")
+    args = parser.parse_args()
+
+    for rows in args.tweets:
+        table = make_entities(rows)
+        ts = pc.cast(table["timestamp"], pa.int64()).to_numpy() // 1_000_000
+        now = START + DAYS * 86_400
+        hour, today = now - 3_600, now - 86_400
+
+        index = EntityIndex()
+        start = time.perf_counter()
+        for offset in range(0, rows, args.batch):
+            index.add_batch(table.slice(offset, args.batch))
+        ingest = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            index.save(tmp)
+            save_s = time.perf_counter() - start
+            size_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 2**20
+            # A later run only writes its own tweets
+            index.add_batch(table.slice(0, args.batch))
+            start = time.perf_counter()
+            index.save(tmp)
+            append_s = time.perf_counter() - start
+            start = time.perf_counter()
+            EntityIndex.load(tmp)
+            load_s = time.perf_counter() - start
+
+        print(f"\n{rows:,} tweets, {len(index.entities):,} entities: ingest {rows / ingest:,.0f} tweets/sec, "
+              f"{size_mb:.0f} MB on disk (full save {save_s:.1f} s, save of {args.batch:,} more {append_s * 1000:.0f} ms, "
+              f"load {load_s:.1f} s)")
+        print(f"{'query':<44} {'index ms':>9} {'scan ms':>9} {'tweets':>8}")
+
+        queries = [
+            ("#banknifty, last hour",
+             lambda: index.rows("#banknifty", start=hour),
+             lambda: (lambda r: r[ts[r] >= hour])(scan_rows(table, "hashtags", "#banknifty"))),
+            ("#banknifty AND @someanalyst, last hour",
+             lambda: index.query("#banknifty", "@someanalyst", start=hour),
+             lambda: (lambda r: r[ts[r] >= hour])(np.intersect1d(scan_rows(table, "hashtags", "#banknifty"),
+                                                                  scan_rows(table, "mentions", "@someanalyst")))),
+            ("top hashtags with #optionselling, today",
+             lambda: index.co_occurring("#optionselling", start=today, kind="hashtag"),
+             None),
+        ]
+        for label, indexed, scan in queries:
+            index_ms, result = timed(indexed)
+            scan_ms = timed(scan, repeat=1)[0] if scan else float("nan")
+            print(f"{label:<44} {index_ms:>9.3f} {scan_ms:>9.0f} {len(result):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: per-element ("dom") vs single-round-trip ("bulk") tweet extraction.
+
+Loads the saved search timeline in benchmarks/fixtures/search_timeline.html
+into a headless Chrome and times one full extraction pass with each mode.
+
+Usage:
+    python benchmarks/bench_extraction.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from scraper.driver_setup import get_driver, CommandCounter  # noqa: E402
+from scraper.dedup import DedupIndex  # noqa: E402
+from scraper.twitter_scraper import TweetScraper  # noqa: E402
+
+FIXTURE = ROOT / "benchmarks" / "fixtures" / "search_timeline.html"
+
+
+def bench_mode(scraper, counter, mode, repeat):
+    scrape = scraper.scrape_visible_bulk if mode == "bulk" else scraper.scrape_visible_dom
+
+    counter.reset()
+    elapsed = 0.0
+    tweets = []
+    for _ in range(repeat):
+        # Fresh index so every repeat extracts the full page again
+        scraper.dedup = DedupIndex()
+        start = time.perf_counter()
+        tweets = scrape("#nifty")
+        elapsed += time.perf_counter() - start
+
+    total = len(tweets) * repeat
+    return {
+        "mode": mode,
+        "tweets": len(tweets),
+        "tweets_per_sec": total / elapsed if elapsed else 0.0,
+        "commands_per_tweet": counter.total / total if total else 0.0,
+        "tweets_data": tweets,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scraper = TweetScraper(driver=get_driver(headless=True))
+    try:
+        scraper.driver.get(FIXTURE.as_uri())
+        counter = CommandCounter(scraper.driver)
+
+        results = [bench_mode(scraper, counter, mode, args.repeat) for mode in ("dom", "bulk")]
+
+        print(f"{'mode':<6} {'tweets':>7} {'tweets/sec':>12} {'cmds/tweet':>11}")
+        for r in results:
+            print(f"{r['mode']:<6} {r['tweets']:>7} {r['tweets_per_sec']:>12.1f} {r['commands_per_tweet']:>11.2f}")
+
+        if results[0]["tweets_data"].to_pylist() != results[1]["tweets_data"].to_pylist():
+            print("⚠️ dom and bulk extraction returned different records")
+            return 1
+        return 0
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    sys.exit(main())
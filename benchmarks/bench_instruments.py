@@ -0,0 +1,90 @@
+"""
+Benchmark: instrument/strike extraction with one RE2 automaton vs a per-tweet Python loop.
+
+Both run on the same cleaned synthetic corpus, on one core:
+
+  python   Python ``re`` per tweet: the alias alternation and the strike
+           pattern of processing/instruments.py, one tweet at a time
+  arrow    InstrumentMatcher: the same patterns compiled once by RE2 and run
+           over whole Arrow arrays (extract_instruments)
+
+Outputs are compared row by row. Throughput is reported in tweets per minute;
+the target is millions per minute on one core.
+
+Usage:
+    python benchmarks/bench_instruments.py [--sizes 100000 1000000]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from synthetic import make_corpus  # noqa: E402
+from processing.cleaner import clean  # noqa: E402
+from processing.instruments import InstrumentMatcher, OPTION_TYPES, _STRIKE_PATTERN, extract_instruments  # noqa: E402
+
+
+def python_extract(texts, matcher):
+    """Per-tweet equivalent of InstrumentMatcher.extract with Python's re."""
+    lookup = dict(zip(matcher.aliases.to_pylist(), matcher.instruments.to_pylist()))
+    # Python's $ also matches before a trailing newline; RE2's only at the very end
+    alias_re = re.compile(matcher.pattern.replace("|$)", r"|\Z)"))
+    strike_re = re.compile(_STRIKE_PATTERN.replace("|$)", r"|\Z)"))
+    instruments, strikes, options = [], [], []
+    for text in texts:
+        m = alias_re.search(text)
+        instruments.append(lookup[" ".join(m.group("alias").split())] if m else None)
+        m = strike_re.search(text)
+        if m:
+            strike = float(m.group("strike").replace(" ", ""))
+            strikes.append(strike * 1000 if m.group("k") else strike)
+            options.append(OPTION_TYPES[m.group("option")])
+        else:
+            strikes.append(np.nan)
+            options.append(None)
+    return instruments, np.array(strikes), options
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    matcher = InstrumentMatcher()
+    print(f"{len(matcher.aliases)} aliases of {len(set(matcher.instruments.to_pylist()))} instruments\n")
+    print(f"{'engine':<7} {'tweets':>10} {'seconds':>8} {'tweets/min':>14} {'matched':>9}")
+    status = 0
+    for rows in args.sizes:
+        df = clean(make_corpus(rows))
+
+        start = time.perf_counter()
+        instruments, strikes, options = python_extract(df["content"].tolist(), matcher)
+        py_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        out = extract_instruments(df, matcher)
+        arrow_seconds = time.perf_counter() - start
+
+        matched = out["instrument"].notna().mean()
+        for engine, seconds in (("python", py_seconds), ("arrow", arrow_seconds)):
+            print(f"{engine:<7} {len(df):>10,} {seconds:>8.2f} {len(df) / seconds * 60:>14,.0f} {matched:>9.0%}")
+
+        # pandas string columns hold NaN where the Python loop has None
+        same = ([x if isinstance(x, str) else None for x in out["instrument"]] == instruments
+                and [x if isinstance(x, str) else None for x in out["option_type"]] == options
+                and np.array_equal(out["strike"].to_numpy(), strikes, equal_nan=True))
+        if not same:
+            print(f"⚠️ outputs differ at {rows} rows")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
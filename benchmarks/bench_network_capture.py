@@ -0,0 +1,85 @@
+"""
+Benchmark: DOM extraction vs network timeline capture against the stand-in server.
+
+Starts benchmarks/fake_x_server.py in-process, scrapes the recorded search
+timeline end to end with each extraction mode. It checks that the
+timeline parser covers every recorded tweet entry, and that the network mode
+returns every recorded tweet that survives deduplication, with its id and
+timestamp.
+
+Usage:
+    python benchmarks/bench_network_capture.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_x_server import FakeXServer  # noqa: E402
+from scraper.dedup import DedupIndex  # noqa: E402
+from scraper.driver_setup import get_driver, CommandCounter  # noqa: E402
+from scraper.network_capture import parse_timeline_response  # noqa: E402
+from scraper.twitter_scraper import TweetScraper  # noqa: E402
+
+
+def run_mode(server, mode):
+    driver = get_driver(headless=True, capture_network=(mode == "network"))
+    scraper = TweetScraper(extraction=mode, driver=driver, base_url=server.base_url)
+    try:
+        counter = CommandCounter(driver)
+        start = time.perf_counter()
+        tweets = scraper.search_and_scrape("#nifty")
+        elapsed = time.perf_counter() - start
+        return {
+            "mode": mode,
+            "tweets": len(tweets),
+            "seconds": elapsed,
+            "commands_per_tweet": counter.total / len(tweets) if tweets else 0.0,
+            "tweets_data": tweets,
+        }
+    finally:
+        scraper.close()
+
+
+def expected_tweets(server):
+    """Recorded tweets left after the scraper's duplicate filter."""
+    dedup = DedupIndex()
+    return sum(
+        1
+        for payload in server.recorded_responses()
+        for raw in parse_timeline_response(payload)
+        if len(raw["content"]) >= 5 and not dedup.check_and_add(raw["content"])
+    )
+
+
+def main():
+    with FakeXServer() as server:
+        recorded = server.recorded_tweet_count()
+        parsed = sum(len(parse_timeline_response(payload)) for payload in server.recorded_responses())
+        if parsed != recorded:
+            print(f"⚠️ timeline parser found {parsed} of {recorded} recorded tweet entries")
+            return 1
+        expected = expected_tweets(server)
+        results = [run_mode(server, mode) for mode in ("dom", "bulk", "network")]
+
+    print(f"{'mode':<8} {'tweets':>7} {'seconds':>8} {'cmds/tweet':>11}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['tweets']:>7} {r['seconds']:>8.2f} {r['commands_per_tweet']:>11.2f}")
+
+    network = results[-1]["tweets_data"]
+    if len(network) != expected:
+        print(f"⚠️ network capture returned {len(network)}/{expected} recorded tweets")
+        return 1
+    if any(t["tweet_id"] is None or t["timestamp"] is None for t in network):
+        print("⚠️ network capture returned tweets without id or timestamp")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    sys.exit(main())
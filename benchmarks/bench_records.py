@@ -0,0 +1,119 @@
+"""
+Benchmark: per-tweet memory of the scraper's record buffer and the cost of
+handing it to pandas.
+
+The same synthetic tweets are collected twice, the way the scraper used to
+(one dict per tweet with hashtag/mention lists, then pd.DataFrame(list))
+and into TweetColumns (columnar builders sealed once per scroll, then
+to_pandas). Strings are created fresh per tweet, as the WebDriver returns
+them. Python heap is traced with tracemalloc and Arrow buffers with
+pyarrow's allocator, so both layouts are measured in full.
+
+Usage:
+    python benchmarks/bench_records.py [--tweets 100000] [--per-scroll 20]
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+
+from synthetic import make_corpus  # noqa: E402
+from scraper.records import TweetColumns, HASHTAG_RE, MENTION_RE  # noqa: E402
+
+
+def raw_tweets(rows):
+    """(hashtag, username, timestamp, tweet_id, content, engagement) tuples as plain columns."""
+    df = make_corpus(rows)
+    return {name: df[name].to_numpy().tolist() for name in
+            ("searched_tag", "username", "timestamp", "tweet_id", "content", "likes", "retweets", "views")}
+
+
+def fresh(s):
+    # A new str object per tweet, like each WebDriver response
+    return (s + " ")[:-1]
+
+
+def build_dicts(cols, per_scroll):
+    tweets_data = []
+    for start in range(0, len(cols["content"]), per_scroll):
+        batch = []
+        for i in range(start, min(start + per_scroll, len(cols["content"]))):
+            content = fresh(cols["content"][i])
+            hashtags = list(set(HASHTAG_RE.findall(content)))
+            mentions = list(set(MENTION_RE.findall(content)))
+            batch.append({
+                "username": fresh(cols["username"][i]), "timestamp": fresh(cols["timestamp"][i]),
+                "tweet_id": fresh(cols["tweet_id"][i]), "content": content,
+                "searched_tag": fresh(cols["searched_tag"][i]), "hashtags": hashtags, "mentions": mentions,
+                "num_hashtags": len(hashtags), "num_mentions": len(mentions), "replies": 0,
+                "retweets": cols["retweets"][i], "likes": cols["likes"][i], "views": cols["views"][i], "bookmarks": 0,
+            })
+        tweets_data.extend(batch)
+    return tweets_data
+
+
+def build_columns(cols, per_scroll):
+    tweets_data = TweetColumns()
+    for start in range(0, len(cols["content"]), per_scroll):
+        batch = TweetColumns()
+        for i in range(start, min(start + per_scroll, len(cols["content"]))):
+            batch.append(fresh(cols["searched_tag"][i]), fresh(cols["username"][i]), fresh(cols["timestamp"][i]),
+                         fresh(cols["tweet_id"][i]), fresh(cols["content"][i]),
+                         {"retweets": cols["retweets"][i], "likes": cols["likes"][i], "views": cols["views"][i]})
+        tweets_data.extend(batch.seal())
+    return tweets_data
+
+
+def measure(build, to_frame, cols, per_scroll):
+    gc.collect()
+    start = time.perf_counter()
+    build(cols, per_scroll)
+    collect_seconds = time.perf_counter() - start
+
+    # Second pass under tracemalloc, which slows allocation-heavy code down
+    gc.collect()
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    records = build(cols, per_scroll)
+    held = tracemalloc.get_traced_memory()[0] + pa.total_allocated_bytes() - arrow_before
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    df = to_frame(records)
+    convert_seconds = time.perf_counter() - start
+    # Peak Python heap during conversion; Arrow output buffers are counted once the frame exists
+    spike = tracemalloc.get_traced_memory()[1] + pa.total_allocated_bytes() - arrow_before - held
+    tracemalloc.stop()
+
+    rows = len(df)
+    del records, df
+    return {"collect_s": collect_seconds, "held_bytes_per_tweet": held / rows,
+            "convert_s": convert_seconds, "convert_spike_mb": max(spike, 0) / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tweets", type=int, default=100_000)
+    parser.add_argument("--per-scroll", type=int, default=20)
+    args = parser.parse_args()
+
+    cols = raw_tweets(args.tweets)
+    print(f"{'layout':<14} {'collect s':>10} {'bytes/tweet':>12} {'to pandas s':>12} {'spike MB':>9}")
+    for label, build, to_frame in (("dicts", build_dicts, pd.DataFrame),
+                                   ("TweetColumns", build_columns, TweetColumns.to_pandas)):
+        r = measure(build, to_frame, cols, args.per_scroll)
+        print(f"{label:<14} {r['collect_s']:>10.2f} {r['held_bytes_per_tweet']:>12.0f} "
+              f"{r['convert_s']:>12.2f} {r['convert_spike_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
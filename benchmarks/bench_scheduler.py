@@ -0,0 +1,184 @@
+"""
+Fixed hashtag rotation vs HashtagScheduler against a rate-limited fake timeline.
+
+fake_x_server serves a live timeline per hashtag (a few busy tags gaining
+tweets every second, several dead ones) and answers timeline requests over
+its budget with 429. Each policy polls it for the same wall-clock time
+through a browserless client that pages the SearchTimeline endpoint the
+way the search page does:
+
+  fixed      the old loop: every hashtag in turn, up to SCROLL_LIMIT pages,
+             a fixed pause between hashtags and a longer one after an error
+  scheduler  due hashtags busiest first, yield-based scroll limits and poll
+             intervals, a token bucket sized to the server's budget and
+             exponential backoff on 429
+
+Times are compressed (pauses and intervals in seconds instead of minutes),
+so a run takes --seconds per policy.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--seconds 60] [--rate-limit 20/10]
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from fake_x_server import FakeXServer, TIMELINE_PATH  # noqa: E402
+from scraper.network_capture import parse_timeline_response  # noqa: E402
+from scraper.scheduler import HashtagScheduler, RateLimitError, TokenBucket  # noqa: E402
+from scraper.twitter_scraper import HASHTAGS, SCROLL_LIMIT  # noqa: E402
+
+# New tweets per second on the busy hashtags; every other one is dead
+LIVE_RATES = {"#nifty": 30.0, "#banknifty": 15.0, "#sensex": 5.0, "#intraday": 1.0}
+BACKLOG = 100
+DEAD_BACKLOG = 3
+# The old loop's 10 s / 15 s pauses, compressed 10x like everything else
+FIXED_PAUSE = 1.0
+FIXED_ERROR_PAUSE = 1.5
+
+
+class TimelineClient:
+    """Pages a hashtag's SearchTimeline like the search page, without a browser."""
+
+    def __init__(self, base_url, deadline, throttle=None):
+        self.base_url = base_url
+        self.deadline = deadline
+        self.throttle = throttle
+        self.requests = Counter()
+        self.rate_limited = 0
+
+    def page(self, tag, cursor):
+        if self.throttle:
+            self.throttle(tag)
+        self.requests[tag] += 1
+        url = f"{self.base_url}{TIMELINE_PATH}?q={quote(tag + ' since:2025-12-01')}&cursor={quote(cursor)}"
+        try:
+            with urlopen(url) as resp:
+                payload = json.load(resp)
+        except HTTPError as e:
+            if e.code == 429:
+                self.rate_limited += 1
+                raise RateLimitError(f"429 on {tag}")
+            return [], ""
+        entries = payload["data"]["search_by_raw_query"]["search_timeline"]["timeline"]["instructions"][0]["entries"]
+        cursor = next((e["content"]["value"] for e in entries if e["content"].get("cursorType") == "Bottom"), "")
+        return parse_timeline_response(payload), cursor
+
+    def poll(self, tag, since_id, scroll_limit=SCROLL_LIMIT):
+        """
+        Tweets newer than ``since_id``; stops at known tweets, the end, 4 empty pages or the deadline.
+
+        Returns:
+            (list, RateLimitError or None): tweets of the pages read before
+                any rate limit (the scraper has persisted those by then), and the error
+        """
+        tweets, cursor, empty = [], "", 0
+        for _ in range(scroll_limit):
+            if time.monotonic() >= self.deadline:
+                break
+            try:
+                records, cursor = self.page(tag, cursor)
+            except RateLimitError as e:
+                return tweets, e
+            new = [r for r in records if since_id is None or int(r["tweet_id"]) > since_id]
+            tweets += new
+            empty = 0 if new else empty + 1
+            if len(new) < len(records) or not cursor or empty >= 4:
+                break
+        return tweets, None
+
+
+def run_fixed(client):
+    marks, collected = {}, Counter()
+    while time.monotonic() < client.deadline:
+        for tag in HASHTAGS:
+            if time.monotonic() >= client.deadline:
+                break
+            tweets, error = client.poll(tag, marks.get(tag))
+            collected[tag] += len(tweets)
+            if tweets:
+                marks[tag] = max(int(t["tweet_id"]) for t in tweets)
+            time.sleep(FIXED_ERROR_PAUSE if error else FIXED_PAUSE)
+    return collected
+
+
+def run_scheduler(client, scheduler):
+    marks, collected = {}, Counter()
+    while time.monotonic() < client.deadline:
+        due = scheduler.due()
+        if not due:
+            time.sleep(0.05)
+            continue
+        tag = due[0]
+        tweets, error = client.poll(tag, marks.get(tag), scheduler.scroll_limit(tag))
+        collected[tag] += len(tweets)
+        if tweets:
+            marks[tag] = max(int(t["tweet_id"]) for t in tweets)
+        if error:
+            scheduler.record_error(tag, error)
+        else:
+            scheduler.record(tag, len(tweets))
+    return collected
+
+
+def report(name, client, collected, available):
+    requests = sum(client.requests.values())
+    tweets = sum(collected.values())
+    live = sum(n for tag, n in client.requests.items() if tag in LIVE_RATES)
+    print(f"{name:<10} {tweets:>6,} of {available:,} tweets ({tweets / available:>4.0%})  {requests:>4} requests  "
+          f"{tweets / max(requests, 1):>5.1f} tweets/request  {client.rate_limited:>3} x 429  "
+          f"{live / max(requests, 1):>4.0%} of requests on busy tags")
+    return {"tweets": tweets, "available": available, "requests": requests, "rate_limited": client.rate_limited,
+            "busy_request_share": live / max(requests, 1), "per_tag": dict(collected)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--rate-limit", default="20/10", metavar="REQUESTS/SECONDS",
+                        help="timeline request budget of the fake server")
+    parser.add_argument("--verbose", action="store_true", help="print the scheduler's decisions")
+    args = parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="  %(message)s")
+
+    limit, window = (float(x) for x in args.rate_limit.split("/"))
+    backlog = {tag: BACKLOG if tag in LIVE_RATES else DEAD_BACKLOG for tag in HASHTAGS}
+    print(f"{len(HASHTAGS)} hashtags ({len(LIVE_RATES)} busy), server budget {limit:.0f} requests / {window:.0f} s, "
+          f"{args.seconds:.0f} s per policy\n")
+
+    results = {}
+    for name in ("fixed", "scheduler"):
+        with FakeXServer(hashtag_tweets=backlog, hashtag_rates=LIVE_RATES, rate_limit=(limit, window)) as server:
+            deadline = server.started + args.seconds
+            if name == "fixed":
+                client = TimelineClient(server.base_url, deadline)
+                collected = run_fixed(client)
+            else:
+                # Sized so burst + refill stays within any window of the server's budget;
+                # intervals and backoff compressed like the pauses
+                scheduler = HashtagScheduler(HASHTAGS, path=None, bucket=TokenBucket(0.75 * limit / window, limit / 4),
+                                             scroll_limit=SCROLL_LIMIT, intervals=(1, 360), backoff=(window / 4, window))
+                client = TimelineClient(server.base_url, deadline, throttle=scheduler.throttle)
+                collected = run_scheduler(client, scheduler)
+            available = sum(backlog.values()) + int(sum(LIVE_RATES.values()) * args.seconds)
+            results[name] = report(name, client, collected, available)
+
+    gain = results["scheduler"]["tweets"] / max(results["fixed"]["tweets"], 1)
+    print(f"\nScheduler collected {gain:.1f}x the tweets with "
+          f"{results['scheduler']['rate_limited']} rate-limited requests vs {results['fixed']['rate_limited']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Exercise the adaptive scroll waits against the local infinite-scroll fixture.
+
+Opens benchmarks/fixtures/infinite_scroll.html in a headless Chrome, scrolls
+it to exhaustion with TimelineWaiter and reports per-scroll wait times next to
+the fixed 2 s sleep the scrape loop used before.
+
+Usage:
+    python benchmarks/bench_scroll_waits.py [--pages 5] [--per-page 20] [--delay 400]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from scraper.driver_setup import get_driver  # noqa: E402
+from scraper.twitter_scraper import TweetScraper  # noqa: E402
+
+FIXTURE = ROOT / "benchmarks" / "fixtures" / "infinite_scroll.html"
+FIXED_SLEEP = 2.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--delay", type=int, default=400)
+    parser.add_argument("--jitter", type=int, default=300)
+    parser.add_argument("--max-scrolls", type=int, default=50)
+    args = parser.parse_args()
+
+    scraper = TweetScraper(driver=get_driver(headless=True))
+    try:
+        query = f"?pages={args.pages}&per_page={args.per_page}&delay={args.delay}&jitter={args.jitter}"
+        scraper.driver.get(FIXTURE.as_uri() + query)
+        if not scraper.wait_for_tweets():
+            print("❌ Fixture did not render any tweets")
+            return 1
+        scraper.waiter.install()
+
+        collected = scraper.scrape_visible_bulk("#nifty")
+        waits = []
+        start = time.perf_counter()
+        for i in range(args.max_scrolls):
+            result = scraper.scroll_page(f"[fixture] {i + 1}")
+            waits.append(result["waited_ms"])
+            collected.extend(scraper.scrape_visible_bulk("#nifty"))
+            print(f"scroll {i + 1:>2}: {result['waited_ms']:>6.0f} ms  {result['reason']:<9} "
+                  f"+{result['new_cells']} cells  total {len(collected)}")
+            if scraper.waiter.exhausted():
+                break
+        elapsed = time.perf_counter() - start
+
+        expected = args.pages * args.per_page
+        print(f"\nCollected {len(collected)}/{expected} tweets in {len(waits)} scrolls, {elapsed:.1f} s")
+        print(f"Mean wait {sum(waits) / len(waits):.0f} ms, max {max(waits):.0f} ms "
+              f"(fixed sleeps would have taken {len(waits) * FIXED_SLEEP:.1f} s)")
+        return 0 if len(collected) == expected else 1
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    sys.exit(main())
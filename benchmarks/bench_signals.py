@@ -0,0 +1,70 @@
+"""
+Benchmark: lexicon signal scoring throughput on a TF-IDF matrix.
+
+A base corpus is cleaned and vectorized once with IncrementalTfidf, then its
+rows are tiled up to each requested size so only generate_signals is timed
+(one sparse matrix-vector product plus the engagement boost).
+
+Usage:
+    python benchmarks/bench_signals.py [--sizes 100000 1000000 10000000] [--base 100000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import scipy.sparse as sp  # noqa: E402
+
+from synthetic import make_corpus  # noqa: E402
+from processing.cleaner import clean  # noqa: E402
+from analysis.vectorizer import IncrementalTfidf  # noqa: E402
+from analysis.signal_generator import generate_signals, lexicon_weights  # noqa: E402
+
+
+def tile(X, engagement, rows):
+    reps = -(-rows // X.shape[0])
+    X = sp.vstack([X] * reps, format="csr")[:rows]
+    engagement = pd.concat([engagement] * reps, ignore_index=True).iloc[:rows]
+    return X, engagement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--base", type=int, default=100_000, help="rows actually vectorized before tiling")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = clean(make_corpus(args.base))
+    tfidf = IncrementalTfidf()
+    X = tfidf.partial_fit_transform(df["content"])
+    engagement = df[["likes", "retweets", "views"]].reset_index(drop=True)
+    weights = lexicon_weights(X.shape[1], tfidf)
+
+    print(f"{'rows':>10} {'nnz':>12} {'lexicon s':>10} {'+engagement s':>14} {'rows/sec':>14} {'buy %':>6} {'sell %':>7}")
+    for rows in args.sizes:
+        Xn, en = tile(X, engagement, rows)
+
+        best = {}
+        for label, kwargs in (("lexicon", {}), ("engagement", {"engagement": en})):
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                signals = generate_signals(Xn, weights=weights, **kwargs)
+                times.append(time.perf_counter() - start)
+            best[label] = min(times)
+
+        print(f"{rows:>10} {Xn.nnz:>12,} {best['lexicon']:>10.3f} {best['engagement']:>14.3f} "
+              f"{rows / best['engagement']:>14,.0f} {np.mean(signals['buy']) * 100:>6.1f} "
+              f"{np.mean(signals['sell']) * 100:>7.1f}")
+        del Xn, en
+
+
+if __name__ == "__main__":
+    main()
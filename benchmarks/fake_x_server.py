@@ -0,0 +1,366 @@
+"""
+Local stand-in for the x.com search page.
+
+Serves a search page that renders tweets from recorded SearchTimeline
+responses (benchmarks/fixtures/search_timeline_responses/page_N.json), or
+from a generated timeline of any length, and fetches the next page over the
+same GraphQL-style URL when scrolled to the bottom, so every TweetScraper
+extraction mode can run against it offline.
+
+Each searched hashtag can get its own generated timeline (a busy tag with
+thousands of tweets next to a dead one with a handful), and timeline requests
+over a request budget are answered with 429 and X's "Something went wrong"
+error, to exercise HashtagScheduler's ranking and backoff.
+
+Usage:
+    python benchmarks/fake_x_server.py [--port 8765] [--synthetic 1000 --per-page 20]
+    python benchmarks/fake_x_server.py --tag '#nifty=2000' --tag '#niftylevels=5' --rate-limit 30/60
+
+    scraper = TweetScraper(extraction="network", base_url=server.base_url)
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from synthetic import TEMPLATES, USERNAMES
+
+RESPONSES_DIR = Path(__file__).resolve().parent / "fixtures" / "search_timeline_responses"
+TIMELINE_PATH = "/i/api/graphql/fakeQueryId/SearchTimeline"
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Search / X</title>
+<style>article { min-height: 160px; border-bottom: 1px solid #ccc; }</style></head>
+<body>
+<main role="main"><div aria-label="Timeline: Search timeline" id="timeline"></div></main>
+<script>
+const timeline = document.getElementById("timeline");
+const query = new URLSearchParams(location.search).get("q") || "";
+let cursor = "";
+let loading = false;
+let done = false;
+
+function showError(show) {
+    let error = document.getElementById("error");
+    if (!show) { if (error) error.remove(); return; }
+    if (error) return;
+    error = document.createElement("div");
+    error.id = "error";
+    error.innerHTML = `<span>Something went wrong. Try reloading.</span><button role="button">Retry</button>`;
+    timeline.appendChild(error);
+}
+
+function fmt(v) {
+    if (v >= 1e6) return (v / 1e6).toFixed(1) + "M";
+    if (v >= 1e3) return (v / 1e3).toFixed(1) + "K";
+    return String(v);
+}
+
+function render(result) {
+    if (result.__typename === "TweetWithVisibilityResults") result = result.tweet;
+    const l = result.legacy;
+    const user = result.core.user_results.result.core.screen_name;
+    const views = parseInt(result.views.count);
+    const ts = new Date(l.created_at).toISOString();
+    const text = l.full_text.replace(/&/g, "&amp;").replace(/</g, "&lt;");
+    const cell = document.createElement("div");
+    cell.setAttribute("data-testid", "cellInnerDiv");
+    cell.innerHTML =
+        `<article data-testid="tweet" role="article" tabindex="0">` +
+        `<div data-testid="User-Name"><a role="link" href="/${user}"><span>${user}</span></a>` +
+        `<a role="link" href="/${user}/status/${result.rest_id}"><time datetime="${ts}">Dec 3</time></a></div>` +
+        `<div data-testid="tweetText" lang="en" dir="auto"><span>${text}</span></div>` +
+        `<div role="group" aria-label="${l.reply_count} replies, ${l.retweet_count} reposts, ${l.favorite_count} likes, ${views} views">` +
+        `<button data-testid="reply" aria-label="${l.reply_count} Replies. Reply">${fmt(l.reply_count)}</button>` +
+        `<button data-testid="retweet" aria-label="${l.retweet_count} reposts. Repost">${fmt(l.retweet_count)}</button>` +
+        `<button data-testid="like" aria-label="${l.favorite_count} Likes. Like">${fmt(l.favorite_count)}</button>` +
+        `<a href="/${user}/status/${result.rest_id}/analytics" aria-label="${views} views. View post analytics">${fmt(views)}</a>` +
+        `<button data-testid="bookmark" aria-label="${l.bookmark_count} Bookmarks. Bookmark"></button>` +
+        `</div></article>`;
+    timeline.appendChild(cell);
+}
+
+async function loadPage() {
+    if (loading || done) return;
+    loading = true;
+    const resp = await fetch("TIMELINE_PATH?q=" + encodeURIComponent(query) + "&cursor=" + encodeURIComponent(cursor));
+    // Rate limited: show the error like X does; the next scroll tries again
+    if (resp.status === 429) { showError(true); loading = false; return; }
+    if (!resp.ok) { loading = false; done = true; return; }
+    showError(false);
+    const payload = await resp.json();
+    const instructions = payload.data.search_by_raw_query.search_timeline.timeline.instructions;
+    cursor = "";
+    for (const ins of instructions) {
+        for (const entry of ins.entries || []) {
+            const c = entry.content;
+            if (c.itemContent) render(c.itemContent.tweet_results.result);
+            else if (c.cursorType === "Bottom") cursor = c.value;
+        }
+    }
+    done = !cursor;
+    loading = false;
+}
+
+window.addEventListener("scroll", () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 400) loadPage();
+});
+loadPage();
+</script>
+</body>
+</html>
+""".replace("TIMELINE_PATH", TIMELINE_PATH)
+
+# Newest synthetic tweet; older ones count down from here one minute apart
+SYNTHETIC_START = datetime(2025, 12, 3, 23, 59, tzinfo=timezone.utc)
+SYNTHETIC_FIRST_ID = 1866000000000000000
+
+
+def synthetic_page(page, total, per_page=20, feed=0, arrived=0):
+    """
+    SearchTimeline payload for one page of a generated ``total``-tweet timeline.
+
+    Every tweet has a distinct id, text and set of numbers, so none of them
+    is dropped as a duplicate by the scraper; ``feed`` (e.g. the hashtag's
+    position) keeps several generated timelines distinct from each other too.
+    ``arrived`` of the ``total`` tweets are newer than the original timeline
+    and come first, while the older ones keep their ids and text.
+    """
+    entries = []
+    for i in range(page * per_page, min(total, (page + 1) * per_page)):
+        n = i - arrived
+        tweet_id = str(SYNTHETIC_FIRST_ID - n * 4096 - feed)
+        user = USERNAMES[i % len(USERNAMES)]
+        entries.append({
+            "entryId": f"tweet-{tweet_id}",
+            "sortIndex": tweet_id,
+            "content": {
+                "entryType": "TimelineTimelineItem",
+                "__typename": "TimelineTimelineItem",
+                "itemContent": {
+                    "itemType": "TimelineTweet",
+                    "__typename": "TimelineTweet",
+                    "tweet_results": {"result": {
+                        "__typename": "Tweet",
+                        "rest_id": tweet_id,
+                        "core": {"user_results": {"result": {
+                            "__typename": "User",
+                            "core": {"screen_name": user, "name": user},
+                            "legacy": {"screen_name": user},
+                        }}},
+                        "views": {"count": str(1000 + (i * 7919) % 2_500_000), "state": "EnabledWithCount"},
+                        "legacy": {
+                            "id_str": tweet_id,
+                            "created_at": (SYNTHETIC_START - timedelta(minutes=n)).strftime("%a %b %d %H:%M:%S %z %Y"),
+                            "full_text": f"{TEMPLATES[n % len(TEMPLATES)]} (update {n % 10**7}{f'/{feed}' if feed else ''})",
+                            "reply_count": i % 97,
+                            "retweet_count": (i * 31) % 1500,
+                            "favorite_count": (i * 131) % 25_000,
+                            "bookmark_count": i % 53,
+                            "quote_count": 0,
+                            "lang": "en",
+                        },
+                    }},
+                },
+            },
+        })
+
+    cursor = f"page-{page + 1}" if (page + 1) * per_page < total else ""
+    entries.append({
+        "entryId": f"cursor-bottom-{page}",
+        "sortIndex": "0",
+        "content": {"entryType": "TimelineTimelineCursor", "__typename": "TimelineTimelineCursor",
+                    "value": cursor, "cursorType": "Bottom"},
+    })
+    return {"data": {"search_by_raw_query": {"search_timeline": {"timeline": {
+        "instructions": [{"type": "TimelineAddEntries", "entries": entries}]
+    }}}}}
+
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Home / X</title></head>
+<body><main role="main"><h1>Home</h1></main></body></html>
+"""
+
+
+class FakeXHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/search":
+            self._send(200, SEARCH_PAGE, "text/html; charset=utf-8")
+        elif url.path in ("/login", "/home"):
+            self._send(200, LOGIN_PAGE, "text/html; charset=utf-8")
+        elif url.path.endswith("/SearchTimeline"):
+            cursor = params.get("cursor", [""])[0]
+            page = int(cursor.split("-")[-1]) if cursor else 0
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            if not self.server.admit():
+                self._send(429, '{"errors": [{"message": "Rate limit exceeded", "code": 88}]}', "application/json")
+                return
+            query = params.get("q", [""])[0].split()
+            body = self.server.page_body(page, query[0] if query else None)
+            if body is not None:
+                self._send(200, body, "application/json")
+            else:
+                self._send(404, "{}", "application/json")
+        else:
+            self._send(404, "not found", "text/plain")
+
+
+class FakeXServer:
+    """
+    Threaded stand-in server; use as a context manager or call start()/stop().
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        responses_dir: Directory with recorded page_N.json responses
+        synthetic_tweets: Serve a generated timeline of this many tweets
+            instead of the recorded responses
+        per_page: Tweets per generated page
+        latency: Seconds each timeline response is delayed, like a real API call
+        hashtag_tweets: {hashtag: tweets} generated timeline per searched
+            hashtag; hashtags not listed get an empty timeline
+        hashtag_rates: {hashtag: tweets per second} added to the top of
+            the hashtag's timeline while the server runs
+        rate_limit: (requests, seconds) timeline requests allowed in any
+            sliding window of that length; the rest get 429 until it frees up
+    """
+
+    def __init__(self, port=0, responses_dir=RESPONSES_DIR, synthetic_tweets=None, per_page=20, latency=0.0,
+                 hashtag_tweets=None, hashtag_rates=None, rate_limit=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), FakeXHandler)
+        self.httpd.responses_dir = Path(responses_dir)
+        self.httpd.latency = latency
+        self.httpd.page_body = self.page_body
+        self.httpd.admit = self.admit
+        self.synthetic_tweets = synthetic_tweets
+        self.per_page = per_page
+        self.hashtag_tweets = {tag.lower(): n for tag, n in (hashtag_tweets or {}).items()}
+        self.hashtag_rates = {tag.lower(): r for tag, r in (hashtag_rates or {}).items()}
+        for tag in self.hashtag_rates:
+            self.hashtag_tweets.setdefault(tag, 0)
+        self.started = time.monotonic()
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.rate_limited = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.thread = None
+
+    def admit(self):
+        """Count a timeline request; False if it is over the rate limit."""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit is None:
+                return True
+            limit, window = self.rate_limit
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= window:
+                self._recent.popleft()
+            if len(self._recent) >= limit:
+                self.rate_limited += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def page_body(self, page, hashtag=None):
+        """JSON bytes of timeline page ``page`` (of ``hashtag``'s timeline if set up), or None past the end."""
+        if self.hashtag_tweets:
+            tag = (hashtag or "").lower()
+            arrived = int(self.hashtag_rates.get(tag, 0) * (time.monotonic() - self.started))
+            total = self.hashtag_tweets.get(tag, 0) + arrived
+            if page and page * self.per_page >= total:
+                return None
+            feed = list(self.hashtag_tweets).index(tag) + 1 if tag in self.hashtag_tweets else 0
+            return json.dumps(synthetic_page(page, total, self.per_page, feed, arrived)).encode("utf-8")
+
+        if self.synthetic_tweets is not None:
+            if page * self.per_page >= max(self.synthetic_tweets, 1) and page:
+                return None
+            return json.dumps(synthetic_page(page, self.synthetic_tweets, self.per_page)).encode("utf-8")
+
+        response = self.httpd.responses_dir / f"page_{page}.json"
+        return response.read_bytes() if response.exists() else None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def recorded_responses(self):
+        """Parsed page payloads in page order (generated ones in synthetic mode)."""
+        if self.synthetic_tweets is not None:
+            pages = max(1, -(-self.synthetic_tweets // self.per_page))
+            return [synthetic_page(p, self.synthetic_tweets, self.per_page) for p in range(pages)]
+
+        paths = sorted(self.httpd.responses_dir.glob("page_*.json"), key=lambda p: int(p.stem.split("_")[-1]))
+        return [json.loads(path.read_text()) for path in paths]
+
+    def recorded_tweet_count(self):
+        total = 0
+        for payload in self.recorded_responses():
+            for ins in payload["data"]["search_by_raw_query"]["search_timeline"]["timeline"]["instructions"]:
+                total += sum(1 for e in ins.get("entries", []) if "itemContent" in e["content"])
+        return total
+
+    def start(self):
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the x.com search timeline")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--synthetic", type=int, metavar="TWEETS", help="serve a generated timeline of this many tweets")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay each timeline response")
+    parser.add_argument("--tag", action="append", default=[], metavar="HASHTAG=TWEETS",
+                        help="generated timeline for one hashtag (repeatable)")
+    parser.add_argument("--rate-limit", metavar="REQUESTS/SECONDS",
+                        help="answer timeline requests beyond this budget with 429")
+    args = parser.parse_args()
+
+    hashtag_tweets = {tag: int(n) for tag, n in (t.rsplit("=", 1) for t in args.tag)}
+    rate_limit = tuple(float(x) for x in args.rate_limit.split("/")) if args.rate_limit else None
+    server = FakeXServer(port=args.port, synthetic_tweets=args.synthetic, per_page=args.per_page, latency=args.latency,
+                         hashtag_tweets=hashtag_tweets, rate_limit=rate_limit)
+    print(f"Serving {server.base_url}/search (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+End-to-end benchmark suite with machine-readable results.
+
+Scraper: every extraction mode scrapes a synthetic timeline served by
+fake_x_server (headless Chrome required; recorded as an error otherwise) and
+reports tweets/sec, WebDriver commands per tweet and scroll latency.
+
+Processing: clean, extract_instruments, compute_tfidf (full refit),
+IncrementalTfidf and generate_signals on synthetic corpora. Each (stage, size) runs in a fresh
+subprocess so its peak RSS is its own; a stage that fails or times out is
+recorded with its error and the suite moves on.
+
+Cold start: bench_cold_start's fresh-interpreter times for importing main.py
+and for `main.py process` on a small file.
+
+Results go to benchmarks/results/<UTC time>-<commit>.json; --compare prints
+the change against an earlier results file and exits non-zero on a
+regression beyond --tolerance.
+
+Usage:
+    python benchmarks/run_all.py [--sizes 10000 100000 1000000 10000000] [--skip-scraper]
+    python benchmarks/run_all.py --compare benchmarks/results/<baseline>.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+STAGES = ("clean", "instruments", "compute_tfidf", "incremental_tfidf", "generate_signals")
+EXTRACTION_MODES = ("dom", "bulk", "network")
+
+
+# ------------------------------------------
+# PROCESSING STAGES (run inside a child process)
+# ------------------------------------------
+def _prepare(stage, rows):
+    """Build the stage's input outside the timed section; returns the callable to time."""
+    from synthetic import make_corpus
+    from processing.cleaner import clean
+    from processing.instruments import extract_instruments
+    from analysis.vectorizer import compute_tfidf, IncrementalTfidf
+    from analysis.signal_generator import generate_signals
+    # The vectorizer imports scikit-learn on first use; keep that out of the timed stage
+    import sklearn.feature_extraction.text  # noqa: F401
+
+    df = make_corpus(rows)
+    if stage == "clean":
+        return lambda: clean(df)
+
+    df = clean(df)
+    if stage == "instruments":
+        return lambda: extract_instruments(df)
+    if stage == "compute_tfidf":
+        return lambda: compute_tfidf(df["content"])
+    if stage == "incremental_tfidf":
+        return lambda: IncrementalTfidf().partial_fit_transform(df["content"])
+
+    tfidf = IncrementalTfidf()
+    X = tfidf.partial_fit_transform(df["content"])
+    return lambda: generate_signals(X, tfidf, engagement=df)
+
+
+def _rows_out(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, dict):
+        result = result["confidence"]
+    return result.shape[0]
+
+
+def run_stage_child(stage, rows):
+    run = _prepare(stage, rows)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    print(json.dumps({
+        "stage": stage,
+        "rows": rows,
+        "rows_out": _rows_out(result),
+        "seconds": wall,
+        "cpu_seconds": cpu,
+        "rows_per_sec": rows / wall if wall else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "input_rss_mb": rss_before / 1024,
+    }))
+
+
+def run_stage(stage, rows, timeout):
+    try:
+        out = subprocess.run([sys.executable, __file__, "--child", stage, str(rows)],
+                             capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"stage": stage, "rows": rows, "error": f"timed out after {timeout} s"}
+
+    if out.returncode != 0:
+        lines = (out.stderr.strip() or f"exit code {out.returncode}").splitlines()
+        return {"stage": stage, "rows": rows, "error": lines[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ------------------------------------------
+# SCRAPER
+# ------------------------------------------
+def run_scraper(mode, tweets, per_page, latency):
+    from fake_x_server import FakeXServer
+    from scraper.driver_setup import get_driver, CommandCounter
+    from scraper.twitter_scraper import TweetScraper
+
+    with FakeXServer(synthetic_tweets=tweets, per_page=per_page, latency=latency) as server:
+        driver = get_driver(headless=True, capture_network=(mode == "network"))
+        scraper = TweetScraper(extraction=mode, driver=driver, base_url=server.base_url)
+        try:
+            counter = CommandCounter(driver)
+            scroll_ms = []
+            scroll_page = scraper.scroll_page
+
+            def timed_scroll(label=""):
+                start = time.perf_counter()
+                result = scroll_page(label)
+                scroll_ms.append((time.perf_counter() - start) * 1000)
+                return result
+
+            scraper.scroll_page = timed_scroll
+            start = time.perf_counter()
+            collected = scraper.search_and_scrape("#nifty")
+            elapsed = time.perf_counter() - start
+        finally:
+            scraper.close()
+
+    scroll_ms.sort()
+    return {
+        "mode": mode,
+        "expected": tweets,
+        "tweets": len(collected),
+        "seconds": elapsed,
+        "tweets_per_sec": len(collected) / elapsed if elapsed else 0.0,
+        "commands_per_tweet": counter.total / len(collected) if collected else 0.0,
+        "scrolls": len(scroll_ms),
+        "scroll_ms_p50": scroll_ms[len(scroll_ms) // 2] if scroll_ms else None,
+        "scroll_ms_p95": scroll_ms[int(len(scroll_ms) * 0.95)] if scroll_ms else None,
+    }
+
+
+# ------------------------------------------
+# REPORTING
+# ------------------------------------------
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def environment():
+    import numpy
+    import pandas
+    import pyarrow
+    import sklearn
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versions": {"numpy": numpy.__version__, "pandas": pandas.__version__,
+                     "pyarrow": pyarrow.__version__, "scikit-learn": sklearn.__version__},
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Print per-benchmark changes; returns the number of regressions beyond tolerance."""
+    def index(report):
+        rows = {("scraper", r["mode"]): r for r in report.get("scraper", [])}
+        rows.update({(r["stage"], r["rows"]): r for r in report.get("processing", [])})
+        rows.update({("cold_start", r["command"]): r for r in report.get("cold_start", [])})
+        return rows
+
+    old, new = index(baseline), index(current)
+    regressions = 0
+    print(f"\nvs {baseline['environment'].get('commit', '?')[:10]}:")
+    for key, r in new.items():
+        b = old.get(key)
+        if not b or "error" in r or "error" in b:
+            continue
+        if key[0] == "cold_start":
+            # Lower is better; negative change is a slowdown, like for throughput
+            metric = "seconds"
+            change = b[metric] / r[metric] - 1 if r[metric] else 0.0
+        else:
+            metric = "tweets_per_sec" if key[0] == "scraper" else "rows_per_sec"
+            change = r[metric] / b[metric] - 1 if b[metric] else 0.0
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = "  ⚠️ regression"
+        rss = ""
+        if "peak_rss_mb" in r and b.get("peak_rss_mb"):
+            rss = f", peak RSS {r['peak_rss_mb'] / b['peak_rss_mb'] - 1:+.0%}"
+        print(f"  {key[0]:<18} {key[1]:>10} {metric} {change:+.0%}{rss}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--skip-scraper", action="store_true")
+    parser.add_argument("--skip-cold-start", action="store_true")
+    parser.add_argument("--scrape-tweets", type=int, default=400)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per fake timeline response")
+    parser.add_argument("--timeout", type=int, default=1800, help="seconds per processing stage")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_stage_child(args.child[0], int(args.child[1]))
+
+    report = {"environment": environment(), "scraper": [], "processing": [], "cold_start": []}
+
+    if not args.skip_scraper:
+        print(f"{'mode':<8} {'tweets':>9} {'tweets/sec':>11} {'cmds/tweet':>11} {'scroll p50 ms':>14}")
+        for mode in EXTRACTION_MODES:
+            try:
+                r = run_scraper(mode, args.scrape_tweets, args.per_page, args.latency)
+                print(f"{mode:<8} {r['tweets']:>4}/{r['expected']:<4} {r['tweets_per_sec']:>11.1f} "
+                      f"{r['commands_per_tweet']:>11.2f} {r['scroll_ms_p50'] or 0:>14.0f}")
+            except Exception as e:
+                r = {"mode": mode, "error": f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"}
+                print(f"{mode:<8} ❌ {r['error']}")
+            report["scraper"].append(r)
+
+    print(f"\n{'stage':<18} {'rows':>10} {'rows/sec':>12} {'seconds':>9} {'peak RSS MB':>12}")
+    for rows in args.sizes:
+        for stage in args.stages:
+            r = run_stage(stage, rows, args.timeout)
+            report["processing"].append(r)
+            if "error" in r:
+                print(f"{stage:<18} {rows:>10} ❌ {r['error']}")
+            else:
+                print(f"{stage:<18} {rows:>10} {r['rows_per_sec']:>12,.0f} {r['seconds']:>9.2f} {r['peak_rss_mb']:>12.0f}")
+
+    if not args.skip_cold_start:
+        from bench_cold_start import measure
+
+        print(f"\n{'cold start':<18} {'seconds':>10}")
+        try:
+            report["cold_start"] = measure()
+            for r in report["cold_start"]:
+                print(f"{r['command']:<18} {r['seconds']:>10.2f}")
+        except Exception as e:
+            report["cold_start"] = [{"command": "process", "error": f"{type(e).__name__}: {e}"}]
+            print(f"{'process':<18} ❌ {report['cold_start'][0]['error']}")
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"{stamp}-{report['environment']['commit'][:10] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare:
+        return 1 if compare(report, json.loads(args.compare.read_text()), args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
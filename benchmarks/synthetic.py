@@ -0,0 +1,63 @@
+"""
+Synthetic tweet corpora for the benchmarks.
+
+Rows are built with vectorized Arrow/NumPy ops so 10M-row corpora can be
+generated in seconds. Roughly ``dup_rate`` of the rows repeat an earlier
+(content, timestamp) pair, like re-scraped tweets do.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+TEMPLATES = [
+    "Nifty holding 24,350 support 🚀 buying 24500 CE for a move higher #nifty #nifty50 https://t.co/abc123",
+    "BankNifty weak below VWAP!! 48500 PE looks good for intraday #banknifty #optionbuying",
+    "Sensex expiry today — watch 85000 levels closely @NSEIndia #sensex #bse",
+    "FII selling continues, stay light on longs… #indianstockmarket #stockmarketindia https://x.com/a/status/1",
+    "Trailing SL to cost on my 24300 CE position, booked half 💰 #intraday #intradaytrading",
+    "Option sellers in control, straddle at 52000 decaying nicely #optionselling @OptionsDesk",
+    "Gap up opening expected, SGX nifty +80 pts. Bullish above 24,400 📈 #nifty",
+    "Bearish engulfing on BankNifty daily, short below 48,200 with SL 48,600 #banknifty",
+    "Market crash incoming? VIX spiking, hedge your longs 🐻 #stockmarketindia",
+    "Breakout confirmed in NIFTY IT, target 40k — strong buy #nifty50 #niftyanalysis",
+]
+USERNAMES = ["NiftyNerve", "Rajesh_Niramaya", "OptionsDesk", "bankniftyguru", "TradeWithRavi", "chartwala"]
+TAGS = ["#nifty", "#nifty50", "#banknifty", "#sensex", "#intraday", "#optionselling"]
+
+
+def make_corpus(rows, seed=0, dup_rate=0.05):
+    """
+    Returns:
+        pandas.DataFrame: raw scraped-tweet columns (string timestamps, as
+            the scraper emits them) with ``rows`` rows
+    """
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, max(1, int(rows * (1 - dup_rate))), size=rows)
+
+    templates = pa.array(TEMPLATES)
+    content = pc.binary_join_element_wise(
+        pc.take(templates, pa.array(ids % len(TEMPLATES))),
+        pc.cast(pa.array(ids), pa.string()),
+        " ",
+    )
+
+    base = int(datetime(2025, 12, 3, tzinfo=timezone.utc).timestamp())
+    seconds = pa.array((base + ids).astype("datetime64[s]"))
+    timestamp = pc.strftime(seconds, format="%Y-%m-%dT%H:%M:%S.000Z")
+
+    likes = rng.integers(0, 1000, size=rows)
+    return pd.DataFrame({
+        "username": pd.Categorical.from_codes(ids % len(USERNAMES), USERNAMES).astype(str),
+        "timestamp": timestamp.to_pandas(),
+        "tweet_id": (1866000000000000000 - ids).astype(str),
+        "content": content.to_pandas(),
+        "searched_tag": pd.Categorical.from_codes(ids % len(TAGS), TAGS).astype(str),
+        "replies": likes // 20,
+        "retweets": likes // 7,
+        "likes": likes,
+        "views": likes * 137,
+        "bookmarks": likes // 50,
+    })
@@ -0,0 +1,202 @@
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from processing.instruments import alias_lookup, normalize_alias
+
+# Instrument of each alias, for tweets that name none: their searched hashtag
+# is looked up with the same aliases, and anything else is broad market chatter
+INSTRUMENTS = alias_lookup()
+DEFAULT_INSTRUMENT = "MARKET"
+
+# Bucket width and how much history each instrument's ring buffer keeps
+BUCKET_SECONDS = 60
+HORIZON_SECONDS = 24 * 60 * 60
+DEFAULT_WINDOW_SECONDS = 15 * 60
+
+# Per-bucket accumulators, one column each
+FIELDS = ("count", "buy", "sell", "confidence")
+
+
+@lru_cache(maxsize=1024)
+def instrument_for(tag):
+    return INSTRUMENTS.get(normalize_alias(tag), DEFAULT_INSTRUMENT)
+
+
+def to_epoch_seconds(timestamps):
+    """Epoch seconds as int64 (NaT -> -1) from datetimes or ISO strings."""
+    ts = pd.to_datetime(pd.Series(timestamps), errors="coerce", utc=True)
+    seconds = ts.to_numpy(dtype="datetime64[s]", na_value=np.datetime64("NaT")).astype(np.int64)
+    seconds[ts.isna().to_numpy()] = -1
+    return seconds
+
+
+class _Ring:
+    """Fixed array of time buckets; slot i holds absolute bucket epoch[i]."""
+
+    def __init__(self, n_buckets):
+        self.stats = np.zeros((n_buckets, len(FIELDS)))
+        self.epoch = np.full(n_buckets, -1, dtype=np.int64)
+        self.watermark = -1  # newest bucket seen
+
+
+class WindowedSentiment:
+    """
+    Rolling buy/sell/confidence aggregates per instrument.
+
+    A tweet counts toward the instrument extracted from its text
+    (extract_instruments); only tweets that name none fall back to the
+    instrument of their searched hashtag. Every instrument owns a ring buffer of ``HORIZON_SECONDS / BUCKET_SECONDS``
+    buckets. A tweet lands in its bucket in O(1) (a stale slot is cleared on
+    first reuse), so tweets may arrive out of order: anything still inside the
+    horizon behind the newest bucket is counted, anything older is dropped and
+    tallied in ``late_dropped``. Sliding and tumbling windows are sums over
+    whole buckets, so queries touch at most one ring and never the raw tweets.
+
+    Args:
+        bucket_seconds: Bucket width; windows are rounded to whole buckets
+        horizon_seconds: History kept per instrument (also the lateness limit)
+        key_fn: Maps a searched hashtag to its aggregation key, for tweets
+            without an extracted instrument
+    """
+
+    def __init__(self, bucket_seconds=BUCKET_SECONDS, horizon_seconds=HORIZON_SECONDS, key_fn=instrument_for):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(1, horizon_seconds // bucket_seconds)
+        self.key_fn = key_fn
+        self.rings = {}
+        self.late_dropped = 0
+        self._lock = threading.Lock()
+
+    def _ring(self, key):
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = self.rings[key] = _Ring(self.n_buckets)
+        return ring
+
+    def _keys(self, tags, instruments):
+        tags = pd.Series(np.asarray(tags, dtype=object))
+        # One key_fn call per distinct hashtag, not per tweet
+        codes, uniques = pd.factorize(tags, use_na_sentinel=False)
+        keys = np.array([self.key_fn(tag) for tag in uniques], dtype=object)[codes]
+        if instruments is not None:
+            extracted = pd.Series(np.asarray(instruments, dtype=object))
+            named = extracted.notna().to_numpy()
+            keys[named] = extracted[named].to_numpy()
+        return keys
+
+    def add(self, tag, timestamp, buy, sell, confidence, instrument=None):
+        """Count one scored tweet (timestamp in epoch seconds) toward ``instrument``, or its tag's."""
+        bucket = int(timestamp) // self.bucket_seconds
+        with self._lock:
+            ring = self._ring(instrument if isinstance(instrument, str) else self.key_fn(tag))
+            if timestamp < 0 or bucket <= ring.watermark - self.n_buckets:
+                self.late_dropped += 1
+                return
+
+            slot = bucket % self.n_buckets
+            if ring.epoch[slot] != bucket:
+                ring.stats[slot] = 0.0
+                ring.epoch[slot] = bucket
+            ring.stats[slot] += (1.0, bool(buy), bool(sell), confidence)
+            ring.watermark = max(ring.watermark, bucket)
+
+    def add_batch(self, tags, timestamps, buy, sell, confidence, instruments=None):
+        """
+        Vectorized add() for a batch of scored tweets.
+
+        Args:
+            tags: searched_tag per tweet
+            timestamps: datetimes, ISO strings or epoch seconds per tweet
+            instruments: extracted instrument per tweet (null where none), e.g.
+                the instrument column of extract_instruments
+        """
+        seconds = np.asarray(timestamps)
+        if not np.issubdtype(seconds.dtype, np.integer):
+            seconds = to_epoch_seconds(timestamps)
+        buckets = seconds // self.bucket_seconds
+        values = np.column_stack([
+            np.ones(len(seconds)),
+            np.asarray(buy, dtype=np.float64),
+            np.asarray(sell, dtype=np.float64),
+            np.asarray(confidence, dtype=np.float64),
+        ])
+        keys = self._keys(tags, instruments)
+
+        with self._lock:
+            for key in pd.unique(keys):
+                mine = keys == key
+                ring = self._ring(key)
+                b = buckets[mine]
+                valid = seconds[mine] >= 0
+                if valid.any():
+                    ring.watermark = max(ring.watermark, int(b[valid].max()))
+                valid &= b > ring.watermark - self.n_buckets
+                self.late_dropped += int((~valid).sum())
+                if not valid.any():
+                    continue
+
+                b = b[valid]
+                slots = b % self.n_buckets
+                # Buckets still inside the horizon map to distinct slots
+                fresh = np.unique(b)
+                stale = ring.epoch[fresh % self.n_buckets] != fresh
+                ring.stats[fresh[stale] % self.n_buckets] = 0.0
+                ring.epoch[fresh % self.n_buckets] = fresh
+                np.add.at(ring.stats, slots, values[mine][valid])
+
+    def _window(self, ring, first, last):
+        live = (ring.epoch >= first) & (ring.epoch <= last)
+        return ring.stats[live].sum(axis=0)
+
+    def _summary(self, totals, first, last):
+        count, buy, sell, confidence = totals
+        return {
+            "window_start": first * self.bucket_seconds,
+            "window_end": (last + 1) * self.bucket_seconds,
+            "tweets": int(count),
+            "buy": int(buy),
+            "sell": int(sell),
+            "mean_confidence": float(confidence / count) if count else 0.5,
+            "net_sentiment": float((buy - sell) / count) if count else 0.0,
+        }
+
+    def query(self, key, window_seconds=DEFAULT_WINDOW_SECONDS, now=None):
+        """
+        Sliding window ending at ``now`` (epoch seconds) or at the key's newest tweet.
+
+        Returns:
+            dict: window_start/window_end (epoch seconds), tweets, buy, sell, mean_confidence
+                and net_sentiment ((buy - sell) / tweets), or None for an unknown key
+        """
+        with self._lock:
+            ring = self.rings.get(key)
+            if ring is None:
+                return None
+            last = int(now) // self.bucket_seconds if now is not None else ring.watermark
+            first = last - max(1, window_seconds // self.bucket_seconds) + 1
+            return self._summary(self._window(ring, first, last), first, last)
+
+    def tumbling(self, key, window_seconds=DEFAULT_WINDOW_SECONDS, count=4):
+        """
+        The last ``count`` aligned, non-overlapping windows for ``key``, oldest first.
+
+        The newest window may still be filling up.
+        """
+        width = max(1, window_seconds // self.bucket_seconds)
+        with self._lock:
+            ring = self.rings.get(key)
+            if ring is None:
+                return []
+            newest = ring.watermark // width
+            windows = []
+            for w in range(newest - count + 1, newest + 1):
+                first, last = w * width, (w + 1) * width - 1
+                windows.append(self._summary(self._window(ring, first, last), first, last))
+            return windows
+
+    def snapshot(self, window_seconds=DEFAULT_WINDOW_SECONDS, now=None):
+        """Sliding-window summary of every instrument, e.g. for a dashboard."""
+        return {key: self.query(key, window_seconds, now) for key in sorted(self.rings)}
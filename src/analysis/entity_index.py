@@ -0,0 +1,353 @@
+import os
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .aggregator import to_epoch_seconds
+
+INDEX_DIR = "data/state/entity_index"
+# Saved segments merged into one once there are this many
+COMPACT_SEGMENTS = 32
+
+# Entity keys: "#tag" and "@user" as written in tweets, authors as X's "from:user"
+AUTHOR_PREFIX = "from:"
+KINDS = {"hashtag": 0, "mention": 1, "author": 2}
+
+
+def entity_kind(entity):
+    if entity.startswith("#"):
+        return "hashtag"
+    if entity.startswith("@"):
+        return "mention"
+    return "author"
+
+
+class _Postings:
+    """Row ids of one entity, sorted by (timestamp, row); new rows wait in ``pending`` until queried."""
+
+    __slots__ = ("rows", "ts", "pending")
+
+    def __init__(self, rows=None, ts=None):
+        self.rows = rows if rows is not None else np.empty(0, dtype=np.uint32)
+        self.ts = ts if ts is not None else np.empty(0, dtype=np.int64)
+        self.pending = []
+
+    def add(self, rows, ts):
+        self.pending.append((rows, ts))
+
+    def arrays(self):
+        if self.pending:
+            rows = np.concatenate([self.rows, *(r for r, _ in self.pending)])
+            ts = np.concatenate([self.ts, *(t for _, t in self.pending)])
+            # Batches mostly arrive in time order, so the sort is usually skipped
+            if len(ts) > 1 and (np.diff(ts) < 0).any():
+                order = np.lexsort((rows, ts))
+                rows, ts = rows[order], ts[order]
+            self.rows, self.ts, self.pending = rows, ts, []
+        return self.rows, self.ts
+
+    def window(self, start=None, end=None):
+        """Row ids with start <= timestamp < end, in time order."""
+        rows, ts = self.arrays()
+        lo = np.searchsorted(ts, start, "left") if start is not None else 0
+        hi = np.searchsorted(ts, end, "left") if end is not None else len(ts)
+        return rows[lo:hi]
+
+
+class EntityIndex:
+    """
+    Inverted index from hashtags, mentions and authors to the tweets that carry them.
+
+    Every ingested tweet gets a row id (its position in ingestion order).
+    Each entity keeps a posting list of row ids sorted by tweet time, so a
+    time range is two binary searches and an AND of entities is an
+    intersection of sorted arrays. A forward index (row -> entity ids, CSR)
+    gives co-occurrence counts over any slice with one bincount. Postings
+    are uint32 row ids plus int64 times; entities are lowercased.
+
+    Usage:
+        index.query("#banknifty", "@someanalyst", start=now - 3600)
+        index.co_occurring("#optionselling", start=midnight, kind="hashtag")
+
+    Times are epoch seconds (datetimes and ISO strings are accepted too).
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self.entities = []
+        self.entity_ids = {}
+        self.n_rows = 0
+        self.postings = []
+        self._kinds = []
+        # Per-row columns and the forward index, as chunks merged on first use
+        self._timestamps = [np.empty(0, dtype=np.int64)]
+        self._tweet_ids = [np.empty(0, dtype=np.int64)]
+        self._fwd_entities = [np.empty(0, dtype=np.int32)]
+        self._fwd_counts = [np.empty(0, dtype=np.int32)]
+        self._offsets = np.zeros(1, dtype=np.int64)
+        # Rows and entities already written by save()
+        self._saved_rows = 0
+        self._saved_entities = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.n_rows
+
+    # ------------------------------------------
+    # INGEST
+    # ------------------------------------------
+    def add_batch(self, tweets):
+        """
+        Index a batch of tweets (DataFrame, Arrow table or TweetColumns) with
+        hashtags, mentions, username, timestamp and tweet_id columns.
+
+        Returns:
+            numpy.ndarray: the row ids given to the batch
+        """
+        table = tweets if isinstance(tweets, pa.Table) else pa.table(tweets)
+        n = table.num_rows
+        ts = to_epoch_seconds(table["timestamp"].to_pandas()) if n else np.empty(0, dtype=np.int64)
+        ids = pc.fill_null(table["tweet_id"].cast(pa.string()), "")
+        ids = pc.if_else(pc.match_substring_regex(ids, r"^\d{1,18}$"), ids, "0")
+        tweet_ids = np.asarray(pc.cast(ids, pa.int64()), dtype=np.int64)
+
+        local_rows, values = [], []
+        for column, prefix in (("hashtags", ""), ("mentions", ""), ("username", AUTHOR_PREFIX)):
+            col = table[column]
+            if pa.types.is_list(col.type) or pa.types.is_large_list(col.type):
+                col = col.combine_chunks()
+                parents, col = pc.list_parent_indices(col), pc.list_flatten(col)
+            else:
+                parents = pa.array(np.arange(n))
+            # All-empty list columns come from pandas as list<null>
+            col = col.cast(pa.string())
+            # The scraper writes "NA" for authors it could not read
+            keep = pc.and_(pc.is_valid(col), pc.invert(pc.is_in(col, pa.array(["", "NA"]))))
+            col, parents = pc.filter(col, keep), pc.filter(parents, keep)
+            col = pc.utf8_lower(col)
+            if prefix:
+                col = pc.binary_join_element_wise(prefix, col, "")
+            local_rows.append(np.asarray(parents, dtype=np.int64))
+            values.append(col)
+
+        with self._lock:
+            first_row = self.n_rows
+            rows = np.arange(first_row, first_row + n, dtype=np.uint32)
+            encoded = pa.chunked_array(values, pa.string()).combine_chunks().dictionary_encode() if values else None
+            if encoded is not None and len(encoded):
+                lookup = np.fromiter((self._entity_id(e) for e in encoded.dictionary.to_pylist()),
+                                     dtype=np.int64, count=len(encoded.dictionary))
+                eids = lookup[encoded.indices.to_numpy()]
+                local = np.concatenate(local_rows)
+                # One (row, entity) pair per tweet, ordered by row then entity
+                pairs = np.unique((local << 32) | eids)
+                local, eids = pairs >> 32, (pairs & 0xFFFFFFFF).astype(np.int32)
+            else:
+                local, eids = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+            self._timestamps.append(ts)
+            self._tweet_ids.append(tweet_ids)
+            self._fwd_entities.append(eids)
+            self._fwd_counts.append(np.bincount(local, minlength=n).astype(np.int32))
+            self.n_rows += n
+
+            by_entity = np.argsort(eids, kind="stable")
+            sorted_eids = eids[by_entity]
+            bounds = np.flatnonzero(np.diff(sorted_eids)) + 1
+            for group in np.split(by_entity, bounds) if len(by_entity) else []:
+                row_idx = local[group]
+                self.postings[eids[group[0]]].add(rows[row_idx], ts[row_idx])
+        return rows
+
+    def _entity_id(self, entity):
+        eid = self.entity_ids.get(entity)
+        if eid is None:
+            eid = self.entity_ids[entity] = len(self.entities)
+            self.entities.append(entity)
+            self.postings.append(_Postings())
+            self._kinds.append(KINDS[entity_kind(entity)])
+        return eid
+
+    def _consolidate(self):
+        if len(self._timestamps) > 1:
+            self._timestamps = [np.concatenate(self._timestamps)]
+            self._tweet_ids = [np.concatenate(self._tweet_ids)]
+        if len(self._fwd_entities) > 1:
+            counts = np.concatenate(self._fwd_counts[1:])
+            self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(counts)])
+            self._fwd_entities = [np.concatenate(self._fwd_entities)]
+            self._fwd_counts = [np.empty(0, dtype=np.int32)]
+
+    # ------------------------------------------
+    # QUERIES
+    # ------------------------------------------
+    def rows(self, entity, start=None, end=None):
+        """
+        Row ids of tweets carrying ``entity`` with start <= time < end, oldest first.
+
+        start/end are epoch seconds, datetimes or ISO strings.
+        """
+        start, end = _seconds(start), _seconds(end)
+        with self._lock:
+            eid = self.entity_ids.get(entity.lower())
+            if eid is None:
+                return np.empty(0, dtype=np.uint32)
+            return self.postings[eid].window(start, end)
+
+    def count(self, entity, start=None, end=None):
+        return len(self.rows(entity, start, end))
+
+    def query(self, *entities, start=None, end=None):
+        """Row ids of tweets carrying every one of ``entities`` in the time range, oldest first."""
+        lists = sorted((self.rows(e, start, end) for e in entities), key=len)
+        if not lists:
+            return np.empty(0, dtype=np.uint32)
+        result = lists[0]
+        if len(lists) == 1:
+            return result
+        # Intersect from the rarest entity up; row ids are unique within a posting list
+        result = np.sort(result)
+        for other in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        with self._lock:
+            self._consolidate()
+            ts = self._timestamps[0][result]
+        return result[np.argsort(ts, kind="stable")]
+
+    def co_occurring(self, entity, start=None, end=None, kind=None, top=10):
+        """
+        Entities appearing most often in the same tweets as ``entity``.
+
+        Args:
+            kind: Only count "hashtag", "mention" or "author" entities
+            top: Number of entities returned
+
+        Returns:
+            list: (entity, tweets in common) pairs, most frequent first
+        """
+        rows = self.rows(entity, start, end).astype(np.int64)
+        with self._lock:
+            self._consolidate()
+            starts, stops = self._offsets[rows], self._offsets[rows + 1]
+            lengths = stops - starts
+            # Concatenated [start, stop) ranges of every row, without a Python loop
+            idx = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            counts = np.bincount(self._fwd_entities[0][idx], minlength=len(self.entities))
+            eid = self.entity_ids.get(entity.lower())
+            if eid is not None:
+                counts[eid] = 0
+            if kind is not None:
+                counts[np.asarray(self._kinds) != KINDS[kind]] = 0
+            best = np.argsort(-counts, kind="stable")[:top]
+            return [(self.entities[i], int(counts[i])) for i in best if counts[i]]
+
+    def entities_of(self, row):
+        """Entities of one tweet by row id."""
+        with self._lock:
+            self._consolidate()
+            ids = self._fwd_entities[0][self._offsets[row]:self._offsets[row + 1]]
+            return [self.entities[i] for i in ids]
+
+    def tweet_ids(self, rows):
+        """Tweet IDs (0 where unknown) of the given row ids."""
+        with self._lock:
+            self._consolidate()
+            return self._tweet_ids[0][np.asarray(rows, dtype=np.int64)]
+
+    def timestamps(self, rows):
+        with self._lock:
+            self._consolidate()
+            return self._timestamps[0][np.asarray(rows, dtype=np.int64)]
+
+    # ------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------
+    def save(self, directory=INDEX_DIR):
+        """
+        Persist the rows added since the last save as a new segment file.
+
+        The index is append-only, so a save costs time proportional to the
+        new tweets. Each segment holds its rows' timestamps, tweet IDs and
+        forward-index entries plus any entities first seen in them; posting
+        lists are rebuilt on load. Past COMPACT_SEGMENTS segments everything
+        is rewritten as one.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._consolidate()
+            segments = _segments(directory)
+            first_row = 0 if len(segments) >= COMPACT_SEGMENTS else self._saved_rows
+            if first_row == self.n_rows:
+                return
+            first_entity = 0 if first_row == 0 else self._saved_entities
+            lo, hi = self._offsets[first_row], self._offsets[-1]
+
+            name = f"segment-{first_row:012d}.npz"
+            tmp_path = os.path.join(directory, f".{name}.tmp.npz")
+            np.savez_compressed(tmp_path, first_entity=np.array([first_entity]),
+                                entities=np.array(self.entities[first_entity:], dtype=np.str_),
+                                timestamps=self._timestamps[0][first_row:],
+                                tweet_ids=self._tweet_ids[0][first_row:],
+                                fwd_entities=self._fwd_entities[0][lo:hi],
+                                counts=np.diff(self._offsets[first_row:]).astype(np.uint16))
+            os.replace(tmp_path, os.path.join(directory, name))
+            if first_row == 0:
+                for old in segments:
+                    if old != name:
+                        os.remove(os.path.join(directory, old))
+            self._saved_rows, self._saved_entities = self.n_rows, len(self.entities)
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR):
+        """Load a saved index, or start an empty one if ``directory`` does not exist."""
+        index = cls()
+        if not os.path.isdir(directory):
+            return index
+
+        timestamps, tweet_ids, fwd_entities, counts = [], [], [], []
+        for name in _segments(directory):
+            if int(name[len("segment-"):-len(".npz")]) < index.n_rows:
+                continue  # already covered by a compacted segment
+            with np.load(os.path.join(directory, name)) as data:
+                first_entity = int(data["first_entity"][0])
+                for entity in data["entities"].tolist()[len(index.entities) - first_entity:]:
+                    index._entity_id(entity)
+                timestamps.append(data["timestamps"])
+                tweet_ids.append(data["tweet_ids"])
+                fwd_entities.append(data["fwd_entities"])
+                counts.append(data["counts"].astype(np.int64))
+            index.n_rows += len(timestamps[-1])
+        if not timestamps:
+            return index
+
+        index._timestamps = [np.concatenate(timestamps)]
+        index._tweet_ids = [np.concatenate(tweet_ids)]
+        index._fwd_entities = [np.concatenate(fwd_entities).astype(np.int32)]
+        counts = np.concatenate(counts)
+        index._offsets = np.concatenate([[0], np.cumsum(counts)])
+        index._saved_rows, index._saved_entities = index.n_rows, len(index.entities)
+
+        eids = index._fwd_entities[0]
+        rows = np.repeat(np.arange(index.n_rows, dtype=np.uint32), counts)
+        ts = index._timestamps[0][rows]
+        order = np.lexsort((rows, ts, eids))
+        bounds = np.searchsorted(eids[order], np.arange(len(index.entities) + 1))
+        for eid in range(len(index.entities)):
+            group = order[bounds[eid]:bounds[eid + 1]]
+            index.postings[eid] = _Postings(rows[group], ts[group])
+        return index
+
+
+def _segments(directory):
+    return sorted(n for n in os.listdir(directory) if n.startswith("segment-") and n.endswith(".npz"))
+
+def _seconds(t):
+    if t is None or isinstance(t, (int, np.integer)):
+        return t
+    if isinstance(t, float):
+        return int(t)
+    return int(to_epoch_seconds([t])[0])
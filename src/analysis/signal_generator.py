@@ -1,13 +1,100 @@
 import numpy as np
 
-def generate_signals(X):
-    n = X.shape[0]
-    np.random.seed(42)
-    buy = np.random.randint(0, 2, size=n).tolist()
-    sell = [1-b for b in buy]
-    confidence = np.random.rand(n).tolist()
+from .vectorizer import hashed_feature_indices
+
+# Term weights applied to the TF-IDF columns; terms are words or two-word
+# phrases as they appear after cleaning (lowercase, no punctuation)
+BULLISH_TERMS = {
+    "bullish": 1.0, "breakout": 0.9, "buy": 0.8, "rally": 0.8, "uptrend": 0.8,
+    "higher high": 0.8, "gap up": 0.7, "upside": 0.7, "recovery": 0.6, "accumulate": 0.6,
+    "long": 0.5, "bounce": 0.5, "strong": 0.4, "support": 0.4, "green": 0.4, "ce": 0.3,
+}
+BEARISH_TERMS = {
+    "bearish": 1.0, "crash": 1.0, "breakdown": 0.9, "sell": 0.8, "dump": 0.8, "panic": 0.8,
+    "downtrend": 0.8, "lower low": 0.8, "gap down": 0.7, "downside": 0.7, "weak": 0.6,
+    "correction": 0.6, "profit booking": 0.6, "selling": 0.6, "short": 0.5, "fall": 0.5,
+    "resistance": 0.4, "red": 0.4, "pe": 0.3,
+}
+
+# Engagement columns and their weight in log1p space
+ENGAGEMENT_WEIGHTS = {"likes": 1.0, "retweets": 2.0, "views": 0.5}
+# How strongly engagement amplifies a tweet's score (0 disables it)
+ENGAGEMENT_GAIN = 0.1
+# Scales the lexicon score before it is squashed into [0, 1]
+SCORE_SCALE = 3.0
+BUY_THRESHOLD = 0.7
+SELL_THRESHOLD = 0.3
+
+
+def lexicon_weights(n_features, vectorizer=None, bullish=BULLISH_TERMS, bearish=BEARISH_TERMS):
+    """
+    Dense weight vector over the TF-IDF columns: bullish terms positive, bearish negative.
+
+    Args:
+        n_features: Number of columns in the TF-IDF matrix
+        vectorizer: Fitted TfidfVectorizer (terms looked up in vocabulary_),
+            IncrementalTfidf, or None for a hashed space of n_features columns
+    """
+    terms = list(bullish) + list(bearish)
+    values = np.array(list(bullish.values()) + [-v for v in bearish.values()])
+
+    if hasattr(vectorizer, "vocabulary_"):
+        columns = np.array([vectorizer.vocabulary_.get(t, -1) for t in terms], dtype=np.int64)
+    elif vectorizer is not None:
+        columns = vectorizer.feature_indices(terms)
+    else:
+        columns = hashed_feature_indices(terms, n_features)
+
+    known = columns >= 0
+    weights = np.zeros(n_features)
+    # Terms that hash to the same column add up
+    np.add.at(weights, columns[known], values[known])
+    return weights
+
+
+def engagement_boost(engagement, weights=ENGAGEMENT_WEIGHTS, gain=ENGAGEMENT_GAIN):
+    """
+    Per-row multiplier >= 1 that grows with log engagement.
+
+    Args:
+        engagement: DataFrame (or dict of arrays) with the ENGAGEMENT_WEIGHTS columns
+    """
+    total = 0.0
+    for column, weight in weights.items():
+        values = np.asarray(engagement[column], dtype=np.float64)
+        total = total + weight * np.log1p(np.clip(np.nan_to_num(values), 0, None))
+    return 1.0 + gain * total
+
+
+def generate_signals(X, vectorizer=None, engagement=None, weights=None):
+    """
+    Score every row of a TF-IDF matrix against the bullish/bearish lexicon.
+
+    One sparse matrix-vector product gives each tweet's net lexicon
+    activation; it is optionally amplified by engagement and squashed to a
+    confidence in [0, 1] (0.5 = neutral).
+
+    Args:
+        X: CSR TF-IDF matrix (rows = tweets)
+        vectorizer: The vectorizer X came from (see lexicon_weights)
+        engagement: Optional DataFrame with likes/retweets/views per row of X
+        weights: Precomputed lexicon_weights(...) to reuse across batches
+
+    Returns:
+        dict: NumPy arrays 'score' (net activation), 'confidence',
+            'buy' (confidence > BUY_THRESHOLD) and 'sell' (< SELL_THRESHOLD)
+    """
+    if weights is None:
+        weights = lexicon_weights(X.shape[1], vectorizer)
+
+    score = np.asarray(X @ weights).ravel()
+    if engagement is not None:
+        score *= engagement_boost(engagement)
+
+    confidence = 0.5 + 0.5 * np.tanh(SCORE_SCALE * score)
     return {
-        'buy': buy,
-        'sell': sell,
+        'score': score,
+        'buy': confidence > BUY_THRESHOLD,
+        'sell': confidence < SELL_THRESHOLD,
         'confidence': confidence
     }
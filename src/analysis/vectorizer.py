@@ -1,6 +1,113 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
+import os
+
+import numpy as np
+
+# scikit-learn (and scipy.stats, which it pulls in) takes about a second to
+# import, so it is loaded on first use: importing this module for its
+# constants or signal_generator's lexicon stays cheap.
+
+MODEL_FILE = "data/state/tfidf_model.npz"
+# Hashed feature space; fixed, so column j means the same term in every run
+N_FEATURES = 2 ** 20
+
 
 def compute_tfidf(corpus):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1,2))
     X = vectorizer.fit_transform(corpus)
     return X, vectorizer
+
+
+def hashed_feature_indices(terms, n_features=N_FEATURES):
+    """
+    Column of each term (a word or space-separated n-gram) in a hashed space.
+
+    Returns:
+        np.ndarray: int64 column indices, in the order of ``terms``
+    """
+    from sklearn.utils import murmurhash3_32
+
+    return np.array([abs(murmurhash3_32(t, positive=False)) % n_features for t in terms], dtype=np.int64)
+
+
+class IncrementalTfidf:
+    """
+    TF-IDF over a hashed unigram+bigram space with online document frequencies.
+
+    Terms are hashed into a fixed number of columns (no vocabulary to refit),
+    and IDF comes from document counts accumulated over every batch seen so
+    far. A new batch therefore costs time proportional to the batch, and
+    matrices from different runs share the same columns. Weighting matches
+    TfidfVectorizer's defaults (smooth IDF, L2-normalized rows).
+
+    Args:
+        n_features: Number of hashed columns
+        ngram_range: Word n-gram range, as in TfidfVectorizer
+    """
+
+    def __init__(self, n_features=N_FEATURES, ngram_range=(1, 2)):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.hasher = HashingVectorizer(n_features=n_features, ngram_range=self.ngram_range,
+                                        alternate_sign=False, norm=None)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+
+    @property
+    def idf(self):
+        return np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1.0
+
+    def partial_fit(self, corpus):
+        """Add a batch of documents to the document-frequency counts."""
+        self._update(self.hasher.transform(corpus))
+        return self
+
+    def transform(self, corpus):
+        """TF-IDF rows for ``corpus`` under the IDF accumulated so far (counts are not updated)."""
+        return self._weight(self.hasher.transform(corpus))
+
+    def partial_fit_transform(self, corpus):
+        """Count a new batch into the IDF, then return its TF-IDF rows (hashing it once)."""
+        counts = self.hasher.transform(corpus)
+        self._update(counts)
+        return self._weight(counts)
+
+    def feature_indices(self, terms):
+        """Hashed column of each term (see hashed_feature_indices)."""
+        return hashed_feature_indices(terms, self.n_features)
+
+    def _update(self, counts):
+        self.doc_freq += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += counts.shape[0]
+
+    def _weight(self, counts):
+        from sklearn.preprocessing import normalize
+
+        X = counts.astype(np.float64)
+        X.data *= self.idf[X.indices]
+        return normalize(X, norm="l2", copy=False)
+
+    def save(self, path=MODEL_FILE):
+        """Write the document counts atomically; only non-zero columns are stored."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        columns = np.flatnonzero(self.doc_freq)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, columns=columns, counts=self.doc_freq[columns],
+                            params=np.array([self.n_features, *self.ngram_range, self.n_docs]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        """Load a saved model, or start an empty one if ``path`` does not exist."""
+        if not os.path.exists(path):
+            return cls()
+
+        with np.load(path) as data:
+            n_features, ngram_min, ngram_max, n_docs = (int(p) for p in data["params"])
+            model = cls(n_features, (ngram_min, ngram_max))
+            model.doc_freq[data["columns"]] = data["counts"]
+        model.n_docs = n_docs
+        return model
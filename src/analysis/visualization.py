@@ -1,13 +1,140 @@
-import matplotlib.pyplot as plt
+import os
 
-def plot_sampled_signal(confidence, sample=50):
-    if len(confidence) > sample:
-        data = confidence[::len(confidence)//sample]
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax", "stride")
+
+
+def minmax_downsample(y, n_buckets):
+    """
+    Indices of the minimum and maximum of each of ``n_buckets`` equal buckets.
+
+    Keeps every spike in both directions; returns up to 2 * n_buckets sorted indices.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(buckets).all(axis=1)
+
+    offsets = np.arange(n_buckets)[valid] * size
+    lo = offsets + np.nanargmin(buckets[valid], axis=1)
+    hi = offsets + np.nanargmax(buckets[valid], axis=1)
+    return np.unique(np.concatenate([lo, hi]))
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of ``n_out`` points that keep the series' shape.
+
+    Each bucket keeps the point spanning the largest triangle with the point
+    kept from the previous bucket and the mean of the next one. Buckets are
+    scanned in order (each choice depends on the last), but the work inside
+    a bucket is one vectorized pass.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Relative x keeps float64 precision for nanosecond timestamps
+    x = np.asarray(x)
+    x = (x - x[0]).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Mean of every bucket, computed up front for the "next bucket" anchor
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample(x, y, n_points, method="lttb"):
+    """Indices of about ``n_points`` points of (x, y), chosen by ``method``."""
+    if method == "lttb":
+        return lttb_downsample(x, y, n_points)
+    if method == "minmax":
+        return minmax_downsample(y, max(1, n_points // 2))
+    if method == "stride":
+        return np.arange(0, len(y), max(1, len(y) // n_points))
+    raise ValueError(f"Unknown downsample method: {method}")
+
+
+def plot_sampled_signal(confidence, sample=50, path=None, timestamps=None, method="lttb"):
+    """
+    Plot the confidence series, downsampled to about ``sample`` points.
+
+    Args:
+        confidence: Confidence per tweet
+        sample: Number of points to draw
+        path: Write the chart here (.png, .svg, ... by extension) with a
+            non-interactive backend; None opens an interactive window instead
+        timestamps: Optional timestamp per tweet; the series is then sorted
+            and drawn against time instead of row order
+        method: "lttb", "minmax" (keeps every spike) or "stride"
+
+    Returns:
+        str: path written, or None in interactive mode
+    """
+    y = np.asarray(confidence, dtype=np.float64)
+    x = np.arange(len(y))
+    xlabel = "Sample Index"
+
+    if timestamps is not None:
+        ts = np.asarray(timestamps, dtype="datetime64[ns]")
+        keep = ~np.isnat(ts)
+        ts, y = ts[keep], y[keep]
+        x = ts.view(np.int64)
+        # Tweets arrive in scrape order; sorting the int64 view is much faster than datetime64
+        if len(x) and (np.diff(x) < 0).any():
+            order = np.argsort(x)
+            ts, x, y = ts[order], x[order], y[order]
+        xlabel = "Time (UTC)"
+
+    idx = downsample(x, y, sample, method)
+    x_plot = ts[idx] if timestamps is not None else x[idx]
+    y_plot = y[idx]
+
+    if path is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(10,4))
     else:
-        data = confidence
-    plt.figure(figsize=(10,4))
-    plt.plot(data, marker='o')
-    plt.title("Sampled Confidence Signal")
-    plt.xlabel("Sample Index")
-    plt.ylabel("Confidence")
-    plt.show()
+        fig = Figure(figsize=(10,4))
+        FigureCanvasAgg(fig)
+
+    ax = fig.add_subplot()
+    ax.plot(x_plot, y_plot, marker='o' if len(idx) <= 200 else None, linewidth=0.8)
+    ax.set_title(f"Sampled Confidence Signal ({len(idx)} of {len(y)} points, {method})")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Confidence")
+    if timestamps is not None:
+        fig.autofmt_xdate()
+
+    if path is None:
+        plt.show()
+        return None
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path)
+    return path
@@ -0,0 +1,244 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from processing.cleaner import clean
+from processing.instruments import extract_instruments, INSTRUMENT_FIELDS
+from analysis.vectorizer import IncrementalTfidf
+from analysis.signal_generator import generate_signals, lexicon_weights
+from monitoring.metrics import NullMetrics
+
+# Rows per task (whole row groups are never split); bounds each worker's memory
+TASK_ROWS = 200_000
+# Frozen IDF the workers load when it is fitted over the archive itself
+IDF_FILE = "_idf.npz"
+
+SIGNAL_FIELDS = [
+    pa.field("buy_signal", pa.bool_()),
+    pa.field("sell_signal", pa.bool_()),
+    pa.field("confidence", pa.float64()),
+]
+
+# Per-process state set up once by _init_worker
+_worker = {}
+
+
+def open_archive(path):
+    """Flat or Hive-partitioned (e.g. append_partitioned) Parquet dataset."""
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+
+def plan_tasks(path, task_rows=TASK_ROWS):
+    """
+    Split a Parquet file or dataset into tasks of consecutive row groups.
+
+    Only footers are read. A row group larger than ``task_rows`` becomes a
+    task of its own.
+
+    Returns:
+        list: (file path, [row group ids], rows, partition values) per task, in dataset order
+    """
+    tasks = []
+    for fragment in sorted(open_archive(path).get_fragments(), key=lambda f: f.path):
+        # Partition columns (such as searched_tag) live in the path, not the file
+        keys = {k: v for k, v in ds.get_partition_keys(fragment.partition_expression).items() if k != "date"}
+        metadata = pq.ParquetFile(fragment.path).metadata
+        groups, rows = [], 0
+        for i in range(metadata.num_row_groups):
+            n = metadata.row_group(i).num_rows
+            if groups and rows + n > task_rows:
+                tasks.append((fragment.path, groups, rows, keys))
+                groups, rows = [], 0
+            groups.append(i)
+            rows += n
+        if groups:
+            tasks.append((fragment.path, groups, rows, keys))
+    return tasks
+
+
+def output_schema(schema):
+    """Archive schema with a UTC timestamp column plus the instrument and signal columns."""
+    dropped = {"date", *(f.name for f in INSTRUMENT_FIELDS + SIGNAL_FIELDS)}
+    schema = pa.schema([f for f in schema if f.name not in dropped])
+    if "timestamp" in schema.names:
+        schema = schema.set(schema.get_field_index("timestamp"),
+                            pa.field("timestamp", pa.timestamp("us", tz="UTC")))
+    for field in INSTRUMENT_FIELDS + SIGNAL_FIELDS:
+        schema = schema.append(field)
+    return schema
+
+
+def _read_task(task, columns=None):
+    file, groups, _, keys = task
+    df = pq.ParquetFile(file).read_row_groups(groups, columns=columns).to_pandas()
+    if columns is None:
+        for key, value in keys.items():
+            df[key] = value
+    return df
+
+
+def _init_worker(model_path, schema):
+    tfidf = IncrementalTfidf.load(model_path)
+    _worker.update(tfidf=tfidf, weights=lexicon_weights(tfidf.n_features, tfidf), schema=schema)
+
+
+def _count_task(task, n_features, ngram_range):
+    """Pass 1: cleaned-document frequencies of one task, as (columns, counts, n_docs)."""
+    df = clean(_read_task(task, columns=["content", "timestamp"]), workers=1)
+    counts = IncrementalTfidf(n_features, ngram_range).hasher.transform(df["content"])
+    # Only the columns that occur are sent back, not the whole n_features array
+    columns, freq = np.unique(counts.indices, return_counts=True)
+    return columns, freq, counts.shape[0]
+
+
+def _score_task(index, task, directory):
+    """Pass 2: clean, vectorize and score one task and write it as part-<index>.parquet."""
+    path = os.path.join(directory, f"part-{index:06d}.parquet")
+    if os.path.exists(path):
+        done = pq.read_table(path, columns=["buy_signal", "sell_signal"])
+        return {"rows_in": task[2], "rows_out": done.num_rows, "skipped": True,
+                "buy": pc.sum(done["buy_signal"]).as_py() or 0, "sell": pc.sum(done["sell_signal"]).as_py() or 0}
+
+    started = time.perf_counter()
+    schema = _worker["schema"]
+    df = extract_instruments(clean(_read_task(task), workers=1))
+    signals = generate_signals(_worker["tfidf"].transform(df["content"]), engagement=df, weights=_worker["weights"])
+    df["buy_signal"] = signals["buy"]
+    df["sell_signal"] = signals["sell"]
+    df["confidence"] = signals["confidence"]
+
+    table = pa.Table.from_pandas(df, preserve_index=False).select(schema.names).cast(schema)
+    tmp_path = os.path.join(directory, f".part-{index:06d}.parquet.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return {"rows_in": task[2], "rows_out": len(df), "buy": int(signals["buy"].sum()),
+            "sell": int(signals["sell"].sum()), "seconds": time.perf_counter() - started}
+
+
+def _run_bounded(executor, fn, jobs, in_flight):
+    """Submit jobs keeping at most ``in_flight`` pending; yields results as they finish."""
+    pending = set()
+    for args in jobs:
+        if len(pending) >= in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, *args))
+    for future in wait(pending).done:
+        yield future.result()
+
+
+def fit_idf(tasks, executor, in_flight, n_features=None, ngram_range=(1, 2)):
+    """Document frequencies over every task, summed into a new IncrementalTfidf."""
+    tfidf = IncrementalTfidf(n_features or IncrementalTfidf().n_features, ngram_range)
+    jobs = ((task, tfidf.n_features, tfidf.ngram_range) for task in tasks)
+    for columns, freq, n_docs in _run_bounded(executor, _count_task, jobs, in_flight):
+        tfidf.doc_freq[columns] += freq
+        tfidf.n_docs += n_docs
+    return tfidf
+
+
+def backfill(archive, output_dir, workers=None, model_path=None, task_rows=TASK_ROWS, metrics=None):
+    """
+    Re-clean, re-vectorize and re-score an archive after a model change.
+
+    The archive is split into tasks of whole row groups, and a process pool
+    runs clean -> instruments -> TF-IDF -> generate_signals on one task at a time per
+    worker, writing each result as its own part file. Memory is bounded by
+    the task size and worker count, not the archive size; the parent only
+    holds task metadata.
+
+    All shards share one frozen IDF, so a tweet scores the same whichever
+    worker handles it: a saved IncrementalTfidf model or, by default,
+    document frequencies counted over the whole archive in a first parallel
+    pass (hashed features need no vocabulary, so the counts simply add up).
+
+    Part files are named by task, so an interrupted backfill resumes where it
+    stopped when run again with the same arguments. Duplicates are dropped
+    within each task; archived outputs were already deduplicated per run.
+
+    Args:
+        archive: Parquet file or dataset directory with at least content and timestamp
+        output_dir: Directory for the scored dataset
+        workers: Worker processes (default: CPU count)
+        model_path: Frozen IncrementalTfidf to score with; None fits the IDF
+            over the archive first (saved as output_dir/_idf.npz)
+        task_rows: Target rows per task
+        metrics: RunMetrics for "fit_idf" and "score" stages
+
+    Returns:
+        dict: rows_in, rows_out, buy, sell, tasks, skipped_tasks, seconds
+    """
+    metrics = metrics if metrics is not None else NullMetrics()
+    workers = workers or os.cpu_count() or 1
+    in_flight = 2 * workers
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = plan_tasks(archive, task_rows)
+    schema = output_schema(open_archive(archive).schema)
+    total_rows = sum(t[2] for t in tasks)
+    print(f"📦 {total_rows:,} rows in {len(tasks)} tasks, {workers} worker processes")
+
+    # Spawned workers do not inherit the parent's Arrow/BLAS thread pools
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+
+    idf_path = os.path.join(output_dir, IDF_FILE)
+    if model_path is None:
+        if os.path.exists(idf_path):
+            print(f"🔁 Reusing IDF from an earlier attempt: {idf_path}")
+        else:
+            print("🔢 Counting document frequencies over the archive...")
+            with metrics.stage("fit_idf", rows_in=total_rows) as stage:
+                with ProcessPoolExecutor(workers, mp_context=context) as executor:
+                    tfidf = fit_idf(tasks, executor, in_flight)
+                tfidf.save(idf_path)
+                stage.rows_out = tfidf.n_docs
+            print(f"✅ IDF over {tfidf.n_docs:,} tweets")
+        model_path = idf_path
+
+    totals = {"rows_in": 0, "rows_out": 0, "buy": 0, "sell": 0, "tasks": len(tasks), "skipped_tasks": 0}
+    print("📊 Scoring...")
+    with metrics.stage("score", rows_in=total_rows) as stage:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(model_path, schema)) as executor:
+            jobs = ((i, task, output_dir) for i, task in enumerate(tasks))
+            for done, result in enumerate(_run_bounded(executor, _score_task, jobs, in_flight), 1):
+                for key in ("rows_in", "rows_out", "buy", "sell"):
+                    totals[key] += result.get(key, 0)
+                totals["skipped_tasks"] += result.get("skipped", False)
+                logging.info(f"backfill task {done}/{len(tasks)}: {result}")
+        stage.rows_out = totals["rows_out"]
+
+    totals["seconds"] = time.perf_counter() - started
+    return totals
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-clean and re-score an archive of tweets")
+    parser.add_argument("archive", help="Parquet file or directory of Parquet files")
+    parser.add_argument("output", help="directory for the scored dataset")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--model", default=None,
+                        help="frozen TF-IDF model to score with (default: fit IDF over the archive)")
+    parser.add_argument("--task-rows", type=int, default=TASK_ROWS)
+    args = parser.parse_args()
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(filename="logs/backfill.log", level=logging.INFO)
+
+    result = backfill(args.archive, args.output, args.workers, args.model, args.task_rows)
+    print(f"✅ {result['rows_out']:,} of {result['rows_in']:,} tweets scored in {result['seconds']:.1f} s "
+          f"({result['rows_in'] / max(result['seconds'], 1e-9):,.0f} rows/sec): "
+          f"{result['buy']:,} buy / {result['sell']:,} sell"
+          + (f", {result['skipped_tasks']} tasks already done" if result["skipped_tasks"] else ""))
@@ -0,0 +1,544 @@
+import copy
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from scraper.twitter_scraper import HASHTAGS, SCROLL_LIMIT
+from scraper.pool import DriverPool, scrape_parallel
+from scraper.scheduler import HashtagScheduler, RateLimitError
+from scraper.state import HighWaterMarks
+from scraper.dedup import DedupIndex, INDEX_FILE
+from processing.storage import append_partitioned
+from analysis.vectorizer import IncrementalTfidf
+from monitoring.metrics import PROMETHEUS_PREFIX
+from streaming import StreamingAnalyzer
+
+LIVE_DIR = "data/live"
+# Durable record of every signal, queryable while the daemon runs
+JOURNAL_FILE = os.path.join(LIVE_DIR, "signals.sqlite")
+JOURNAL_DAYS = 7
+# Scored batches are pushed to connected clients as an Arrow IPC stream;
+# a TCP port on 127.0.0.1 stands in where Unix sockets are unavailable
+SOCKET_PATH = os.path.join(LIVE_DIR, "signals.sock")
+SIGNAL_PORT = 8788
+HEALTH_PORT = 8787
+# Batches a slow client may fall behind before it is disconnected
+CLIENT_QUEUE = 256
+# Scored tweets are appended to the partitioned dataset (and state saved) this often
+FLUSH_SECONDS = 5 * 60
+SIGNALS_DATASET = "data/processed/tweet_signals"
+
+# Health turns "degraded" (HTTP 503) when the p95 scrape-to-signal latency
+# over the last LATENCY_WINDOW batches exceeds LAG_ALERT_SECONDS, or when no
+# poll has succeeded for STALL_SECONDS
+LATENCY_WINDOW = 256
+LAG_ALERT_SECONDS = 30
+STALL_SECONDS = 15 * 60
+THROUGHPUT_WINDOW = 5 * 60
+
+SIGNAL_SCHEMA = pa.schema([
+    ("tweet_id", pa.string()),
+    ("searched_tag", pa.string()),
+    ("username", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("content", pa.string()),
+    ("buy_signal", pa.bool_()),
+    ("sell_signal", pa.bool_()),
+    ("confidence", pa.float64()),
+    ("scored_at", pa.timestamp("us", tz="UTC")),
+    ("latency_seconds", pa.float64()),
+])
+
+
+def signal_batch(df, latency, scored_at=None):
+    """Arrow RecordBatch (SIGNAL_SCHEMA) of a scored DataFrame."""
+    scored_at = scored_at if scored_at is not None else time.time()
+    out = df[[n for n in SIGNAL_SCHEMA.names if n in df.columns]].copy()
+    out["timestamp"] = pd.to_datetime(out["timestamp"], utc=True, errors="coerce").dt.floor("us")
+    out["scored_at"] = pd.Timestamp(int(scored_at * 1e6), unit="us", tz="UTC")
+    out["latency_seconds"] = latency
+    return pa.RecordBatch.from_pandas(out, schema=SIGNAL_SCHEMA, preserve_index=False)
+
+
+class SignalJournal:
+    """
+    SQLite journal of every signal, in WAL mode so readers never block the daemon.
+
+    Other processes can catch up with e.g.
+    ``SELECT * FROM signals WHERE scored_at > ? ORDER BY scored_at``.
+
+    Args:
+        path: Database file
+        keep_days: Signals older than this (by scored_at) are pruned on open
+    """
+
+    def __init__(self, path=JOURNAL_FILE, keep_days=JOURNAL_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Written from the analyzer thread, read from the health server's
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS signals (
+                    tweet_id TEXT, searched_tag TEXT, username TEXT, timestamp REAL, content TEXT,
+                    buy_signal INTEGER, sell_signal INTEGER, confidence REAL, scored_at REAL, latency_seconds REAL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS signals_scored_at ON signals (scored_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS signals_tag_time ON signals (searched_tag, timestamp)")
+            self._conn.execute("DELETE FROM signals WHERE scored_at < ?", (time.time() - keep_days * 86400,))
+
+    def append(self, batch):
+        """Insert a SIGNAL_SCHEMA batch in one transaction (times as epoch seconds)."""
+        columns = batch.to_pydict()
+        for name in ("timestamp", "scored_at"):
+            columns[name] = [t.timestamp() if t is not None else None for t in columns[name]]
+        rows = zip(*(columns[n] for n in SIGNAL_SCHEMA.names))
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO signals VALUES ({', '.join('?' * len(SIGNAL_SCHEMA))})", rows)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SignalBroadcaster:
+    """
+    Pushes every scored batch to connected clients as an Arrow IPC stream.
+
+    Each client gets the schema on connect and then one record batch per
+    scored batch, as soon as it is scored. Every client has its own bounded
+    queue and writer thread, so a slow or stuck client is disconnected
+    instead of delaying the analyzer.
+
+    Read it with::
+
+        sock = socket.socket(socket.AF_UNIX)
+        sock.connect("data/live/signals.sock")
+        for batch in pa.ipc.open_stream(sock.makefile("rb")):
+            ...
+
+    Args:
+        path: Unix socket path (used where AF_UNIX exists)
+        port: TCP port on 127.0.0.1 used otherwise
+    """
+
+    def __init__(self, path=SOCKET_PATH, port=SIGNAL_PORT):
+        if hasattr(socket, "AF_UNIX"):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(path)
+            self.address = self.path = path
+        else:
+            self.path = None
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.bind(("127.0.0.1", port))
+            self.address = f"127.0.0.1:{self.server.getsockname()[1]}"
+        self.server.listen()
+        self.clients = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept, name="signal-accept", daemon=True).start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            client = queue.Queue(maxsize=CLIENT_QUEUE)
+            with self._lock:
+                self.clients[conn] = client
+            threading.Thread(target=self._serve, args=(conn, client), name="signal-client", daemon=True).start()
+
+    def _serve(self, conn, client):
+        try:
+            with conn.makefile("wb") as f, pa.ipc.new_stream(f, SIGNAL_SCHEMA) as writer:
+                f.flush()
+                while True:
+                    batch = client.get()
+                    if batch is None:
+                        break
+                    writer.write_batch(batch)
+                    f.flush()
+        except (OSError, ValueError) as e:
+            logging.info(f"Signal client disconnected: {e}")
+        finally:
+            with self._lock:
+                self.clients.pop(conn, None)
+            conn.close()
+
+    def publish(self, batch):
+        with self._lock:
+            clients = list(self.clients.items())
+        for conn, client in clients:
+            try:
+                client.put_nowait(batch)
+            except queue.Full:
+                logging.warning("Signal client fell behind; disconnecting it")
+                self.dropped += 1
+                with self._lock:
+                    self.clients.pop(conn, None)
+                try:
+                    # Unblocks its writer thread, which then closes the socket
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._closed = True
+        self.server.close()
+        with self._lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            try:
+                client.put_nowait(None)
+            except queue.Full:
+                pass
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class DaemonHealth:
+    """
+    Thread-safe counters and latency samples behind the health endpoint.
+
+    Two latencies are tracked per scored batch: scrape-to-signal (from the
+    scraper handing the batch over to its signals being published) and
+    tweet-to-signal (from the newest tweet's own timestamp).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.tweet_ages = deque(maxlen=LATENCY_WINDOW)
+        self.scored = deque()
+        self.counters = {"polls": 0, "poll_errors": 0, "rate_limits": 0, "tweets_scraped": 0,
+                         "tweets_scored": 0, "batches_scored": 0}
+        self.last_poll = None
+        self.last_scored = None
+        self.last_error = None
+
+    def record_poll(self, tag, tweets, error=None):
+        with self._lock:
+            self.counters["polls"] += 1
+            if error is None:
+                self.counters["tweets_scraped"] += tweets
+                self.last_poll = time.time()
+            else:
+                self.counters["rate_limits" if isinstance(error, RateLimitError) else "poll_errors"] += 1
+                self.last_error = f"{tag}: {error}"
+
+    def record_batch(self, rows, latency, newest_tweet=None):
+        now = time.time()
+        with self._lock:
+            self.counters["tweets_scored"] += rows
+            self.counters["batches_scored"] += 1
+            self.latencies.append(latency)
+            if newest_tweet is not None:
+                self.tweet_ages.append(now - newest_tweet)
+            self.last_scored = now
+            self.scored.append((now, rows))
+            while self.scored and self.scored[0][0] < now - THROUGHPUT_WINDOW:
+                self.scored.popleft()
+
+    def snapshot(self, analyzer=None):
+        """Status ("ok", "degraded", "failed"), the reasons, counters, latency percentiles and throughput."""
+        now = time.time()
+        with self._lock:
+            latencies = np.array(self.latencies)
+            ages = np.array(self.tweet_ages)
+            recent = sum(rows for t, rows in self.scored if t >= now - THROUGHPUT_WINDOW)
+            state = {
+                "uptime_seconds": round(now - self.started, 1),
+                **self.counters,
+                "seconds_since_last_poll": round(now - self.last_poll, 1) if self.last_poll else None,
+                "seconds_since_last_signal": round(now - self.last_scored, 1) if self.last_scored else None,
+                "tweets_per_minute": round(recent * 60 / min(THROUGHPUT_WINDOW, max(now - self.started, 1)), 1),
+                "last_error": self.last_error,
+            }
+
+        for name, values in (("latency", latencies), ("tweet_age", ages)):
+            for q in (50, 95):
+                state[f"{name}_p{q}_seconds"] = round(float(np.percentile(values, q)), 3) if len(values) else None
+            state[f"{name}_max_seconds"] = round(float(values.max()), 3) if len(values) else None
+
+        reasons = []
+        if analyzer is not None:
+            state["queued_batches"] = analyzer.pending
+            if analyzer.error is not None:
+                reasons.append(f"analyzer failed: {analyzer.error}")
+        if state["latency_p95_seconds"] is not None and state["latency_p95_seconds"] > LAG_ALERT_SECONDS:
+            reasons.append(f"p95 scrape-to-signal latency {state['latency_p95_seconds']:.1f} s > {LAG_ALERT_SECONDS} s")
+        since_poll = state["seconds_since_last_poll"] if self.last_poll else state["uptime_seconds"]
+        if since_poll > STALL_SECONDS:
+            reasons.append(f"no successful poll for {since_poll:.0f} s")
+
+        failed = analyzer is not None and analyzer.error is not None
+        state["status"] = "failed" if failed else "degraded" if reasons else "ok"
+        state["reasons"] = reasons
+        return state
+
+    def prometheus(self, analyzer=None):
+        p = PROMETHEUS_PREFIX
+        state = self.snapshot(analyzer)
+        lines = []
+        for name in self.counters:
+            lines += [f"# TYPE {p}_daemon_{name}_total counter", f"{p}_daemon_{name}_total {state[name]}"]
+        gauges = ["uptime_seconds", "tweets_per_minute", "seconds_since_last_poll", "seconds_since_last_signal",
+                  "latency_p50_seconds", "latency_p95_seconds", "latency_max_seconds",
+                  "tweet_age_p50_seconds", "tweet_age_p95_seconds", "queued_batches"]
+        for name in gauges:
+            if state.get(name) is not None:
+                lines += [f"# TYPE {p}_daemon_{name} gauge", f"{p}_daemon_{name} {state[name]}"]
+        lines += [f"# TYPE {p}_daemon_healthy gauge", f"{p}_daemon_healthy {int(state['status'] == 'ok')}"]
+        return "\n".join(lines) + "\n"
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        collector = self.server.collector
+        path = self.path.split("?")[0]
+        if path == "/health":
+            state = collector.health.snapshot(collector.analyzer)
+            self._send(200 if state["status"] == "ok" else 503, json.dumps(state, indent=2))
+        elif path == "/metrics":
+            self._send(200, collector.health.prometheus(collector.analyzer), "text/plain; version=0.0.4")
+        elif path == "/snapshot":
+            windows = collector.analyzer.windows.snapshot() if collector.analyzer else {}
+            self._send(200, json.dumps({"instruments": windows, "schedule": collector.schedule()}, indent=2,
+                                       default=float))
+        else:
+            self._send(404, json.dumps({"error": "not found", "endpoints": ["/health", "/metrics", "/snapshot"]}))
+
+
+class CollectorDaemon:
+    """
+    Long-running collector: warm browsers and vectorizer, continuous polling, live signal output.
+
+    Browsers log in once from the saved session (never prompting) and stay
+    open. One StreamingAnalyzer keeps the TF-IDF model in memory and scores
+    every scroll's tweets as they arrive. The HashtagScheduler decides which
+    hashtags are due and paces every request.
+
+    Every scored batch is pushed to the SignalBroadcaster socket and the
+    SignalJournal as soon as it is scored. Every FLUSH_SECONDS the batches
+    are also appended to the partitioned signals dataset, and the model,
+    dedup index and marks are saved. Polls search from the marks of the polls
+    before them, but the saved marks only advance past a poll once all of its
+    tweets are in the dataset, so a crash before a flush repeats the poll
+    rather than skipping its tweets. Health, latency and throughput are
+    served over HTTP.
+
+    Args:
+        workers: Browser sessions polling in parallel
+        hashtags: Hashtags to poll
+        lean: Run the browsers without images, media, fonts and analytics
+        headless: Run the browsers headless
+        health_port: Port of the health endpoint on 127.0.0.1
+        flush_seconds: Interval for appending to the dataset and saving state
+    """
+
+    def __init__(self, workers=1, hashtags=HASHTAGS, lean=True, headless=True, health_port=HEALTH_PORT,
+                 flush_seconds=FLUSH_SECONDS):
+        self.workers = workers
+        self.hashtags = list(hashtags)
+        self.lean = lean
+        self.headless = headless
+        self.health_port = health_port
+        self.flush_seconds = flush_seconds
+        self.health = DaemonHealth()
+        self.scheduler = HashtagScheduler(self.hashtags, scroll_limit=SCROLL_LIMIT)
+        self.marks = HighWaterMarks()
+        # Marks including polls not flushed yet, which the next polls search from
+        self.polled_marks = HighWaterMarks(path=None)
+        self.polled_marks.marks = copy.deepcopy(self.marks.marks)
+        # Staged, so a save only holds tweets of polls already flushed to the dataset
+        self.dedup = DedupIndex(INDEX_FILE, staged=True)
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.analyzer = None
+        self.pool = None
+        self.journal = None
+        self.broadcaster = None
+        self.http = None
+        self._stop = threading.Event()
+        self._scored = []
+        self._scored_lock = threading.Lock()
+        self._flushes = 0
+        # (tag, tweets, analyzer batches queued and dedup mark when the poll ended) of polls awaiting a flush
+        self._unflushed_polls = []
+
+    def schedule(self):
+        now = time.time()
+        return [{"hashtag": tag, "yield": self.scheduler.yield_of(tag),
+                 "due_in_seconds": round(max(0.0, self.scheduler.next_due(tag) - now), 1),
+                 "scroll_limit": self.scheduler.scroll_limit(tag)} for tag in self.scheduler.ranking()]
+
+    # ------------------------------------------
+    # SIGNAL OUTPUT
+    # ------------------------------------------
+    def _on_scored(self, df, latency):
+        # Runs on the analyzer thread, right after the batch is scored
+        batch = signal_batch(df, latency)
+        self.broadcaster.publish(batch)
+        self.journal.append(batch)
+        newest = pd.to_datetime(df["timestamp"], utc=True, errors="coerce").max()
+        self.health.record_batch(len(df), latency, None if pd.isna(newest) else newest.timestamp())
+        with self._scored_lock:
+            self._scored.append(df)
+
+    def _on_batch(self, tag, tweets, next_scroll):
+        # Blocks while the analyzer is behind, pausing this scraper
+        self.analyzer.submit(tweets)
+
+    def flush(self):
+        """Append scored batches to the signals dataset and save the model, dedup index and marks."""
+        # Every batch counted here has already reached self._scored
+        done = self.analyzer.batches_done
+        with self._scored_lock:
+            frames, self._scored = self._scored, []
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+            self._flushes += 1
+            append_partitioned(df, SIGNALS_DATASET, f"{self.run_id}-{self._flushes:05d}")
+            logging.info(f"daemon: appended {len(df)} signals to {SIGNALS_DATASET}")
+        self.analyzer.save_model()
+
+        # Only polls whose every batch is now in the dataset move the saved dedup index and marks, in poll order
+        flushed = [p for p in self._unflushed_polls if p[2] <= done]
+        self._unflushed_polls = [p for p in self._unflushed_polls if p[2] > done]
+        for tag, _, _, dedup_mark in flushed:
+            self.dedup.commit(tag, dedup_mark)
+        self.dedup.save()
+        for tag, tweets, _, _ in flushed:
+            self.marks.advance(tag, tweets, truncated=tweets.truncated)
+
+    # ------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------
+    def start(self):
+        """Open the sinks, health endpoint, analyzer and logged-in browsers."""
+        self.journal = SignalJournal()
+        self.broadcaster = SignalBroadcaster()
+        self.http = ThreadingHTTPServer(("127.0.0.1", self.health_port), _HealthHandler)
+        self.http.collector = self
+        threading.Thread(target=self.http.serve_forever, name="health", daemon=True).start()
+        self.analyzer = StreamingAnalyzer(None, IncrementalTfidf.load(), on_scored=self._on_scored)
+
+        print(f"🚀 Starting {self.workers} browser session(s)...")
+        self.pool = DriverPool(self.workers, headless=self.headless, lean=self.lean, dedup=self.dedup,
+                               throttle=self.scheduler.throttle)
+        for scraper in self.pool.scrapers:
+            scraper.login(interactive=False)
+
+        print(f"📡 Signals: {self.broadcaster.address} (Arrow IPC stream), journal {self.journal.path}")
+        print(f"🩺 Health: http://127.0.0.1:{self.health_port}/health (also /metrics, /snapshot)")
+
+    def poll_once(self):
+        """Poll every due hashtag once across the pool; returns the hashtags polled."""
+        due = self.scheduler.due()
+        if not due:
+            return []
+        results = scrape_parallel(self.pool, due, delay=0, on_batch=self._on_batch,
+                                  tag_kwargs={tag: {"scroll_limit": self.scheduler.scroll_limit(tag),
+                                                    **self.polled_marks.query(tag)} for tag in due})
+        for tag, tweets, error in results:
+            self.health.record_poll(tag, len(tweets) if tweets is not None else 0, error)
+            if error is not None:
+                self.scheduler.record_error(tag, error)
+                continue
+            self.scheduler.record(tag, len(tweets))
+            # Every batch of the poll was submitted before scrape_parallel returned it
+            self.polled_marks.advance(tag, tweets, truncated=tweets.truncated)
+            self._unflushed_polls.append((tag, tweets, self.analyzer.batches_queued, self.dedup.mark()))
+        return due
+
+    def run(self):
+        """Poll until stop() (or SIGINT/SIGTERM), then shut down cleanly."""
+        self.start()
+        last_flush = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if not self.poll_once():
+                    # Nothing due: sleep until the next hashtag is, but stay responsive to stop()
+                    wait = min(self.scheduler.next_due(t) for t in self.hashtags) - time.time()
+                    self._stop.wait(min(max(wait, 0.5), 5))
+                if time.monotonic() - last_flush >= self.flush_seconds:
+                    self.flush()
+                    last_flush = time.monotonic()
+        finally:
+            self.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+        if self.analyzer:
+            try:
+                self.analyzer.close()
+            except Exception as e:
+                print(f"⚠️ {e}")
+            self.flush()
+        for sink in (self.broadcaster, self.journal):
+            if sink:
+                sink.close()
+        if self.http:
+            self.http.shutdown()
+            self.http.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Poll hashtags continuously and publish signals as they are scored")
+    parser.add_argument("--workers", type=int, default=1, help="browser sessions polling in parallel")
+    parser.add_argument("--port", type=int, default=HEALTH_PORT, help="health endpoint port on 127.0.0.1")
+    parser.add_argument("--show-browser", action="store_true", help="run the browsers with a window")
+    parser.add_argument("--full", action="store_true", help="load images, media and fonts (default: lean browsers)")
+    args = parser.parse_args()
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(filename="logs/daemon.log", level=logging.INFO)
+
+    daemon = CollectorDaemon(args.workers, lean=not args.full, headless=not args.show_browser, health_port=args.port)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("\n⚠️ Stopping...")
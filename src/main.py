@@ -1,81 +1,320 @@
-import pandas as pd
+import glob
+import hashlib
+import os
+import shutil
+import sys
 import time
-from scraper.twitter_scraper import TweetScraper, HASHTAGS
+# The scraper (Selenium) and plotting (matplotlib) layers are imported inside the
+# functions that use them, so `main.py process` never loads either
+from scraper.scheduler import HashtagScheduler, RateLimitError
+from scraper.checkpoint import ScrapeCheckpoint
+from scraper.state import HighWaterMarks
+from scraper.dedup import DedupIndex, INDEX_FILE
 
 # Remove this import since we're extracting in the scraper now
 # from scraper.utils import extract_text_entities
 
 from processing.cleaner import clean
-from processing.storage import save_parquet
-from analysis.vectorizer import compute_tfidf
+from processing.instruments import extract_instruments
+from processing.storage import (append_partitioned, ParquetStreamWriter, read_dataset, read_partitioned,
+                                iter_parquet_batches)
+from analysis.vectorizer import IncrementalTfidf, MODEL_FILE
 from analysis.signal_generator import generate_signals
-from analysis.visualization import plot_sampled_signal
+from analysis.aggregator import WindowedSentiment
+from analysis.entity_index import EntityIndex
+from monitoring.metrics import RunMetrics
+from streaming import StreamingAnalyzer
+
+# Scraped tweets are streamed here while the run is in progress
+RUN_DIR = "data/raw/current_run"
+# Tweets cleaned and scored during the scrape (--stream)
+SCORED_DIR = os.path.join(RUN_DIR, "signals")
+SIGNAL_COLUMNS = ["buy_signal", "sell_signal", "confidence"]
+INSTRUMENT_COLUMNS = ["instrument", "strike", "option_type"]
+# Every run is appended to these, partitioned by date and searched_tag
+CLEANED_DATASET = "data/processed/tweets_cleaned"
+SIGNALS_DATASET = "data/processed/tweet_signals"
+# Times a rate-limited hashtag is retried (after the backoff) within one run
+RATE_LIMIT_RETRIES = 3
+
+
+def open_run(run_dir=RUN_DIR):
+    """
+    Open the streamed dataset and checkpoint of the current run.
+
+    An unfinished run left behind by a crash or Ctrl-C is resumed; a
+    finished one is cleared so the next run starts empty.
+    """
+    checkpoint = ScrapeCheckpoint(os.path.join(run_dir, "checkpoint.json"))
+    if checkpoint.finished:
+        shutil.rmtree(run_dir)
+        checkpoint = ScrapeCheckpoint(os.path.join(run_dir, "checkpoint.json"))
+    elif checkpoint.completed or checkpoint.progress:
+        print(f"\n⏩ Resuming interrupted run: {len(checkpoint.completed)} hashtags already done")
+
+    writer = ParquetStreamWriter(os.path.join(run_dir, "tweets"))
+    return writer, checkpoint
+
+
+def persist_batches(writer, checkpoint, analyzer=None):
+    """
+    on_batch callback that streams tweets to disk and checkpoints each flush,
+    then hands them to the streaming analyzer (if any).
+    """
+    totals = {tag: p.get("tweets", 0) for tag, p in checkpoint.progress.items()}
+
+    def on_batch(tag, tweets, next_scroll):
+        totals[tag] = totals.get(tag, 0) + len(tweets)
+        if writer.write(tweets):
+            checkpoint.update(tag, next_scroll, totals[tag])
+        if analyzer is not None:
+            # Blocks while the analyzer is behind, pausing this scraper
+            analyzer.submit(tweets)
+
+    return on_batch
+
+
+def finish_hashtag(writer, checkpoint, marks, dedup, tag, tweets):
+    writer.flush()
+    checkpoint.mark_done(tag)
+    # Only advance once the tweets are safely on disk
+    marks.advance(tag, tweets or [], truncated=getattr(tweets, "truncated", False))
+    dedup.save()
+
+
+def report_hashtag(tag, tweets, total):
+    print(f"✅ Collected {len(tweets)} tweets for {tag}")
+    print(f"📊 Total so far: {total} tweets")
+
+    # Show sample with all new fields
+    sample = tweets[0]
+    print("\n📝 Sample tweet:")
+    print(f"   Content: {sample['content'][:80]}...")
+    print(f"   Username: @{sample['username']}")
+    print(f"   Likes: {sample['likes']}, Retweets: {sample['retweets']}")
+    print(f"   Hashtags: {sample['hashtags'][:3]}")
+    print(f"   Mentions: {sample['mentions'][:3]}")
+
+
+def pending_hashtags(hashtags, checkpoint):
+    pending = [tag for tag in hashtags if not checkpoint.is_done(tag)]
+    if len(pending) < len(hashtags):
+        print(f"⏭️ Skipping {len(hashtags) - len(pending)} hashtags already collected in this run")
+    return pending
+
+
+def retry_rate_limited(scheduler, attempts, tag, error):
+    """Back off after a rate limit; returns True while the hashtag has retries left."""
+    delay = scheduler.record_error(tag, error)
+    attempts[tag] = attempts.get(tag, 0) + 1
+    if attempts[tag] > RATE_LIMIT_RETRIES:
+        print(f"❌ Still rate limited on {tag} after {RATE_LIMIT_RETRIES} retries, giving up for this run")
+        return False
+    print(f"🛑 Rate limited on {tag}. Pausing requests for {delay:.0f} s, then resuming where it stopped")
+    return True
+
+
+def collect_serial(scraper, hashtags, writer, checkpoint, marks, dedup, scheduler, analyzer=None):
+    """
+    Poll due hashtags one at a time, busiest first, paced by the scheduler.
+
+    Returns:
+        (list, list): failed hashtags, and hashtags not due yet
+    """
+    total = 0
+    failed_hashtags = []
+    on_batch = persist_batches(writer, checkpoint, analyzer)
+    pending = pending_hashtags(hashtags, checkpoint)
+    attempts = {}
+    polls = 0
+
+    while pending:
+        due = scheduler.due(pending)
+        if not due:
+            break
+        tag = due[0]
+        polls += 1
+        rate = scheduler.yield_of(tag)
+        print(f"\n{'='*50}")
+        print(f"📍 Poll {polls}: {tag} ({'new' if rate is None else f'{rate:.1f} new tweets/request'}, "
+              f"up to {scheduler.scroll_limit(tag)} scrolls), {len(pending) - 1} more pending")
+        print('='*50)
+
+        try:
+            tweets = scraper.search_and_scrape(tag, on_batch=on_batch, start_scroll=checkpoint.resume_scroll(tag),
+                                               scroll_limit=scheduler.scroll_limit(tag), **marks.query(tag))
+        except RateLimitError as e:
+            if not retry_rate_limited(scheduler, attempts, tag, e):
+                pending.remove(tag)
+                failed_hashtags.append(tag)
+            continue
+        except Exception as e:
+            print(f"❌ Error with {tag}: {str(e)}")
+            scheduler.record_error(tag, e)
+            pending.remove(tag)
+            failed_hashtags.append(tag)
+            continue
+
+        pending.remove(tag)
+        scheduler.record(tag, len(tweets))
+        finish_hashtag(writer, checkpoint, marks, dedup, tag, tweets)
+
+        if tweets:
+            total += len(tweets)
+            report_hashtag(tag, tweets, total)
+        elif marks.since_id(tag):
+            print(f"💤 No new tweets for {tag} since the last run")
+        else:
+            print(f"⚠️ No tweets found for {tag}")
+            failed_hashtags.append(tag)
+
+    return failed_hashtags, pending
+
+
+def collect_parallel(hashtags, writer, checkpoint, marks, dedup, workers, scheduler, max_concurrency=None, lean=False,
+                     metrics=None, analyzer=None):
+    """
+    Poll due hashtags on a DriverPool, busiest first; all browsers share the scheduler's request budget.
+
+    Returns:
+        (list, list): failed hashtags, and hashtags not due yet
+    """
+    from scraper.pool import DriverPool, scrape_parallel
+
+    total = 0
+    failed_hashtags = []
+    pending = pending_hashtags(hashtags, checkpoint)
+    on_batch = persist_batches(writer, checkpoint, analyzer)
+    attempts = {}
+
+    print(f"\n🚀 Starting {workers} browser workers...")
+    pool = DriverPool(workers, lean=lean, dedup=dedup, metrics=metrics, throttle=scheduler.throttle)
+    try:
+        # Rate-limited hashtags are retried in another round once the backoff has passed
+        while pending:
+            due = scheduler.due(pending)
+            if not due:
+                break
+            # Pacing comes from the shared token bucket, not a fixed pause per worker
+            results = scrape_parallel(pool, due, max_concurrency, delay=0, on_batch=on_batch,
+                                      tag_kwargs={tag: {"start_scroll": checkpoint.resume_scroll(tag),
+                                                        "scroll_limit": scheduler.scroll_limit(tag),
+                                                        **marks.query(tag)} for tag in due})
+            for done, (tag, tweets, error) in enumerate(results, start=1):
+                print(f"\n📍 Finished {done}/{len(due)}: {tag}")
+                if isinstance(error, RateLimitError) and retry_rate_limited(scheduler, attempts, tag, error):
+                    continue
+                pending.remove(tag)
+                if error is not None:
+                    if not isinstance(error, RateLimitError):
+                        print(f"❌ Error with {tag}: {str(error)}")
+                        scheduler.record_error(tag, error)
+                    failed_hashtags.append(tag)
+                    continue
+
+                scheduler.record(tag, len(tweets))
+                finish_hashtag(writer, checkpoint, marks, dedup, tag, tweets)
+                if tweets:
+                    total += len(tweets)
+                    report_hashtag(tag, tweets, total)
+                elif marks.since_id(tag):
+                    print(f"💤 No new tweets for {tag} since the last run")
+                else:
+                    print(f"⚠️ No tweets found for {tag}")
+                    failed_hashtags.append(tag)
+    finally:
+        pool.close()
+
+    return failed_hashtags, pending
+
+
+def print_schedule(scheduler):
+    print("\n🗓️ Hashtag schedule (busiest first):")
+    now = time.time()
+    for tag in scheduler.ranking():
+        rate = scheduler.yield_of(tag)
+        wait = scheduler.next_due(tag) - now
+        print(f"   {tag}: {'not polled yet' if rate is None else f'{rate:.1f} new tweets/request'}, "
+              f"{scheduler.scroll_limit(tag)} scrolls, " + (f"due in {wait / 60:.0f} min" if wait > 0 else "due now"))
+
+
+def run_pipeline(workers=1, max_concurrency=None, lean=False, stream=False):
+    """
+    Args:
+        workers: Browser sessions to scrape with; above 1 the hashtags are
+            spread over a DriverPool of cloned, logged-in profiles
+        max_concurrency: Hashtags scraped at once in parallel mode (default: workers)
+        lean: Run browsers without images, media, fonts and analytics
+        stream: Clean, vectorize and score tweets on a consumer thread while
+            scraping, instead of after every hashtag is done
+    """
+    from scraper.twitter_scraper import TweetScraper, HASHTAGS, SCROLL_LIMIT
+    from analysis.visualization import plot_sampled_signal
 
-def run_pipeline():
     scraper = None
+    writer = None
+    analyzer = None
+    metrics = RunMetrics()
+    status = "failed"
     
     try:
-        scraper = TweetScraper()
+        writer, checkpoint = open_run()
+        marks = HighWaterMarks()
+        # One index for every hashtag, worker and run, so a tweet is stored once
+        dedup = DedupIndex(INDEX_FILE)
+        # Ranks hashtags by recent yield and paces every request (replaces fixed sleeps between hashtags)
+        scheduler = HashtagScheduler(HASHTAGS, scroll_limit=SCROLL_LIMIT)
+        scraper = TweetScraper(lean=lean, dedup=dedup, metrics=metrics, throttle=scheduler.throttle)
+
+        if stream:
+            # Scoring restarts from the raw tweets, so a resumed run re-queues what it already saved
+            shutil.rmtree(SCORED_DIR, ignore_errors=True)
+            analyzer = StreamingAnalyzer(SCORED_DIR, IncrementalTfidf.load(), metrics=metrics)
+            for batch in iter_parquet_batches(writer.directory):
+                analyzer.submit(batch)
 
         print("\n🟦 Login to Twitter")
-        scraper.login()
+        with metrics.stage("login", commands=scraper.commands):
+            scraper.login()
 
-        all_tweets = []
-        failed_hashtags = []
-        
         # Configuration
         DAYS_BACK = 3  # Look back 3 days for tweets
         TARGET_TWEETS = 2000  # Stop if we reach this many
 
-        for idx, tag in enumerate(HASHTAGS):
-            print(f"\n{'='*50}")
-            print(f"📍 Processing {idx + 1}/{len(HASHTAGS)}: {tag}")
-            print('='*50)
-            
-            try:
-                tweets = scraper.search_and_scrape(tag)
-                
-                if tweets:
-                    all_tweets.extend(tweets)
-                    print(f"✅ Collected {len(tweets)} tweets for {tag}")
-                    print(f"📊 Total so far: {len(all_tweets)} tweets")
-                    
-                    # Show sample with all new fields
-                    sample = tweets[0]
-                    print(f"\n📝 Sample tweet:")
-                    print(f"   Content: {sample['content'][:80]}...")
-                    print(f"   Username: @{sample['username']}")
-                    print(f"   Likes: {sample['likes']}, Retweets: {sample['retweets']}")
-                    print(f"   Hashtags: {sample['hashtags'][:3]}")
-                    print(f"   Mentions: {sample['mentions'][:3]}")
-                else:
-                    print(f"⚠️ No tweets found for {tag}")
-                    failed_hashtags.append(tag)
-                
-                # Add delay between hashtags to prevent rate limiting
-                if idx < len(HASHTAGS) - 1:
-                    wait_time = 10
-                    print(f"\n⏳ Waiting {wait_time} seconds before next hashtag to avoid rate limiting...")
-                    time.sleep(wait_time)
-                    
-            except Exception as e:
-                print(f"❌ Error with {tag}: {str(e)}")
-                failed_hashtags.append(tag)
-                if idx < len(HASHTAGS) - 1:
-                    print(f"⏳ Waiting 15 seconds before next hashtag...")
-                    time.sleep(15)
-                continue
+        print_schedule(scheduler)
+        if workers > 1:
+            # Close the login browser so its cookies are flushed before cloning the profile
+            scraper.close()
+            scraper = None
+            failed_hashtags, not_due = collect_parallel(HASHTAGS, writer, checkpoint, marks, dedup, workers, scheduler,
+                                                        max_concurrency, lean, metrics, analyzer)
+        else:
+            failed_hashtags, not_due = collect_serial(scraper, HASHTAGS, writer, checkpoint, marks, dedup, scheduler,
+                                                      analyzer)
+
+        metrics.count("near_duplicates_skipped", dedup.dropped["near"])
+        writer.close()
+        if analyzer is not None:
+            print("\n⏳ Waiting for the analyzer to finish queued batches...")
+            analyzer.close()
+        print(f"\n🟩 Loading streamed tweets from {writer.directory}...")
+        with metrics.stage("load") as stage:
+            df = read_dataset(writer.directory)
+            stage.rows_out = len(df)
 
         # Summary of collection phase
         print("\n" + "="*50)
         print("📊 COLLECTION SUMMARY")
         print("="*50)
-        print(f"✅ Successful hashtags: {len(HASHTAGS) - len(failed_hashtags)}/{len(HASHTAGS)}")
+        print(f"✅ Successful hashtags: {len(HASHTAGS) - len(failed_hashtags) - len(not_due)}/{len(HASHTAGS)}")
         if failed_hashtags:
             print(f"⚠️ Failed hashtags: {', '.join(failed_hashtags)}")
-        print(f"📦 Total tweets collected: {len(all_tweets)}")
+        if not_due:
+            print(f"💤 Not due yet (quiet lately, polled less often): {', '.join(not_due)}")
+        print(f"📦 Total tweets collected: {len(df)}")
+        print(f"🧬 Near-duplicates skipped: {dedup.dropped['near']} ({len(dedup)} unique tweets indexed)")
 
-        if not all_tweets:
+        if df.empty:
             print("\n" + "="*50)
             print("❌ No tweets collected. Debugging tips:")
             print("="*50)
@@ -89,14 +328,13 @@ def run_pipeline():
             print("   - Not logged in properly")
             print("   - Twitter structure changed")
             print("   - Hashtags have no recent activity")
+            status = "empty"
             return
 
         print("\n" + "="*50)
-        print(f"🎉 Successfully collected {len(all_tweets)} tweets!")
+        print(f"🎉 Successfully collected {len(df)} tweets!")
         print("="*50)
 
-        print("\n🟩 Building DataFrame...")
-        df = pd.DataFrame(all_tweets)
         print(f"📋 Shape: {df.shape}")
         print(f"📋 Columns: {list(df.columns)}")
         
@@ -121,31 +359,98 @@ def run_pipeline():
         # Note: We don't need to extract hashtags/mentions again since scraper does it
         # df["hashtags"], df["mentions"] = zip(*df["content"].apply(extract_text_entities))
 
-        print("\n🧹 Cleaning data...")
-        df = clean(df)
-        print(f"✅ After cleaning: {len(df)} tweets remain")
-        
-        print("\n💾 Saving cleaned data...")
-        save_parquet(df, "data/processed/tweets_cleaned.parquet")
-        print("✅ Saved: data/processed/tweets_cleaned.parquet")
+        if analyzer is not None:
+            print(f"\n🟩 Loading tweets cleaned and scored during the scrape from {analyzer.directory}...")
+            with metrics.stage("load", output="scored") as stage:
+                df = read_dataset(analyzer.directory)
+                stage.rows_out = len(df)
+            if df.empty:
+                print("❌ No tweets left after cleaning")
+                status = "empty"
+                return
+            tfidf, windows = analyzer.tfidf, analyzer.windows
+            print(f"✅ {len(df)} tweets scored; first signal {analyzer.first_signal_latency or 0:.2f} s after "
+                  f"its tweets were scraped (worst batch {analyzer.max_latency:.2f} s)")
 
-        print("\n🔢 Computing TF-IDF...")
-        X, vec = compute_tfidf(df["content"])
-        print(f"✅ TF-IDF matrix shape: {X.shape}")
-        
-        print("\n📊 Generating signals...")
-        signals = generate_signals(X)
+            print("\n💾 Saving cleaned data...")
+            with metrics.stage("save", rows_in=len(df), output="tweets_cleaned"):
+                append_partitioned(df.drop(columns=SIGNAL_COLUMNS), CLEANED_DATASET, checkpoint.run_id)
+            print(f"✅ Appended to: {CLEANED_DATASET}/")
+        else:
+            print("\n🧹 Cleaning data...")
+            with metrics.stage("clean", rows_in=len(df)) as stage:
+                df = clean(df)
+                stage.rows_out = len(df)
+            print(f"✅ After cleaning: {len(df)} tweets remain")
+
+            print("\n🎯 Extracting instruments and strikes...")
+            with metrics.stage("instruments", rows_in=len(df)) as stage:
+                df = extract_instruments(df)
+                stage.rows_out = len(df)
+                stage.extra.update(instruments=int(df["instrument"].notna().sum()),
+                                   strikes=int(df["option_type"].notna().sum()))
+            print(f"✅ {stage.extra['instruments']} tweets name an instrument, {stage.extra['strikes']} a strike")
+            print(df["instrument"].value_counts().to_string())
+            
+            print("\n💾 Saving cleaned data...")
+            with metrics.stage("save", rows_in=len(df), output="tweets_cleaned"):
+                append_partitioned(df, CLEANED_DATASET, checkpoint.run_id)
+            print(f"✅ Appended to: {CLEANED_DATASET}/")
+
+            print("\n🔢 Computing TF-IDF...")
+            # IDF accumulates over every run; only this run's tweets are vectorized
+            with metrics.stage("tfidf", rows_in=len(df)) as stage:
+                tfidf = IncrementalTfidf.load()
+                X = tfidf.partial_fit_transform(df["content"])
+                stage.rows_out = X.shape[0]
+                stage.extra["nnz"] = int(X.nnz)
+            print(f"✅ TF-IDF matrix shape: {X.shape} (IDF over {tfidf.n_docs} tweets)")
+            
+            print("\n📊 Generating signals...")
+            with metrics.stage("signals", rows_in=X.shape[0]) as stage:
+                signals = generate_signals(X, tfidf, engagement=df)
+                stage.rows_out = len(signals["confidence"])
+                stage.extra.update(buy=int(signals["buy"].sum()), sell=int(signals["sell"].sum()))
+
+            df["buy_signal"] = signals["buy"]
+            df["sell_signal"] = signals["sell"]
+            df["confidence"] = signals["confidence"]
+
+            with metrics.stage("aggregate", rows_in=len(df)):
+                windows = WindowedSentiment()
+                windows.add_batch(df["searched_tag"], df["timestamp"], df["buy_signal"], df["sell_signal"],
+                                  df["confidence"], instruments=df["instrument"])
 
         print("\n📈 Creating visualization...")
-        plot_sampled_signal(signals["confidence"])
+        with metrics.stage("plot", rows_in=len(df)):
+            chart = plot_sampled_signal(df["confidence"], sample=2000, path="data/processed/confidence.png",
+                                        timestamps=df["timestamp"])
+        print(f"✅ Saved: {chart}")
 
-        df["buy_signal"] = signals["buy"]
-        df["sell_signal"] = signals["sell"]
-        df["confidence"] = signals["confidence"]
+        print("\n⏱️ Sentiment per instrument (last 15 minutes of data):")
+        for instrument, w in windows.snapshot().items():
+            print(f"   {instrument}: {w['tweets']} tweets, {w['buy']} buy / {w['sell']} sell, "
+                  f"net {w['net_sentiment']:+.2f}, avg confidence {w['mean_confidence']:.3f}")
+
+        print("\n🗂️ Indexing hashtags, mentions and authors...")
+        with metrics.stage("index", rows_in=len(df)) as stage:
+            entities = EntityIndex.load()
+            entities.add_batch(df)
+            stage.extra["entities"] = len(entities.entities)
+        print(f"✅ {len(entities):,} tweets indexed under {len(entities.entities):,} entities")
+        for tag in df["searched_tag"].unique()[:3]:
+            related = ", ".join(f"{e} ({n})" for e, n in entities.co_occurring(tag, kind="hashtag", top=3))
+            print(f"   {tag} appears most with: {related or '-'}")
 
         print("\n💾 Saving final data...")
-        save_parquet(df, "data/processed/tweet_signals.parquet")
-        print("✅ Saved: data/processed/tweet_signals.parquet")
+        with metrics.stage("save", rows_in=len(df), output="tweet_signals"):
+            append_partitioned(df, SIGNALS_DATASET, checkpoint.run_id)
+        print(f"✅ Appended to: {SIGNALS_DATASET}/")
+        checkpoint.mark_finished()
+        # Saved only once the run is final, so a resumed run is not counted twice
+        tfidf.save()
+        entities.save()
+        status = "ok"
 
         # Detailed Summary
         print("\n" + "="*50)
@@ -176,6 +481,7 @@ def run_pipeline():
         
     except KeyboardInterrupt:
         print("\n⚠️ Pipeline interrupted by user")
+        status = "interrupted"
         
     except Exception as e:
         print(f"\n❌ Pipeline error: {str(e)}")
@@ -183,10 +489,137 @@ def run_pipeline():
         traceback.print_exc()
         
     finally:
+        # Persist whatever is still buffered so a restart can pick it up
+        if writer:
+            writer.close()
+        if analyzer:
+            try:
+                analyzer.close()
+            except Exception as e:
+                print(f"⚠️ {e}")
+
+        report_path, prom_path = metrics.write(status=status)
+        print(f"\n📏 Run metrics: {report_path} (Prometheus: {prom_path})")
+
         # Always close browser
         if scraper:
             print("\n🔴 Closing browser...")
             scraper.close()
 
+
+def load_tweets(source):
+    """Read a Parquet file, a folder of part files, or a dataset written by append_partitioned."""
+    if os.path.isdir(source) and glob.glob(os.path.join(glob.escape(source), "date=*")):
+        return read_partitioned(source)
+    return read_dataset(source)
+
+
+def run_process(source, output=SIGNALS_DATASET, run_id=None, model=MODEL_FILE, save_model=False):
+    """
+    Clean, vectorize, score and save tweets that are already on disk.
+
+    Only the processing and analysis layers are loaded (no Selenium,
+    webdriver_manager or matplotlib), so short-lived batch workers start in a
+    fraction of the full pipeline's time and need no browser installed.
+
+    Args:
+        source: Parquet file, folder of part files (e.g. data/raw/current_run/tweets)
+            or partitioned dataset; earlier signal columns are recomputed
+        output: Dataset the scored tweets are appended to
+        run_id: Names the output files (default: derived from ``source``, so
+            processing the same input again replaces its earlier output)
+        model: Saved IncrementalTfidf whose IDF the tweets are scored with
+        save_model: Also count the tweets into the saved IDF; leave off when
+            re-processing tweets the model has already seen
+
+    Returns:
+        str: run status, "ok", "empty" or "failed"
+
+    Raises:
+        ValueError: If ``output`` is ``source`` itself, which would store every tweet twice
+    """
+    if os.path.abspath(source) == os.path.abspath(output):
+        raise ValueError(f"{source} is the input; write the re-scored tweets to another --output")
+    run_id = run_id or f"process-{hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:12]}"
+    metrics = RunMetrics()
+    status = "failed"
+
+    try:
+        print(f"🟩 Loading tweets from {source}...")
+        with metrics.stage("load") as stage:
+            df = load_tweets(source).drop(columns=SIGNAL_COLUMNS + INSTRUMENT_COLUMNS, errors="ignore")
+            stage.rows_out = len(df)
+
+        print(f"🧹 Cleaning {len(df)} tweets...")
+        with metrics.stage("clean", rows_in=len(df)) as stage:
+            df = clean(df)
+            stage.rows_out = len(df)
+        if df.empty:
+            print("❌ No tweets left after cleaning")
+            status = "empty"
+            return status
+
+        print("🎯 Extracting instruments and strikes...")
+        with metrics.stage("instruments", rows_in=len(df)) as stage:
+            df = extract_instruments(df)
+            stage.rows_out = len(df)
+            stage.extra.update(instruments=int(df["instrument"].notna().sum()),
+                               strikes=int(df["option_type"].notna().sum()))
+
+        print("🔢 Computing TF-IDF...")
+        with metrics.stage("tfidf", rows_in=len(df)) as stage:
+            tfidf = IncrementalTfidf.load(model)
+            X = tfidf.partial_fit_transform(df["content"])
+            stage.rows_out = X.shape[0]
+            stage.extra["nnz"] = int(X.nnz)
+
+        print("📊 Generating signals...")
+        with metrics.stage("signals", rows_in=X.shape[0]) as stage:
+            signals = generate_signals(X, tfidf, engagement=df)
+            stage.rows_out = len(signals["confidence"])
+            stage.extra.update(buy=int(signals["buy"].sum()), sell=int(signals["sell"].sum()))
+        df["buy_signal"] = signals["buy"]
+        df["sell_signal"] = signals["sell"]
+        df["confidence"] = signals["confidence"]
+
+        with metrics.stage("save", rows_in=len(df), output="tweet_signals"):
+            append_partitioned(df, output, run_id)
+        if save_model:
+            tfidf.save(model)
+        status = "ok"
+        print(f"✅ {len(df)} tweets scored ({int(signals['buy'].sum())} buy / {int(signals['sell'].sum())} sell), "
+              f"appended to {output}/ as run {run_id}")
+        return status
+    finally:
+        report_path, _ = metrics.write(status=status)
+        print(f"📏 Run metrics: {report_path}")
+
+
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Twitter/X market sentiment pipeline")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="browser sessions to scrape with in parallel")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="hashtags scraped at once (default: --workers)")
+    parser.add_argument("--lean", action="store_true",
+                        help="block images, media, fonts and analytics in the browser")
+    parser.add_argument("--stream", action="store_true",
+                        help="clean and score tweets while scraping instead of afterwards")
+    commands = parser.add_subparsers(dest="command")
+    process = commands.add_parser("process", help="clean and score existing Parquet without a browser or plotting")
+    process.add_argument("source", help="Parquet file, folder of part files or partitioned dataset")
+    process.add_argument("--output", default=SIGNALS_DATASET, help="dataset to append scored tweets to")
+    process.add_argument("--run-id", help="names the output files (default: derived from source)")
+    process.add_argument("--model", default=MODEL_FILE, help="saved TF-IDF model to score with")
+    process.add_argument("--save-model", action="store_true",
+                         help="count these tweets into the saved model's IDF")
+    args = parser.parse_args()
+
+    if args.command == "process":
+        status = run_process(args.source, output=args.output, run_id=args.run_id, model=args.model,
+                             save_model=args.save_model)
+        sys.exit(0 if status != "failed" else 1)
+
+    run_pipeline(workers=args.workers, max_concurrency=args.max_concurrency, lean=args.lean, stream=args.stream)
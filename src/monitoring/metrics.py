@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_DIR = "data/metrics"
+PROMETHEUS_PREFIX = "market_intel"
+
+
+def peak_rss_bytes():
+    """Process peak resident set size so far (None where unsupported)."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Stage:
+    """
+    One timed stage; set ``rows_out`` (and anything in ``extra``) before it ends.
+
+    Wall time is per stage; CPU time is the whole process's, so stages that
+    overlap on several threads each see the others' CPU as well.
+    """
+
+    __slots__ = ("name", "labels", "rows_in", "rows_out", "extra", "commands",
+                 "started", "wall_seconds", "cpu_seconds", "webdriver_commands", "peak_rss_bytes",
+                 "error", "_wall", "_cpu", "_commands_start")
+
+    def __init__(self, name, labels, rows_in=None, commands=None):
+        self.name = name
+        self.labels = labels
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.extra = {}
+        self.commands = commands
+        self.error = None
+
+    def __enter__(self):
+        self.started = time.time()
+        self._commands_start = self.commands.total if self.commands is not None else None
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        self.webdriver_commands = (
+            self.commands.total - self._commands_start if self.commands is not None else None
+        )
+        self.peak_rss_bytes = peak_rss_bytes()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        return False
+
+    def to_dict(self):
+        record = {
+            "stage": self.name,
+            **({"labels": self.labels} if self.labels else {}),
+            "started": self.started,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+        for key in ("rows_in", "rows_out", "webdriver_commands", "error"):
+            value = getattr(self, key)
+            if value is not None:
+                record[key] = value
+        record.update(self.extra)
+        return record
+
+
+class _RecordedStage(Stage):
+    __slots__ = ("metrics",)
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        self.metrics._record(self)
+        return False
+
+
+class RunMetrics:
+    """
+    Stage timers and counters for one pipeline run.
+
+    Usage:
+        with metrics.stage("clean", rows_in=len(df)) as s:
+            df = clean(df)
+            s.rows_out = len(df)
+        metrics.count("tweets_scraped", len(tweets), hashtag=tag)
+
+    Recording a stage costs a few microseconds (two clocks and a getrusage
+    call), so it can stay on in production. Thread-safe.
+
+    Args:
+        log_stages: Also log every finished stage at INFO level
+    """
+
+    def __init__(self, log_stages=True):
+        self.started = datetime.now(timezone.utc)
+        self.stages = []
+        self.counters = {}
+        self.log_stages = log_stages
+        self._lock = threading.Lock()
+
+    def stage(self, name, rows_in=None, commands=None, **labels):
+        """
+        Context manager timing one stage.
+
+        Args:
+            name: Stage name, e.g. "scrape" or "clean"
+            rows_in: Rows going into the stage
+            commands: CommandCounter whose WebDriver commands are attributed to the stage
+            labels: Extra dimensions such as hashtag=...
+        """
+        s = _RecordedStage(name, labels, rows_in, commands)
+        s.metrics = self
+        return s
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _record(self, stage):
+        with self._lock:
+            self.stages.append(stage)
+        if self.log_stages:
+            labels = " ".join(f"{k}={v}" for k, v in stage.labels.items())
+            logging.info(
+                f"stage {stage.name} {labels} wall {stage.wall_seconds * 1000:.1f} ms "
+                f"cpu {stage.cpu_seconds * 1000:.1f} ms rows {stage.rows_in}->{stage.rows_out}"
+                + (f" webdriver {stage.webdriver_commands}" if stage.webdriver_commands is not None else "")
+                + (f" error {stage.error}" if stage.error else "")
+            )
+
+    # ------------------------------------------
+    # EXPORT
+    # ------------------------------------------
+    def summary(self):
+        """Totals per stage name: runs, wall/CPU seconds, rows, WebDriver commands."""
+        totals = {}
+        with self._lock:
+            stages = list(self.stages)
+        for s in stages:
+            t = totals.setdefault(s.name, {"runs": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                           "rows_in": 0, "rows_out": 0, "webdriver_commands": 0})
+            t["runs"] += 1
+            t["errors"] += s.error is not None
+            t["wall_seconds"] += s.wall_seconds
+            t["cpu_seconds"] += s.cpu_seconds
+            t["rows_in"] += s.rows_in or 0
+            t["rows_out"] += s.rows_out or 0
+            t["webdriver_commands"] += s.webdriver_commands or 0
+        return totals
+
+    def report(self, status="ok"):
+        with self._lock:
+            stages = [s.to_dict() for s in self.stages]
+            counters = [{"name": n, **({"labels": dict(l)} if l else {}), "value": v}
+                        for (n, l), v in self.counters.items()]
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": status,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "summary": self.summary(),
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def prometheus(self, status="ok"):
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        p = PROMETHEUS_PREFIX
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{p}_{name}{{{label_str}}} {value}" if label_str else f"{p}_{name} {value}")
+
+        summary = self.summary()
+        fields = [
+            ("stage_runs_total", "counter", "Times the stage ran", "runs"),
+            ("stage_errors_total", "counter", "Stage runs that raised", "errors"),
+            ("stage_wall_seconds_total", "counter", "Wall-clock seconds spent in the stage", "wall_seconds"),
+            ("stage_cpu_seconds_total", "counter", "Process CPU seconds while the stage ran", "cpu_seconds"),
+            ("stage_rows_in_total", "counter", "Rows into the stage", "rows_in"),
+            ("stage_rows_out_total", "counter", "Rows out of the stage", "rows_out"),
+            ("stage_webdriver_commands_total", "counter", "WebDriver commands issued by the stage", "webdriver_commands"),
+        ]
+        for name, kind, help_text, field in fields:
+            metric(name, kind, help_text, [({"stage": s}, round(t[field], 6)) for s, t in sorted(summary.items())])
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+        by_name = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((dict(labels), value))
+        for name, samples in by_name.items():
+            metric(f"{name}_total", "counter", name.replace("_", " "), samples)
+
+        metric("peak_rss_bytes", "gauge", "Peak resident set size of the run", [({}, peak_rss_bytes() or 0)])
+        metric("run_success", "gauge", "1 if the last run completed", [({}, int(status == "ok"))])
+        metric("run_finished_timestamp_seconds", "gauge", "When the last run ended", [({}, round(time.time(), 3))])
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=METRICS_DIR, status="ok"):
+        """
+        Write run_<start time>.json and overwrite latest.prom in ``directory``.
+
+        Returns:
+            (str, str): JSON report path, Prometheus file path
+        """
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"run_{self.started.strftime('%Y%m%dT%H%M%SZ')}.json")
+        prom_path = os.path.join(directory, "latest.prom")
+
+        with open(json_path, "w") as f:
+            json.dump(self.report(status), f, indent=2)
+        tmp_path = f"{prom_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus(status))
+        os.replace(tmp_path, prom_path)
+        return json_path, prom_path
+
+
+class NullMetrics:
+    """Drop-in for RunMetrics that records nothing."""
+
+    def stage(self, name, rows_in=None, commands=None, **labels):
+        return Stage(name, labels, rows_in, commands)
+
+    def count(self, name, value=1, **labels):
+        pass
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
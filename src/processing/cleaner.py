@@ -1,10 +1,171 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import re
+from concurrent.futures import ThreadPoolExecutor
 
-def clean(df):
-    df['content'] = df['content'].str.replace(r"http\S+", "", regex=True)
-    df['content'] = df['content'].str.replace(r"[^a-zA-Z0-9@#\s]", " ", regex=True)
-    df['content'] = df['content'].str.lower()
-    df.drop_duplicates(subset=["content", "timestamp"], inplace=True)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], errors="coerce")
-    return df
+# Rows cleaned per Arrow chunk; bounds the temporary arrays the engine allocates
+CHUNK_SIZE = 250_000
+# Row hashes a HashDedup remembers (8 bytes each); beyond it the oldest are forgotten
+DEDUP_MAX_HASHES = 20_000_000
+# Hash segments stop merging at 1/DEDUP_SEGMENTS of the cap, so eviction drops
+# roughly that share of the oldest hashes at a time
+DEDUP_SEGMENTS = 8
+
+# `\s` means ASCII whitespace to RE2 (Arrow, and pandas' Arrow-backed strings)
+# but Unicode whitespace to Python's re (pandas object strings). Spelling the
+# Python set out lets RE2 reproduce the object-dtype behaviour exactly.
+_PY_WHITESPACE = (
+    r"\t\n\x0b\x0c\r\x1c-\x20\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}"
+    r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}"
+)
+_PATTERNS = {
+    "arrow": (r"http\S+", r"[^a-zA-Z0-9@#\s]"),
+    "python": (rf"http[^{_PY_WHITESPACE}]+", rf"[^a-zA-Z0-9@#{_PY_WHITESPACE}]"),
+}
+
+def clean(df, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Strip URLs and special characters, lowercase, drop duplicate
+    (content, timestamp) rows and parse timestamps.
+
+    Text is cleaned on Arrow string arrays chunk by chunk (in parallel across
+    ``workers`` threads) and duplicates are found by 64-bit row hashes, so
+    nothing is mutated in place and no intermediate object-dtype copies are
+    made. The result is identical to the original pandas implementation.
+    """
+    mode = _regex_mode(df['content'])
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        texts = executor.map(lambda c: clean_text(c['content'], mode), chunks)
+
+        dedup = HashDedup()
+        parts = []
+        for chunk, text in zip(chunks, texts):
+            parts.append(_dedup_chunk(chunk, text, dedup))
+
+    out = pd.concat(parts) if parts else df.iloc[0:0].copy()
+    out['timestamp'] = pd.to_datetime(out['timestamp'], errors="coerce")
+    return out
+
+
+def clean_batches(batches):
+    """
+    Apply ``clean`` to a stream of DataFrame chunks (e.g. from
+    ``storage.iter_parquet_batches``), dropping duplicates across chunks as
+    well as within them. Only the row hashes of earlier chunks are kept.
+    """
+    dedup = HashDedup()
+
+    for df in batches:
+        text = clean_text(df['content'], _regex_mode(df['content']))
+        df = _dedup_chunk(df, text, dedup)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors="coerce")
+        yield df
+
+
+def clean_text(content, mode="arrow"):
+    """
+    Clean a string column in three vectorized Arrow passes: URL removal and
+    special-character replacement (two regexes, since they substitute
+    different strings) and an ASCII lowercase, which is exact because only
+    ASCII letters survive the second regex.
+
+    Args:
+        content: pandas Series or Arrow array of tweet text
+        mode: "arrow" for RE2 ``\\s`` semantics, "python" for Python ``re`` semantics
+
+    Returns:
+        pyarrow.Array: cleaned text
+    """
+    url_pattern, non_text_pattern = _PATTERNS[mode]
+    arr = content if isinstance(content, (pa.Array, pa.ChunkedArray)) else pa.array(content, from_pandas=True)
+    if pa.types.is_null(arr.type):
+        arr = arr.cast(pa.string())
+    arr = pc.replace_substring_regex(arr, url_pattern, "")
+    arr = pc.replace_substring_regex(arr, non_text_pattern, " ")
+    return pc.ascii_lower(arr)
+
+
+class HashDedup:
+    """
+    First-occurrence filter over 64-bit row hashes.
+
+    Hashes seen so far live in sorted uint64 segments, oldest first (8 bytes
+    per unique row, no Python objects). Membership is a binary search per
+    segment. Each call's new hashes become a new segment, merged into the
+    previous one while that is not larger. There are therefore O(log n)
+    segments, and each hash is copied O(log n) times in total, rather than
+    the whole history once per batch. Segments stop merging at
+    ``max_hashes / DEDUP_SEGMENTS``. Once the total passes ``max_hashes``,
+    the oldest segments are dropped, so a long-running stream stays bounded
+    and only forgets its oldest rows.
+
+    Args:
+        max_hashes: Most hashes remembered
+    """
+
+    def __init__(self, max_hashes=DEDUP_MAX_HASHES):
+        self.max_hashes = max_hashes
+        self.segments = []
+
+    def __len__(self):
+        return sum(len(s) for s in self.segments)
+
+    def first_seen(self, hashes):
+        """Mask of rows whose hash was not seen before (in earlier calls or earlier in this one)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        keep = np.zeros(len(hashes), dtype=bool)
+        if not len(hashes):
+            return keep
+
+        unique, first = np.unique(hashes, return_index=True)
+        for seen in self.segments:
+            pos = np.searchsorted(seen, unique)
+            known = seen[np.minimum(pos, len(seen) - 1)] == unique
+            unique, first = unique[~known], first[~known]
+
+        keep[first] = True
+        if len(unique):
+            self._add(unique)
+        return keep
+
+    def _add(self, unique):
+        segments = self.segments
+        segments.append(unique)
+        largest = max(1, self.max_hashes // DEDUP_SEGMENTS)
+        while (len(segments) > 1 and len(segments[-2]) <= len(segments[-1])
+               and len(segments[-2]) + len(segments[-1]) <= largest):
+            newer = segments.pop()
+            older = segments.pop()
+            # Disjoint sorted runs: a stable sort (timsort) merges them in linear time
+            segments.append(np.sort(np.concatenate([older, newer]), kind="stable"))
+
+        total = len(self)
+        while len(segments) > 1 and total > self.max_hashes:
+            total -= len(segments.pop(0))
+
+
+def _regex_mode(content):
+    return "python" if content.dtype == object else "arrow"
+
+
+def hash64(values):
+    """Stable 64-bit hash per value; nulls (None/NaN) all hash alike."""
+    arr = values if isinstance(values, (pa.Array, pa.ChunkedArray)) else pa.array(values, from_pandas=True)
+    return pd.util.hash_array(arr.to_numpy(zero_copy_only=False), categorize=False)
+
+
+def _dedup_chunk(chunk, text, dedup):
+    """Keep the first occurrence of each (cleaned content, raw timestamp) pair."""
+    with np.errstate(over="ignore"):
+        keys = hash64(text) * np.uint64(0x9E3779B97F4A7C15) ^ hash64(chunk['timestamp'])
+    keep = dedup.first_seen(keys)
+
+    out = chunk[keep].copy()
+    # Nulls stay None in object columns, as str methods leave them
+    content = text.filter(pa.array(keep)).to_numpy(zero_copy_only=False)
+    out['content'] = pd.Series(content, index=out.index, dtype=object).astype(chunk['content'].dtype)
+    return out
@@ -0,0 +1,148 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .cleaner import clean_text
+
+# Instrument each alias refers to. Aliases are written as people type them and
+# are matched against cleaned text (lowercase, punctuation as spaces), with or
+# without a leading #, but not inside longer words or @mentions. The searched
+# hashtags map to instruments through the same table (analysis/aggregator.py).
+INSTRUMENT_ALIASES = {
+    "NIFTY": ["nifty", "nifty50", "nifty 50", "nifty fifty", "niftyanalysis", "niftylevels"],
+    "BANKNIFTY": ["banknifty", "bank nifty", "nifty bank", "bnf", "bankniftylevels"],
+    "FINNIFTY": ["finnifty", "fin nifty", "nifty fin", "nifty financial services"],
+    "MIDCPNIFTY": ["midcpnifty", "midcap nifty", "nifty midcap select", "midcpnifty50"],
+    "NIFTYIT": ["niftyit", "nifty it", "cnxit"],
+    "SENSEX": ["sensex", "bse sensex", "sensex30", "sensex 30"],
+    "BANKEX": ["bankex"],
+}
+# Option types as written in tweets, and their normalized form
+OPTION_TYPES = {"ce": "CE", "call": "CE", "calls": "CE", "pe": "PE", "put": "PE", "puts": "PE"}
+# Columns added by extract_instruments
+INSTRUMENT_FIELDS = [
+    pa.field("instrument", pa.string()),
+    pa.field("strike", pa.float64()),
+    pa.field("option_type", pa.string()),
+]
+
+# A strike directly followed by its option type: "48500 pe", "24500ce", "24k ce",
+# or "24 500 ce" (the cleaner turns the comma of "24,500" into a space)
+_STRIKE_PATTERN = (r"(?:^|[^a-z0-9@])(?P<strike>\d{1,3}(?: \d{3})+|\d+)(?P<k>k?) ?"
+                   rf"(?P<option>{'|'.join(sorted(OPTION_TYPES, key=len, reverse=True))})(?:[^a-z0-9]|$)")
+
+
+def normalize_alias(name):
+    """An alias or hashtag spelled as in cleaned text, e.g. "#Bank-Nifty" -> "bank nifty"."""
+    return " ".join(str(clean_text(pa.array([str(name)]))[0]).replace("#", " ").split())
+
+
+def alias_lookup(aliases=INSTRUMENT_ALIASES):
+    """{normalized alias: instrument}, including each instrument's own name."""
+    lookup = {}
+    for instrument, names in aliases.items():
+        for name in [instrument, *names]:
+            normalized = normalize_alias(name)
+            if normalized:
+                lookup.setdefault(normalized, instrument)
+    return lookup
+
+
+class InstrumentMatcher:
+    """
+    Maps cleaned tweet text to an instrument, strike and option type.
+
+    Every alias of every instrument is compiled into one RE2 alternation, a
+    single automaton that scans each tweet once, however many aliases there
+    are. Longer aliases are tried first, so "nifty bank" is BANKNIFTY rather
+    than NIFTY. The first mention in the tweet wins. Matching runs on whole
+    Arrow string arrays inside Arrow's C++ kernels, and the matched alias is
+    mapped to its instrument with one vectorized lookup, so no per-tweet
+    Python code runs.
+
+    Args:
+        aliases: {instrument: [alias, ...]}; aliases are normalized like
+            tweets are cleaned, so "Bank-Nifty" and "#BankNifty" work too
+    """
+
+    def __init__(self, aliases=INSTRUMENT_ALIASES):
+        lookup = alias_lookup(aliases)
+        self.aliases = pa.array(list(lookup))
+        self.instruments = pa.array(list(lookup.values()))
+        # Cleaned text may hold runs of spaces where punctuation was
+        alternation = "|".join(a.replace(" ", " +") for a in sorted(lookup, key=len, reverse=True))
+        self.pattern = rf"(?:^|[^a-z0-9@])(?P<alias>{alternation})(?:[^a-z0-9]|$)"
+
+    def instrument(self, text):
+        """First instrument mentioned in each cleaned text (null if none), as an Arrow string array."""
+        matched = pc.struct_field(pc.extract_regex(text, self.pattern), "alias")
+        # Aliases may contain several spaces in the tweet; the lookup keys have one
+        matched = pc.replace_substring_regex(matched, " +", " ")
+        return pc.take(self.instruments, pc.index_in(matched, value_set=self.aliases))
+
+    @staticmethod
+    def strike(text):
+        """
+        First strike and option type in each cleaned text.
+
+        Returns:
+            (np.ndarray, pyarrow.Array): float64 strikes (NaN if none), and
+                "CE"/"PE" (null if none)
+        """
+        parts = pc.extract_regex(text, _STRIKE_PATTERN)
+        digits = pc.replace_substring(pc.struct_field(parts, "strike"), " ", "")
+        strike = pc.cast(digits, pa.float64()).to_numpy(zero_copy_only=False)
+        thousands = pc.fill_null(pc.equal(pc.struct_field(parts, "k"), "k"), False)
+        strike = np.where(thousands.to_numpy(zero_copy_only=False), strike * 1000, strike)
+
+        options = pa.array(list(OPTION_TYPES))
+        option_type = pc.take(pa.array(list(OPTION_TYPES.values())),
+                              pc.index_in(pc.struct_field(parts, "option"), value_set=options))
+        return strike, option_type
+
+    def extract(self, text):
+        """
+        Instrument, strike and option type for each cleaned text.
+
+        Args:
+            text: pandas Series or Arrow array of cleaned tweet text
+
+        Returns:
+            dict: "instrument" and "option_type" as Arrow string arrays (null
+                where none is mentioned), "strike" as float64 (NaN where none)
+        """
+        arr = text if isinstance(text, (pa.Array, pa.ChunkedArray)) else pa.array(text, from_pandas=True)
+        if pa.types.is_null(arr.type):
+            arr = arr.cast(pa.string())
+        strike, option_type = self.strike(arr)
+        return {"instrument": self.instrument(arr), "strike": strike, "option_type": option_type}
+
+
+_default_matcher = None
+
+
+def extract_instruments(df, matcher=None):
+    """
+    Add instrument, strike and option_type columns to cleaned tweets.
+
+    Runs after ``clean``, on its lowercase, punctuation-free content.
+
+    Args:
+        df: Cleaned tweets with a content column
+        matcher: InstrumentMatcher to use (default: one over INSTRUMENT_ALIASES)
+
+    Returns:
+        DataFrame: a copy of ``df`` with the three columns added
+    """
+    global _default_matcher
+    if matcher is None:
+        if _default_matcher is None:
+            _default_matcher = InstrumentMatcher()
+        matcher = _default_matcher
+
+    found = matcher.extract(df["content"])
+    df = df.copy()
+    df["instrument"] = found["instrument"].to_numpy(zero_copy_only=False)
+    df["strike"] = found["strike"]
+    df["option_type"] = found["option_type"].to_numpy(zero_copy_only=False)
+    return df
@@ -1,6 +1,301 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import glob
 import os
+import shutil
+import threading
+import time
+import uuid
+
+from .instruments import INSTRUMENT_FIELDS
+
+# Column types of scraped (not yet cleaned) tweets, fixed up front so every
+# part file of a streamed dataset has the same schema even when a batch has
+# no hashtags or mentions at all.
+RAW_TWEET_SCHEMA = pa.schema([
+    ("username", pa.string()),
+    ("timestamp", pa.string()),
+    ("tweet_id", pa.string()),
+    ("content", pa.string()),
+    ("searched_tag", pa.string()),
+    ("hashtags", pa.list_(pa.string())),
+    ("mentions", pa.list_(pa.string())),
+    ("num_hashtags", pa.int64()),
+    ("num_mentions", pa.int64()),
+    ("replies", pa.int64()),
+    ("retweets", pa.int64()),
+    ("likes", pa.int64()),
+    ("views", pa.int64()),
+    ("bookmarks", pa.int64()),
+])
+
+# Cleaned and scored tweets, as written by the streaming analyzer
+SCORED_TWEET_SCHEMA = pa.schema([
+    *RAW_TWEET_SCHEMA.set(RAW_TWEET_SCHEMA.get_field_index("timestamp"),
+                          pa.field("timestamp", pa.timestamp("us", tz="UTC"))),
+    *INSTRUMENT_FIELDS,
+    pa.field("buy_signal", pa.bool_()),
+    pa.field("sell_signal", pa.bool_()),
+    pa.field("confidence", pa.float64()),
+])
+
+# Column types of the long-term tweet datasets (cleaned, optionally scored).
+# Repetitive strings are dictionary-encoded; searched_tag is only stored in
+# the partition path.
+TWEET_STORE_SCHEMA = pa.schema([
+    ("username", pa.dictionary(pa.int32(), pa.string())),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("tweet_id", pa.string()),
+    ("content", pa.string()),
+    ("searched_tag", pa.string()),
+    ("hashtags", pa.list_(pa.string())),
+    ("mentions", pa.list_(pa.string())),
+    ("num_hashtags", pa.int32()),
+    ("num_mentions", pa.int32()),
+    ("replies", pa.int64()),
+    ("retweets", pa.int64()),
+    ("likes", pa.int64()),
+    ("views", pa.int64()),
+    ("bookmarks", pa.int64()),
+    ("instrument", pa.dictionary(pa.int32(), pa.string())),
+    ("strike", pa.float64()),
+    ("option_type", pa.dictionary(pa.int32(), pa.string())),
+    ("buy_signal", pa.bool_()),
+    ("sell_signal", pa.bool_()),
+    ("confidence", pa.float64()),
+])
+
+# <dataset>/date=2024-01-31/searched_tag=%23nifty/part-<run id>-<n>.parquet
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.date32()), ("searched_tag", pa.string())]),
+                               flavor="hive")
+# Columns of a dataset read back, whichever of them its oldest file has
+PARTITIONED_SCHEMA = TWEET_STORE_SCHEMA.append(pa.field("date", pa.date32()))
+# Rows are sorted by time before writing, so small row groups let time-range
+# reads skip most of a busy partition using the row-group statistics
+ROW_GROUP_ROWS = 64 * 1024
+COMPRESSION = "zstd"
 
 def save_parquet(df, filename):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     df.to_parquet(filename, index=False)
+
+
+class ParquetStreamWriter:
+    """
+    Append-only Parquet dataset written while scraping.
+
+    Records are buffered and every flush becomes its own part file, written
+    to a temp name and renamed into place, so a crash loses at most the
+    unflushed buffer and never leaves a half-written file in the dataset.
+    Safe to call from several scraper threads.
+
+    Args:
+        directory: Dataset directory (created if missing; existing parts are kept)
+        batch_size: Records buffered before a part file is written
+        schema: Arrow schema of the records
+    """
+
+    def __init__(self, directory, batch_size=500, schema=RAW_TWEET_SCHEMA):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.schema = schema
+        self.buffer = []
+        self.buffered_rows = 0
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, records):
+        """
+        Buffer records, flushing once batch_size is reached.
+
+        Args:
+            records: List of dicts, or any Arrow-compatible table (e.g. a
+                scraper TweetColumns), which is buffered without copying
+
+        Returns:
+            bool: True if this call flushed everything buffered to disk
+        """
+        if isinstance(records, list):
+            table = pa.Table.from_pylist(records, schema=self.schema)
+        else:
+            table = pa.table(records).cast(self.schema)
+        with self._lock:
+            self.buffer.append(table)
+            self.buffered_rows += table.num_rows
+            if self.buffered_rows >= self.batch_size:
+                self._flush()
+                return True
+            return False
+
+    def write_frame(self, df):
+        """Write a DataFrame (with the writer's schema) as its own part file right away."""
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        with self._lock:
+            self._write_part(table)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.buffered_rows:
+            return
+
+        self._write_part(pa.concat_tables(self.buffer).combine_chunks())
+        self.buffer = []
+        self.buffered_rows = 0
+
+    def _write_part(self, table):
+        # Time-ordered names keep the dataset in arrival order when read back
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        self.rows_written += table.num_rows
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_parquet_batches(path, batch_size=50_000, columns=None):
+    """
+    Lazily read a Parquet file or dataset directory as pandas DataFrames.
+
+    Only one batch is held in memory at a time, so a dataset that is still
+    being appended to (or far larger than RAM) can be processed in chunks.
+    """
+    dataset = ds.dataset(path, format="parquet")
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def read_dataset(path, columns=None):
+    return ds.dataset(path, format="parquet").to_table(columns=columns).to_pandas()
+
+
+def store_table(df):
+    """
+    Convert tweets to TWEET_STORE_SCHEMA types, sorted by timestamp.
+
+    Columns the schema does not know are dropped; missing counts become 0.
+    """
+    schema = pa.schema([f for f in TWEET_STORE_SCHEMA if f.name in df.columns])
+    df = df[schema.names].copy()
+    for field in schema:
+        if pa.types.is_integer(field.type):
+            df[field.name] = df[field.name].fillna(0)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+        df = df.sort_values("timestamp", kind="stable")
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def append_partitioned(df, directory, run_id=None):
+    """
+    Append tweets to a Hive-partitioned dataset (date=/searched_tag=).
+
+    Files are written zstd-compressed to a hidden staging directory, which
+    readers ignore, and then renamed into their partitions. Files are named
+    after ``run_id``, and earlier files of the same run are replaced, so
+    repeating the append of a resumed run does not store its tweets twice.
+
+    Args:
+        df: Tweets with at least timestamp and searched_tag
+        directory: Dataset root (created if missing)
+        run_id: Identifies the run's files; a unique one is made if omitted
+
+    Returns:
+        list: paths of the files written
+    """
+    run_id = run_id or f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    table = store_table(df)
+    table = table.append_column("date", pc.cast(table["timestamp"], pa.date32()))
+
+    staging = os.path.join(directory, f".staging-{uuid.uuid4().hex[:8]}")
+    options = ds.ParquetFileFormat().make_write_options(compression=COMPRESSION)
+    ds.write_dataset(table, staging, format="parquet", partitioning=PARTITIONING,
+                     basename_template=f"part-{run_id}-{{i}}.parquet", file_options=options,
+                     max_rows_per_group=ROW_GROUP_ROWS, min_rows_per_group=min(ROW_GROUP_ROWS, table.num_rows))
+
+    written = []
+    for root, _, files in os.walk(staging):
+        for name in files:
+            target_dir = os.path.join(directory, os.path.relpath(root, staging))
+            os.makedirs(target_dir, exist_ok=True)
+            os.replace(os.path.join(root, name), os.path.join(target_dir, name))
+            written.append(os.path.join(target_dir, name))
+    shutil.rmtree(staging)
+
+    # Only once the new files are in place, so a crash never leaves the run with no files
+    replaced = {os.path.normpath(p) for p in written}
+    for old in glob.glob(os.path.join(glob.escape(str(directory)), "*", "*", f"part-{glob.escape(run_id)}-*.parquet")):
+        if os.path.normpath(old) not in replaced:
+            os.remove(old)
+    return written
+
+
+def partition_filter(start=None, end=None, tags=None):
+    """
+    Dataset filter for tweets with start <= timestamp < end from ``tags``.
+
+    Dates and tags prune whole partition directories; the timestamp bounds
+    skip row groups through their min/max statistics. Naive datetimes are
+    taken as UTC.
+    """
+    ts_type = TWEET_STORE_SCHEMA.field("timestamp").type
+    conditions = []
+    if start is not None:
+        start = _utc(start)
+        conditions += [ds.field("date") >= start.date(),
+                       ds.field("timestamp") >= pa.scalar(start.to_pydatetime(), ts_type)]
+    if end is not None:
+        end = _utc(end)
+        conditions += [ds.field("date") <= end.date(),
+                       ds.field("timestamp") < pa.scalar(end.to_pydatetime(), ts_type)]
+    if tags is not None:
+        conditions.append(ds.field("searched_tag").isin(list(tags)))
+
+    condition = None
+    for c in conditions:
+        condition = c if condition is None else condition & c
+    return condition
+
+
+def read_partitioned(directory, start=None, end=None, tags=None, columns=None):
+    """
+    Read tweets from a dataset written by append_partitioned, pushing the
+    time range and tags down to partition and row-group pruning.
+
+    Example, the last two hours of #banknifty:
+        read_partitioned(path, start=pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=2),
+                         tags=["#banknifty"])
+
+    Returns:
+        DataFrame: one row per tweet, searched_tag and username as
+            categoricals; columns missing from older files are null
+    """
+    # Explicit, so the schema is not inferred from whichever file comes first
+    dataset = ds.dataset(directory, format="parquet", partitioning=PARTITIONING, schema=PARTITIONED_SCHEMA)
+    if columns is None:
+        columns = TWEET_STORE_SCHEMA.names
+    table = dataset.to_table(columns=columns, filter=partition_filter(start, end, tags))
+    if "searched_tag" in table.column_names:
+        i = table.column_names.index("searched_tag")
+        table = table.set_column(i, "searched_tag", table["searched_tag"].dictionary_encode())
+    return table.to_pandas()
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+
+class ScrapeCheckpoint:
+    """
+    Manifest of scrape progress so a restarted run can skip finished work.
+
+    Tracks which hashtags are complete and, for the one in progress, the
+    scroll position up to which its tweets have been persisted. Every update
+    is written atomically (temp file + rename).
+
+    Args:
+        path: JSON manifest file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.completed = []
+        self.progress = {}
+        self.finished = False
+        # Names this run's output files, so a resumed run replaces rather than duplicates them
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.completed = state.get("completed", [])
+            self.progress = state.get("progress", {})
+            self.finished = state.get("finished", False)
+            self.run_id = state.get("run_id", self.run_id)
+
+    def is_done(self, hashtag):
+        return hashtag in self.completed
+
+    def resume_scroll(self, hashtag):
+        """Scroll position to restart an interrupted hashtag from (0 if not started)."""
+        return self.progress.get(hashtag, {}).get("scroll", 0)
+
+    def update(self, hashtag, scroll, tweets):
+        with self._lock:
+            self.progress[hashtag] = {"scroll": scroll, "tweets": tweets}
+            self._save()
+
+    def mark_done(self, hashtag):
+        with self._lock:
+            if hashtag not in self.completed:
+                self.completed.append(hashtag)
+            self.progress.pop(hashtag, None)
+            self._save()
+
+    def mark_finished(self):
+        with self._lock:
+            self.finished = True
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "completed": self.completed,
+                "progress": self.progress,
+                "finished": self.finished,
+                "run_id": self.run_id,
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,327 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from analysis.signal_generator import BEARISH_TERMS, BULLISH_TERMS
+from processing.instruments import OPTION_TYPES
+
+INDEX_FILE = "data/state/dedup_index.npz"
+# MinHash signature length and its split into LSH bands (bands * rows == NUM_PERM)
+NUM_PERM = 64
+LSH_BANDS = 16
+# Estimated Jaccard similarity of character shingles above which a tweet counts as a near-duplicate
+NEAR_DUP_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+# Fixed so signatures stay comparable across runs and processes
+MINHASH_SEED = 1
+# Tweets are forgotten after this long (copy-paste repeats turn up within hours
+# or days) and beyond this many, oldest first, so a long-running daemon's index
+# and its saves stay bounded
+RETENTION_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 500_000
+# Evicted entries are compacted away once they make up this share of the index
+PRUNE_FRACTION = 0.1
+# Words that reverse a tweet's call: option types, the signal lexicon and plain
+# directions. Near-duplicates must use the same ones, in the same order.
+DIRECTION_WORDS = frozenset(
+    {word for term in [*OPTION_TYPES, *BULLISH_TERMS, *BEARISH_TERMS] for word in term.split()}
+    | {"up", "down", "above", "below", "higher", "lower", "bull", "bear", "buying", "bought", "sold", "not"}
+)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_URL_RE = re.compile(r"https?://\S+")
+_SYMBOL_RE = re.compile(r"[^\w@#]+")
+_NUMBER_RE = re.compile(r"\d[\d,.]*")
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def normalize_text(content):
+    """Lowercase, drop links, punctuation and emoji so trivial edits hash alike."""
+    return _SYMBOL_RE.sub(" ", _URL_RE.sub("", content.lower())).strip()
+
+
+def stable_hash(text):
+    """64-bit content hash that is the same in every process (unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def guard_key(text):
+    """Stable hash of what a near-duplicate must share: the numbers (levels, strikes, prices) and direction words."""
+    numbers = " ".join(sorted(n.replace(",", "") for n in _NUMBER_RE.findall(text)))
+    # "24300ce" reads as "24300 ce"
+    words = " ".join(w for w in _WORD_RE.findall(text.lower()) if w in DIRECTION_WORDS)
+    return stable_hash(f"{numbers}|{words}")
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+class DedupIndex:
+    """
+    Exact and near-duplicate tweet filter shared by every hashtag and run.
+
+    Exact matches use a stable 64-bit hash of the normalized text. Near
+    duplicates (copy-paste spam with small edits) use MinHash signatures over
+    character shingles, bucketed by LSH bands so a lookup only compares
+    against the few tweets that share a band. A near-duplicate must also
+    quote the same numbers and direction words (guard_key): "buying 24300
+    CE" differs by one token from "buying 52000 CE" or "buying 24300 PE",
+    and "will go up" from "will go down", but each is a different call.
+    Thread-safe, so one index can
+    back all workers of a DriverPool.
+
+    Tweets are kept in the order they were added. Those older than
+    ``retention`` seconds, and the oldest beyond ``max_entries``, are
+    evicted. Eviction happens in one compaction once PRUNE_FRACTION of the
+    index is due, so its cost is spread over many inserts.
+
+    With ``staged``, tweets added under an owner (e.g. the hashtag being
+    polled) filter duplicates at once but are only saved after
+    ``commit(owner, upto)``, so a save never holds tweets that were not yet
+    persisted downstream and a repeated poll after a crash still keeps them.
+
+    Args:
+        path: .npz file the index is loaded from and saved to (None keeps it in memory)
+        threshold: Minimum estimated Jaccard similarity for a near-duplicate
+        num_perm: MinHash signature length
+        bands: LSH bands; num_perm must be divisible by it
+        retention: Seconds a tweet stays indexed
+        max_entries: Most tweets indexed at once
+        clock: Wall-clock time source in seconds (entries are saved with epoch times)
+        staged: Keep tweets added with an owner out of saves until committed
+    """
+
+    def __init__(self, path=None, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS,
+                 retention=RETENTION_SECONDS, max_entries=MAX_ENTRIES, clock=time.time, staged=False):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.retention = retention
+        self.max_entries = max_entries
+        self.clock = clock
+        self.staged = staged
+        self._a, self._b = _permutations(num_perm, MINHASH_SEED)
+        self._lock = threading.Lock()
+
+        self.exact = set()
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        # guard_key of each signature row
+        self.guards = np.empty(0, dtype=np.uint64)
+        # Exact hash and time added of each signature row
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.added = np.empty(0, dtype=np.float64)
+        # Insert sequence number and uncommitted owner (0: committed) of each row
+        self.seqs = np.empty(0, dtype=np.int64)
+        self.owners = np.empty(0, dtype=np.int32)
+        self._owner_codes = {}
+        self._inserted = 0
+        self._count = 0
+        self.buckets = [{} for _ in range(bands)]
+        self.dropped = {"exact": 0, "near": 0}
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self.exact)
+
+    def minhash(self, text):
+        """MinHash signature of the text's character shingles."""
+        k = SHINGLE_SIZE
+        shingles = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+        perm = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return (perm.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _near_match(self, signature, guard, keys):
+        candidates = set()
+        for bucket, key in zip(self.buckets, keys):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return False
+
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        rows = rows[self.guards[rows] == guard]
+        if not len(rows):
+            return False
+
+        similarity = (self.signatures[rows] == signature).mean(axis=1)
+        return bool(similarity.max() >= self.threshold)
+
+    def _insert(self, signature, guard, keys, key, owner=0):
+        if self._count == len(self.signatures):
+            capacity = max(1024, 2 * self._count)
+            grown = np.empty((capacity, self.num_perm), dtype=np.uint32)
+            grown[:self._count] = self.signatures[:self._count]
+            self.signatures = grown
+            self.guards = np.resize(self.guards, capacity)
+            self.keys = np.resize(self.keys, capacity)
+            self.added = np.resize(self.added, capacity)
+            self.seqs = np.resize(self.seqs, capacity)
+            self.owners = np.resize(self.owners, capacity)
+
+        row = self._count
+        self.signatures[row] = signature
+        self.guards[row] = guard
+        self.keys[row] = key
+        self.added[row] = self.clock()
+        self.seqs[row] = self._inserted
+        self.owners[row] = owner
+        self._inserted += 1
+        self._count += 1
+        for bucket, band_key in zip(self.buckets, keys):
+            bucket.setdefault(band_key, []).append(row)
+
+    def _evictable(self):
+        """Leading rows due for eviction: expired, or the oldest beyond max_entries."""
+        expired = int(np.searchsorted(self.added[:self._count], self.clock() - self.retention, side="left"))
+        return max(expired, self._count - self.max_entries)
+
+    def prune(self, force=False):
+        """
+        Evict expired and surplus tweets once PRUNE_FRACTION of the index is due (any at all with ``force``).
+
+        Returns:
+            int: tweets evicted
+        """
+        with self._lock:
+            return self._prune(force)
+
+    def _prune(self, force=False):
+        drop = self._evictable()
+        if drop <= 0 or (not force and drop < PRUNE_FRACTION * max(self._count, self.max_entries)):
+            return 0
+
+        keep = slice(drop, self._count)
+        self.signatures = self.signatures[keep].copy()
+        self.guards = self.guards[keep].copy()
+        self.keys = self.keys[keep].copy()
+        self.added = self.added[keep].copy()
+        self.seqs = self.seqs[keep].copy()
+        self.owners = self.owners[keep].copy()
+        self._count = len(self.signatures)
+        # Indexes saved before keys were kept per row (key 0) only have their signatures
+        self.exact = set(self.keys[self.keys != 0].tolist())
+        self._rebuild_buckets()
+        logging.info(f"dedup: evicted {drop} tweets, {self._count} indexed")
+        return drop
+
+    def _rebuild_buckets(self):
+        self.buckets = [{} for _ in range(self.bands)]
+        for row, signature in enumerate(self.signatures[:self._count]):
+            for bucket, key in zip(self.buckets, self._band_keys(signature)):
+                bucket.setdefault(key, []).append(row)
+
+    def mark(self):
+        """Position to pass to ``commit``: covers every tweet added so far."""
+        with self._lock:
+            return self._inserted
+
+    def commit(self, owner, upto=None):
+        """Let saves include the tweets ``owner`` added before ``mark()`` returned ``upto`` (default: all)."""
+        with self._lock:
+            code = self._owner_codes.get(owner)
+            if code is None:
+                return
+            rows = self.owners[:self._count] == code
+            if upto is not None:
+                rows &= self.seqs[:self._count] < upto
+            self.owners[:self._count][rows] = 0
+
+    def check_and_add(self, content, owner=None):
+        """
+        Look the tweet up and index it if it is new.
+
+        Args:
+            content: Tweet text
+            owner: With ``staged``, who added the tweet; it is left out of
+                saves until ``commit(owner)``
+
+        Returns:
+            str: "exact" or "near" if content duplicates an indexed tweet,
+                None if it is new (it is now indexed)
+        """
+        text = normalize_text(content)
+        key = stable_hash(text)
+        guard = guard_key(content)
+        signature = self.minhash(text)
+        band_keys = self._band_keys(signature)
+
+        with self._lock:
+            if key in self.exact:
+                self.dropped["exact"] += 1
+                return "exact"
+            if self._near_match(signature, guard, band_keys):
+                self.dropped["near"] += 1
+                return "near"
+
+            self.exact.add(key)
+            code = 0
+            if self.staged and owner is not None:
+                code = self._owner_codes.setdefault(owner, len(self._owner_codes) + 1)
+            self._insert(signature, guard, band_keys, key, code)
+            self._prune()
+            return None
+
+    def save(self, path=None):
+        """Write the index atomically to ``path`` (default: the path it was opened with)."""
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            self._prune()
+            committed = self.owners[:self._count] == 0
+            exact = self.exact
+            if not committed.all():
+                exact = exact - set(self.keys[:self._count][~committed].tolist())
+            exact = np.fromiter(exact, dtype=np.uint64, count=len(exact))
+            signatures = self.signatures[:self._count][committed]
+            guards = self.guards[:self._count][committed]
+            keys = self.keys[:self._count][committed]
+            added = self.added[:self._count][committed]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, exact=exact, signatures=signatures, guards=guards, keys=keys, added=added,
+                 params=np.array([self.num_perm, self.bands, SHINGLE_SIZE, MINHASH_SEED]))
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        with np.load(self.path) as data:
+            params = [int(p) for p in data["params"]]
+            if params != [self.num_perm, self.bands, SHINGLE_SIZE, MINHASH_SEED]:
+                logging.warning(f"Ignoring dedup index {self.path}: built with different MinHash parameters")
+                return
+            self.exact = set(data["exact"].tolist())
+            self.signatures = data["signatures"]
+            # Indexes saved before guard_key only hashed the numbers, so their rows match no new tweet
+            self.guards = data["guards"] if "guards" in data else data["numbers"]
+            self._count = len(self.signatures)
+            # Older indexes have no per-row keys or times; their tweets count as added now
+            self.keys = data["keys"] if "keys" in data else np.zeros(self._count, dtype=np.uint64)
+            self.added = data["added"] if "added" in data else np.full(self._count, self.clock())
+        self.seqs = np.arange(self._count, dtype=np.int64)
+        self.owners = np.zeros(self._count, dtype=np.int32)
+        self._inserted = self._count
+
+        self._rebuild_buckets()
+        self._prune()
@@ -1,15 +1,75 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import os
+import threading
+from collections import Counter
 
-def get_driver(headless=False):
+DEFAULT_DEBUG_PORT = 9222
+DEFAULT_PROFILE_DIR = "selenium_chrome_profile"
+DRIVER_PATH_CACHE = ".chromedriver_path"
+
+# Requests a lean browser never needs: media, avatars, fonts and analytics beacons.
+# Timeline JSON and page scripts are left alone.
+LEAN_BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.m3u8", "*.m4s",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*pbs.twimg.com/*", "*video.twimg.com/*", "*abs.twimg.com/fonts/*",
+    "*/i/api/1.1/jot/*", "*/1.1/jot/*", "*google-analytics.com/*",
+    "*googletagmanager.com/*", "*doubleclick.net/*", "*ads-twitter.com/*",
+]
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_chromedriver():
+    """
+    Locate chromedriver without hitting the network on every start.
+
+    Order: $CHROMEDRIVER_PATH, this process's earlier result, the path cached
+    in .chromedriver_path, and only then ChromeDriverManager().install().
+    """
+    global _driver_path
+
+    with _driver_path_lock:
+        env_path = os.environ.get("CHROMEDRIVER_PATH")
+        if env_path:
+            return env_path
+
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+
+        if os.path.exists(DRIVER_PATH_CACHE):
+            with open(DRIVER_PATH_CACHE) as f:
+                cached = f.read().strip()
+            if cached and os.path.exists(cached):
+                _driver_path = cached
+                return _driver_path
+
+        # Only imported on a cache miss; it is slow to load and not needed otherwise
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        _driver_path = ChromeDriverManager().install()
+        with open(DRIVER_PATH_CACHE, "w") as f:
+            f.write(_driver_path)
+        return _driver_path
+
+
+def get_driver(headless=False, debug_port=DEFAULT_DEBUG_PORT, profile_dir=None, capture_network=False,
+               lean=False):
     """
     Creates and returns a Chrome WebDriver instance with optimal settings.
     
     Args:
         headless (bool): Whether to run Chrome in headless mode
+        debug_port (int): Remote debugging port; must be unique per concurrent browser
+        profile_dir (str): Chrome user data directory (default: ./selenium_chrome_profile)
+        capture_network (bool): Record network events in the performance log so
+            response bodies can be read back over CDP (see scraper.network_capture)
+        lean (bool): Skip images, media, fonts and analytics to cut bandwidth,
+            memory and page-ready time
         
     Returns:
         webdriver.Chrome: Configured Chrome WebDriver instance
@@ -18,7 +78,7 @@ def get_driver(headless=False):
 
     # Use a dedicated Selenium profile directory in your project
     # This avoids conflicts with your main Chrome profile
-    selenium_profile_dir = os.path.join(os.getcwd(), "selenium_chrome_profile")
+    selenium_profile_dir = os.path.abspath(profile_dir or DEFAULT_PROFILE_DIR)
     os.makedirs(selenium_profile_dir, exist_ok=True)
     
     chrome_options.add_argument(f"--user-data-dir={selenium_profile_dir}")
@@ -33,7 +93,7 @@ def get_driver(headless=False):
     chrome_options.add_argument("--disable-dev-shm-usage")
     
     # Remote debugging port (helps prevent DevToolsActivePort errors)
-    chrome_options.add_argument("--remote-debugging-port=9222")
+    chrome_options.add_argument(f"--remote-debugging-port={debug_port}")
     
     # Set window size (important for consistent rendering)
     chrome_options.add_argument("--window-size=1920,1080")
@@ -56,8 +116,22 @@ def get_driver(headless=False):
         "Chrome/120.0.0.0 Safari/537.36"
     )
 
+    # Lean mode: no image decoding, no web fonts (URL blocking happens over CDP below)
+    if lean:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-remote-fonts")
+        chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+
+    # Network event logging for timeline capture
+    if capture_network:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
     # Create service
-    service = Service(ChromeDriverManager().install())
+    service = Service(resolve_chromedriver())
 
     # Create and return driver
     driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -67,5 +141,47 @@ def get_driver(headless=False):
         "userAgent": driver.execute_script("return navigator.userAgent").replace('Headless', '')
     })
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    if capture_network or lean:
+        # Keep response bodies around long enough to be fetched after each scroll
+        driver.execute_cdp_cmd('Network.enable', {
+            "maxTotalBufferSize": 100_000_000,
+            "maxResourceBufferSize": 20_000_000,
+        })
+
+    if lean:
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": LEAN_BLOCKED_URLS})
     
-    return driver
\ No newline at end of file
+    return driver
+
+
+class CommandCounter:
+    """
+    Counts the WebDriver commands (HTTP round trips to chromedriver) a driver sends.
+
+    Wraps ``driver.execute`` in place, so element-level calls such as
+    ``find_element``/``get_attribute`` are counted too.
+
+    Args:
+        driver (webdriver.Chrome): Driver to instrument
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.total = 0
+        self.by_command = Counter()
+        self._execute = driver.execute
+        driver.execute = self._counted_execute
+
+    def _counted_execute(self, driver_command, params=None):
+        self.total += 1
+        self.by_command[driver_command] += 1
+        return self._execute(driver_command, params)
+
+    def reset(self):
+        self.total = 0
+        self.by_command.clear()
+
+    def detach(self):
+        """Restore the driver's original execute method."""
+        self.driver.execute = self._execute
@@ -0,0 +1,149 @@
+import base64
+import json
+import logging
+import re
+from datetime import datetime
+
+# GraphQL endpoint the search page calls for every timeline page
+TIMELINE_URL_PATTERN = re.compile(r"/i/api/graphql/[^/]+/SearchTimeline")
+
+
+class TimelineCapture:
+    """
+    Pulls search timeline JSON out of Chrome's performance log.
+
+    Requires a driver created with ``get_driver(capture_network=True)``.
+    Responses are matched on ``Network.responseReceived`` and their bodies
+    fetched over CDP once ``Network.loadingFinished`` arrives, so a response
+    still downloading at drain time is picked up by the next drain.
+
+    Args:
+        driver: WebDriver with performance logging enabled
+        url_pattern: Compiled regex matched against response URLs
+    """
+
+    def __init__(self, driver, url_pattern=TIMELINE_URL_PATTERN):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.pending = set()
+
+    def reset(self):
+        """Discard everything logged so far (call before navigating)."""
+        self.driver.get_log("performance")
+        self.pending.clear()
+
+    def drain(self):
+        """
+        Returns:
+            list: Parsed JSON payloads of timeline responses finished since the last drain
+        """
+        finished = []
+
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived":
+                if self.url_pattern.search(params.get("response", {}).get("url", "")):
+                    self.pending.add(params["requestId"])
+            elif method == "Network.loadingFinished" and params.get("requestId") in self.pending:
+                self.pending.discard(params["requestId"])
+                finished.append(params["requestId"])
+
+        payloads = []
+        for request_id in finished:
+            try:
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                text = body["body"]
+                if body.get("base64Encoded"):
+                    text = base64.b64decode(text).decode("utf-8")
+                payloads.append(json.loads(text))
+            except Exception as e:
+                logging.warning(f"Could not read timeline response {request_id}: {e}")
+
+        return payloads
+
+
+def _iter_tweet_results(payload):
+    instructions = (
+        payload.get("data", {})
+               .get("search_by_raw_query", {})
+               .get("search_timeline", {})
+               .get("timeline", {})
+               .get("instructions", [])
+    )
+
+    for instruction in instructions:
+        entries = instruction.get("entries", [])
+        if "entry" in instruction:
+            entries = [instruction["entry"]]
+
+        for entry in entries:
+            content = entry.get("content", {})
+            items = [content.get("itemContent", {})]
+            items += [i.get("item", {}).get("itemContent", {}) for i in content.get("items", [])]
+
+            for item in items:
+                result = item.get("tweet_results", {}).get("result")
+                if not result:
+                    continue
+                if result.get("__typename") == "TweetWithVisibilityResults":
+                    result = result.get("tweet", {})
+                if result.get("legacy"):
+                    yield result
+
+
+def _to_iso(created_at):
+    try:
+        dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+        return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_timeline_response(payload):
+    """
+    Flatten one SearchTimeline response into raw tweet records.
+
+    Returns:
+        list: dicts with tweet_id, username, timestamp, content and exact
+            replies/retweets/likes/views/bookmarks counts
+    """
+    records = []
+
+    for result in _iter_tweet_results(payload):
+        legacy = result["legacy"]
+
+        user = result.get("core", {}).get("user_results", {}).get("result", {})
+        username = (
+            user.get("core", {}).get("screen_name")
+            or user.get("legacy", {}).get("screen_name")
+            or "NA"
+        )
+
+        note = result.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {})
+        content = (note.get("text") or legacy.get("full_text") or "").strip()
+
+        try:
+            views = int(result.get("views", {}).get("count", 0))
+        except (TypeError, ValueError):
+            views = 0
+
+        records.append({
+            "tweet_id": result.get("rest_id") or legacy.get("id_str"),
+            "username": username,
+            "timestamp": _to_iso(legacy.get("created_at")),
+            "content": content,
+            "replies": legacy.get("reply_count", 0),
+            "retweets": legacy.get("retweet_count", 0),
+            "likes": legacy.get("favorite_count", 0),
+            "views": views,
+            "bookmarks": legacy.get("bookmark_count", 0),
+        })
+
+    return records
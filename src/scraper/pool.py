@@ -0,0 +1,139 @@
+import logging
+import os
+import queue
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .driver_setup import get_driver, DEFAULT_DEBUG_PORT, DEFAULT_PROFILE_DIR
+from .twitter_scraper import TweetScraper
+
+WORKER_PROFILE_ROOT = "selenium_profiles"
+# Seconds each worker pauses after a hashtag to stay under rate limits
+WORKER_DELAY = 10
+
+# Chrome lock/cache entries that must not be copied into a worker profile
+_PROFILE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "LOCK", "Cache", "Code Cache", "GPUCache",
+    "ShaderCache", "GrShaderCache", "Crashpad", "DevToolsActivePort",
+)
+
+
+def clone_profile(source_dir, target_dir):
+    """
+    Copy an authenticated Chrome profile so another browser can use it concurrently.
+
+    Args:
+        source_dir: Logged-in profile (closed, so its cookies are flushed to disk)
+        target_dir: Worker profile directory; refreshed if it already exists
+    """
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    if os.path.isdir(source_dir):
+        shutil.copytree(source_dir, target_dir, ignore=_PROFILE_IGNORE)
+    else:
+        os.makedirs(target_dir)
+    return target_dir
+
+
+class DriverPool:
+    """
+    A fixed set of isolated browser sessions, one TweetScraper each.
+
+    Every worker gets its own remote debugging port and its own clone of the
+    pre-authenticated profile, so several browsers can run on one host.
+
+    Args:
+        size: Number of browsers to start
+        source_profile: Logged-in profile the workers are cloned from
+        base_port: Debugging port of worker 0; worker i uses base_port + i
+        headless: Whether to run the browsers headless
+        extraction: Extraction mode passed to every TweetScraper
+        lean: Start the browsers in lean mode (see get_driver)
+        dedup: DedupIndex shared by all workers, so a tweet found under
+            several hashtags is kept once
+        metrics: RunMetrics shared by all workers
+        throttle: Request pacing shared by all workers (see TweetScraper)
+    """
+
+    def __init__(self, size, source_profile=DEFAULT_PROFILE_DIR, base_port=DEFAULT_DEBUG_PORT,
+                 headless=False, extraction="bulk", lean=False, dedup=None, metrics=None, throttle=None):
+        self.size = size
+        self.scrapers = []
+        self._idle = queue.Queue()
+
+        try:
+            for i in range(size):
+                profile = clone_profile(source_profile, os.path.join(WORKER_PROFILE_ROOT, f"worker_{i}"))
+                driver = get_driver(headless=headless, debug_port=base_port + i, profile_dir=profile,
+                                    capture_network=(extraction == "network"), lean=lean)
+                scraper = TweetScraper(extraction=extraction, driver=driver, dedup=dedup, metrics=metrics,
+                                       throttle=throttle)
+                scraper.worker_id = i
+                self.scrapers.append(scraper)
+                self._idle.put(scraper)
+        except Exception:
+            self.close()
+            raise
+
+    def acquire(self):
+        return self._idle.get()
+
+    def release(self, scraper):
+        self._idle.put(scraper)
+
+    def close(self):
+        for scraper in self.scrapers:
+            try:
+                scraper.close()
+            except Exception as e:
+                logging.warning(f"Error closing worker browser: {e}")
+        self.scrapers = []
+
+
+def _scrape_one(pool, hashtag, delay, scrape_kwargs):
+    scraper = pool.acquire()
+    try:
+        return scraper.search_and_scrape(hashtag, **scrape_kwargs)
+    finally:
+        if delay:
+            time.sleep(delay)
+        pool.release(scraper)
+
+
+def scrape_parallel(pool, hashtags, max_concurrency=None, delay=WORKER_DELAY, on_batch=None, tag_kwargs=None):
+    """
+    Spread hashtags across the pool's browsers and yield results as they finish.
+
+    The caller is the single collector: results arrive one at a time on the
+    calling thread, so merging into a list or writer needs no locking.
+
+    Args:
+        pool: DriverPool to draw browsers from
+        hashtags: Hashtags to scrape
+        max_concurrency: Hashtags scraped at once (default and upper bound: pool size)
+        delay: Seconds a worker pauses after each hashtag (0 when requests
+            are paced by a HashtagScheduler instead)
+        on_batch: Per-scroll callback passed to search_and_scrape; runs on
+            worker threads, so it must be thread-safe
+        tag_kwargs: Optional {hashtag: {...}} of extra search_and_scrape
+            arguments per hashtag, e.g. start_scroll or since_id
+
+    Yields:
+        (hashtag, tweets, error) with exactly one of tweets/error set
+    """
+    workers = min(max_concurrency or pool.size, pool.size)
+    tag_kwargs = tag_kwargs or {}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper") as executor:
+        futures = {
+            executor.submit(_scrape_one, pool, tag, delay, {"on_batch": on_batch, **tag_kwargs.get(tag, {})}): tag
+            for tag in hashtags
+        }
+        for future in as_completed(futures):
+            tag = futures[future]
+            try:
+                yield tag, future.result(), None
+            except Exception as e:
+                logging.warning(f"Worker failed on {tag}: {e}")
+                yield tag, None, e
@@ -0,0 +1,167 @@
+import re
+from array import array
+
+import numpy as np
+import pyarrow as pa
+
+from processing.storage import RAW_TWEET_SCHEMA
+
+HASHTAG_RE = re.compile(r'#\w+')
+MENTION_RE = re.compile(r'@\w+')
+
+# Columns appended as-is from each tweet
+STRING_FIELDS = ("username", "timestamp", "tweet_id", "content", "searched_tag")
+ENGAGEMENT_FIELDS = ("replies", "retweets", "likes", "views", "bookmarks")
+COUNT_FIELDS = ("num_hashtags", "num_mentions", *ENGAGEMENT_FIELDS)
+# Small batches (one per scroll) merged into one once this many pile up
+COMPACT_BATCHES = 64
+
+
+class _ListBuilder:
+    """list<string> column as one flat value list plus int32 offsets."""
+
+    __slots__ = ("values", "offsets")
+
+    def __init__(self):
+        self.values = []
+        self.offsets = array("i", [0])
+
+    def append(self, items):
+        self.values.extend(items)
+        self.offsets.append(len(self.values))
+        return len(items)
+
+    def finish(self):
+        offsets = pa.array(np.frombuffer(self.offsets, dtype=np.int32))
+        return pa.ListArray.from_arrays(offsets, pa.array(self.values, pa.string()))
+
+
+class TweetColumns:
+    """
+    Columnar buffer of scraped tweets, laid out as RAW_TWEET_SCHEMA.
+
+    ``append`` writes each field straight into a per-column builder (string
+    lists, flat hashtag/mention values with offsets, ``array('q')`` counts)
+    instead of building a dict per tweet. ``seal`` packs the pending rows
+    into an Arrow RecordBatch, after which they cost their raw bytes plus a
+    few bytes of offsets each, with no Python objects left. ``extend`` and
+    ``to_arrow`` only collect batches (no copies), and the buffer speaks the
+    Arrow stream protocol, so ``pa.table(tweets)`` accepts it directly.
+
+    Rows can still be read as dicts (indexing, iteration, ``to_pylist``) for
+    code that wants a single tweet.
+
+    ``truncated`` is set by the scraper on a poll's result when it ran out of
+    scrolls before reaching tweets ingested by an earlier run, so older new
+    tweets may remain unscraped (see HighWaterMarks.advance).
+    ``reached_known`` is set on a scroll's batch when it skipped such a tweet.
+    """
+
+    def __init__(self, batches=None):
+        self.batches = list(batches or [])
+        self._rows = sum(b.num_rows for b in self.batches)
+        self._compacted = len(self.batches)
+        self.truncated = False
+        self.reached_known = False
+        self._reset()
+
+    def _reset(self):
+        # Builders in STRING_FIELDS / COUNT_FIELDS order
+        self._strings = tuple([] for _ in STRING_FIELDS)
+        self._hashtags = _ListBuilder()
+        self._mentions = _ListBuilder()
+        self._counts = tuple(array("q") for _ in COUNT_FIELDS)
+        self._pending = 0
+
+    def append(self, hashtag, username, timestamp, tweet_id, content, engagement):
+        """Add one tweet; ``engagement`` holds the ENGAGEMENT_FIELDS counts (missing ones are 0)."""
+        strings, counts = self._strings, self._counts
+        strings[0].append(username)
+        strings[1].append(timestamp)
+        strings[2].append(tweet_id)
+        strings[3].append(content)
+        strings[4].append(hashtag)
+
+        # Deduplicated in order of first appearance
+        tags = dict.fromkeys(HASHTAG_RE.findall(content)) if content else ()
+        users = dict.fromkeys(MENTION_RE.findall(content)) if content else ()
+        counts[0].append(self._hashtags.append(tags))
+        counts[1].append(self._mentions.append(users))
+        get = engagement.get
+        counts[2].append(get("replies") or 0)
+        counts[3].append(get("retweets") or 0)
+        counts[4].append(get("likes") or 0)
+        counts[5].append(get("views") or 0)
+        counts[6].append(get("bookmarks") or 0)
+        self._pending += 1
+
+    def seal(self):
+        """Pack pending rows into a RecordBatch; returns self."""
+        if not self._pending:
+            return self
+
+        columns = {name: pa.array(values, pa.string()) for name, values in zip(STRING_FIELDS, self._strings)}
+        columns["hashtags"] = self._hashtags.finish()
+        columns["mentions"] = self._mentions.finish()
+        for name, values in zip(COUNT_FIELDS, self._counts):
+            # Wraps the array's buffer instead of converting item by item
+            columns[name] = pa.array(np.frombuffer(values, dtype=np.int64))
+        self.batches.append(pa.RecordBatch.from_arrays([columns[f.name] for f in RAW_TWEET_SCHEMA],
+                                                       schema=RAW_TWEET_SCHEMA))
+        self._rows += self._pending
+        self._reset()
+        return self
+
+    def extend(self, other):
+        """Take over another buffer's rows (its batches are shared, not copied)."""
+        self.seal()
+        self.batches.extend(other.seal().batches)
+        self._rows += len(other)
+        if len(self.batches) - self._compacted >= COMPACT_BATCHES:
+            self._compact_tail()
+
+    def _compact_tail(self):
+        # Each batch carries fixed overhead, which adds up at ~20 tweets per scroll.
+        # Only batches added since the last compaction are copied, so the total cost stays linear.
+        tail = pa.Table.from_batches(self.batches[self._compacted:], schema=RAW_TWEET_SCHEMA)
+        self.batches[self._compacted:] = tail.combine_chunks().to_batches()
+        self._compacted = len(self.batches)
+
+    def __len__(self):
+        return self._rows + self._pending
+
+    def to_arrow(self):
+        self.seal()
+        return pa.Table.from_batches(self.batches, schema=RAW_TWEET_SCHEMA)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        return self.to_arrow().__arrow_c_stream__(requested_schema)
+
+    def to_pandas(self):
+        return self.to_arrow().to_pandas()
+
+    def column(self, name):
+        return self.to_arrow().column(name)
+
+    def filter(self, mask):
+        """New buffer with the rows where ``mask`` is true."""
+        return TweetColumns(self.to_arrow().filter(pa.array(mask, pa.bool_())).to_batches())
+
+    def to_pylist(self):
+        return self.to_arrow().to_pylist()
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        self.seal()
+        for batch in self.batches:
+            if i < batch.num_rows:
+                return batch.slice(i, 1).to_pylist()[0]
+            i -= batch.num_rows
+        raise IndexError("tweet index out of range")
+
+    def __iter__(self):
+        self.seal()
+        # One batch of dicts at a time, never the whole buffer
+        for batch in self.batches:
+            yield from batch.to_pylist()
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+STATE_FILE = "data/state/scheduler.json"
+# Request budget shared by every browser: sustained requests per second and burst size
+REQUEST_RATE = 0.5
+REQUEST_BURST = 10
+# Backoff after a rate-limit page doubles from BACKOFF_BASE up to BACKOFF_MAX (seconds)
+BACKOFF_BASE = 30
+BACKOFF_MAX = 15 * 60
+# Weight of the newest poll in a hashtag's moving average yield
+YIELD_ALPHA = 0.3
+# New tweets per request at which a hashtag gets the full scroll budget and the shortest interval
+BUSY_YIELD = 10.0
+MIN_INTERVAL = 60
+MAX_INTERVAL = 6 * 3600
+# Scrolls still granted to a hashtag that has gone quiet
+MIN_SCROLLS = 5
+
+
+class RateLimitError(RuntimeError):
+    """The site answered with a rate-limit or error page instead of tweets."""
+
+
+class TokenBucket:
+    """
+    Request budget that refills at ``rate`` tokens per second up to ``capacity``.
+
+    Thread-safe, so one bucket can pace every browser of a DriverPool.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Most tokens held at once (the burst size)
+        clock: Monotonic time source in seconds
+        sleep: Called to wait for tokens
+    """
+
+    def __init__(self, rate=REQUEST_RATE, capacity=REQUEST_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take ``tokens`` if available; returns 0, or the seconds until they will be."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are taken; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    def drain(self):
+        """Drop the saved-up burst, e.g. after a rate limit, so requests resume at the sustained rate."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class HashtagScheduler:
+    """
+    Decides which hashtag to poll next, how far to scroll it, and when to send the next request.
+
+    Every hashtag keeps a moving average of its yield, the new tweets per
+    request (page load or scroll) over its recent polls. The yield ranks the
+    due hashtags, sets how many scrolls each poll may use, and sets how long
+    until the hashtag is due again: from the shortest interval at BUSY_YIELD
+    up to the longest for tags that have gone quiet. Hashtags not polled before
+    come first.
+
+    Requests go through ``throttle``, which takes a token from the shared
+    TokenBucket and waits out any backoff. A RateLimitError passed to
+    ``record_error`` starts a backoff that doubles with every consecutive rate
+    limit (with jitter) and empties the bucket. Other errors only back off the
+    failing hashtag. Decisions are logged, and the stats are saved between
+    runs like the high-water marks.
+
+    Args:
+        hashtags: Hashtags to schedule
+        path: JSON state file (None keeps the stats in memory)
+        bucket: TokenBucket to pace requests with (default: REQUEST_RATE / REQUEST_BURST)
+        scroll_limit: Scrolls allowed for a busy or new hashtag
+        intervals: (shortest, longest) seconds between polls of a hashtag
+        backoff: (first, longest) pause in seconds after a rate limit
+        clock: Wall-clock time source in seconds (stats are saved as epoch times)
+        sleep: Called to wait out a backoff
+    """
+
+    def __init__(self, hashtags, path=STATE_FILE, bucket=None, scroll_limit=50, intervals=(MIN_INTERVAL, MAX_INTERVAL),
+                 backoff=(BACKOFF_BASE, BACKOFF_MAX), clock=time.time, sleep=time.sleep):
+        self.hashtags = list(hashtags)
+        self.path = path
+        self.bucket = bucket if bucket is not None else TokenBucket()
+        self.max_scrolls = scroll_limit
+        self.min_interval, self.max_interval = intervals
+        self.backoff_base, self.backoff_max = backoff
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.backoff_until = 0.0
+        self.rate_limits = 0
+        # Requests sent per hashtag during its current poll
+        self.requests = {}
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.stats = state.get("hashtags", {})
+            self.backoff_until = state.get("backoff_until", 0.0)
+            self.rate_limits = state.get("rate_limits", 0)
+
+    def _stats(self, tag):
+        return self.stats.setdefault(tag, {"yield": None, "polls": 0, "failures": 0, "next_due": 0.0})
+
+    def yield_of(self, tag):
+        """Average new tweets per request, or None if never polled."""
+        return self.stats.get(tag, {}).get("yield")
+
+    def _rank_key(self, tag):
+        rate = self.yield_of(tag)
+        return (rate is not None, -(rate or 0.0))
+
+    def ranking(self):
+        """Every hashtag, unpolled first, then by yield from busiest to quietest."""
+        return sorted(self.hashtags, key=self._rank_key)
+
+    def due(self, tags=None):
+        """Hashtags (of ``tags``, default all) whose next poll is due, busiest first."""
+        now = self.clock()
+        return [t for t in sorted(tags if tags is not None else self.hashtags, key=self._rank_key)
+                if self.stats.get(t, {}).get("next_due", 0.0) <= now]
+
+    def next_due(self, tag):
+        return self.stats.get(tag, {}).get("next_due", 0.0)
+
+    def scroll_limit(self, tag):
+        """Scrolls for the next poll: the full limit for new and busy hashtags, down to MIN_SCROLLS for quiet ones."""
+        rate = self.yield_of(tag)
+        if rate is None:
+            return self.max_scrolls
+        share = min(1.0, rate / BUSY_YIELD)
+        return max(min(MIN_SCROLLS, self.max_scrolls), round(MIN_SCROLLS + (self.max_scrolls - MIN_SCROLLS) * share))
+
+    def interval(self, tag):
+        """Seconds between polls of the hashtag, inversely proportional to its yield."""
+        rate = self.yield_of(tag)
+        if rate is None:
+            return self.min_interval
+        if rate <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, self.min_interval * BUSY_YIELD / rate))
+
+    def throttle(self, tag=None):
+        """Wait for any backoff to pass and for a request token; call before every page load and scroll."""
+        while True:
+            wait = self.backoff_until - self.clock()
+            if wait <= 0:
+                break
+            logging.info(f"scheduler: backing off {wait:.0f} s before the next request{f' for {tag}' if tag else ''}")
+            self.sleep(wait)
+
+        waited = self.bucket.acquire()
+        if waited:
+            logging.debug(f"scheduler: request budget empty, waited {waited:.1f} s{f' for {tag}' if tag else ''}")
+        if tag is not None:
+            with self._lock:
+                self.requests[tag] = self.requests.get(tag, 0) + 1
+        return waited
+
+    def record(self, tag, new_tweets, requests=None):
+        """
+        Fold a finished poll into the hashtag's yield and schedule its next poll.
+
+        Args:
+            tag: Hashtag polled
+            new_tweets: Tweets it returned that had not been collected before
+            requests: Requests the poll used (default: those counted by ``throttle``)
+        """
+        with self._lock:
+            requests = requests or self.requests.pop(tag, 0) or 1
+            self.requests.pop(tag, None)
+            stats = self._stats(tag)
+            rate = new_tweets / requests
+            stats["yield"] = rate if stats["yield"] is None else YIELD_ALPHA * rate + (1 - YIELD_ALPHA) * stats["yield"]
+            stats["polls"] += 1
+            stats["failures"] = 0
+            stats["last_poll"] = self.clock()
+            stats["next_due"] = stats["last_poll"] + self.interval(tag)
+            self.rate_limits = 0
+            logging.info(f"scheduler: {tag} +{new_tweets} tweets in {requests} requests ({rate:.1f}/request), "
+                         f"yield {stats['yield']:.2f}, next poll in {stats['next_due'] - stats['last_poll']:.0f} s "
+                         f"with {self.scroll_limit(tag)} scrolls")
+            self._save()
+
+    def record_error(self, tag, error):
+        """
+        Back off after a failed poll: globally for a RateLimitError, otherwise only for ``tag``.
+
+        Returns:
+            float: Seconds until ``tag`` may be polled again
+        """
+        with self._lock:
+            self.requests.pop(tag, None)
+            now = self.clock()
+            if isinstance(error, RateLimitError):
+                # Jitter keeps several workers from retrying in lockstep
+                delay = min(self.backoff_max, self.backoff_base * 2 ** self.rate_limits) * random.uniform(0.75, 1.0)
+                self.rate_limits += 1
+                self.backoff_until = max(self.backoff_until, now + delay)
+                self.bucket.drain()
+                logging.warning(f"scheduler: rate limited on {tag} ({self.rate_limits} in a row), "
+                                f"pausing all requests for {delay:.0f} s")
+            else:
+                stats = self._stats(tag)
+                stats["failures"] += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (stats["failures"] - 1))
+                stats["next_due"] = now + delay
+                logging.warning(f"scheduler: {tag} failed ({stats['failures']} in a row: {error}), "
+                                f"retrying it in {delay:.0f} s")
+            self._save()
+            return delay
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"hashtags": self.stats, "backoff_until": self.backoff_until,
+                       "rate_limits": self.rate_limits}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import time
+
+SESSION_FILE = "session/x_cookies.json"
+# Cookie X sets once a login succeeds
+AUTH_COOKIE = "auth_token"
+
+
+def save_cookies(driver, path=SESSION_FILE):
+    """Write the browser's cookies for the current site to disk."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(driver.get_cookies(), f)
+    os.replace(tmp_path, path)
+
+
+def load_cookies(path=SESSION_FILE):
+    """
+    Returns:
+        list: Saved cookies that have not expired yet (empty if none are saved)
+    """
+    if not os.path.exists(path):
+        return []
+
+    try:
+        with open(path) as f:
+            cookies = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable session file {path}: {e}")
+        return []
+
+    now = time.time()
+    return [c for c in cookies if c.get("expiry") is None or c["expiry"] > now]
+
+
+def has_valid_session(cookies):
+    return any(c.get("name") == AUTH_COOKIE for c in cookies)
+
+
+def restore_session(driver, base_url, path=SESSION_FILE):
+    """
+    Load saved cookies into the browser and check the session still works.
+
+    Args:
+        driver: WebDriver to log in
+        base_url: Site root the cookies belong to
+        path: Saved cookie file
+
+    Returns:
+        bool: True if the home timeline loads without a redirect to login
+    """
+    cookies = load_cookies(path)
+    if not has_valid_session(cookies):
+        return False
+
+    # Cookies can only be set for the domain currently open
+    driver.get(base_url)
+    for cookie in cookies:
+        cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logging.warning(f"Skipping cookie {cookie.get('name')}: {e}")
+
+    driver.get(f"{base_url}/home")
+    time.sleep(2)
+    return "/login" not in driver.current_url and "/i/flow/login" not in driver.current_url
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+STATE_FILE = "data/state/high_water_marks.json"
+
+
+class HighWaterMarks:
+    """
+    Newest tweet already ingested per hashtag, persisted between runs.
+
+    Tweet IDs are time-ordered snowflakes, so anything at or below a
+    hashtag's mark has been collected before and the scraper can stop
+    scrolling as soon as it reaches it.
+
+    A poll that runs out of scrolls first still raises the mark, but leaves
+    a gap between the old mark and the oldest tweet it scraped. The gap is
+    polled next (see ``query``) and narrowed until a poll reaches the old
+    mark, so tweets of a burst longer than the scroll limit are not skipped.
+
+    Args:
+        path: JSON state file (None keeps the marks in memory)
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.marks = {}
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.marks = json.load(f)
+
+    def since_id(self, hashtag):
+        """Newest ingested tweet ID for the hashtag, or None on first run."""
+        return self.marks.get(hashtag, {}).get("tweet_id")
+
+    def query(self, hashtag):
+        """
+        since_id and max_id for the hashtag's next poll.
+
+        Returns:
+            dict: the open gap if there is one, else everything newer than
+                the mark (max_id None)
+        """
+        mark = self.marks.get(hashtag, {})
+        gap = mark.get("gap")
+        if gap:
+            return {"since_id": gap["after"], "max_id": str(int(gap["before"]) - 1)}
+        return {"since_id": mark.get("tweet_id"), "max_id": None}
+
+    def advance(self, hashtag, tweets, truncated=False):
+        """
+        Record a poll of the hashtag made with ``query(hashtag)``, and save.
+
+        Args:
+            hashtag: Hashtag polled
+            tweets: Tweets the poll collected (dicts or a TweetColumns)
+            truncated: Whether the poll ran out of scrolls before reaching
+                tweets at or below its since_id
+        """
+        newest = oldest = None
+        for t in tweets:
+            if not t.get("tweet_id"):
+                continue
+            if newest is None or int(t["tweet_id"]) > int(newest["tweet_id"]):
+                newest = t
+            if oldest is None or int(t["tweet_id"]) < int(oldest["tweet_id"]):
+                oldest = t
+
+        with self._lock:
+            mark = dict(self.marks.get(hashtag, {}))
+            gap = mark.get("gap")
+            if gap:
+                # This poll searched the gap: close it, or move its upper end down
+                if not truncated:
+                    del mark["gap"]
+                elif oldest is not None and int(oldest["tweet_id"]) < int(gap["before"]):
+                    mark["gap"] = {"after": gap["after"], "before": oldest["tweet_id"]}
+                else:
+                    return
+            else:
+                current = mark.get("tweet_id")
+                if newest is None or (current is not None and int(current) >= int(newest["tweet_id"])):
+                    return
+                if truncated and current is not None:
+                    mark["gap"] = {"after": current, "before": oldest["tweet_id"]}
+                mark.update(tweet_id=newest["tweet_id"], timestamp=newest["timestamp"])
+            self.marks[hashtag] = mark
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.marks, f, indent=2)
+        os.replace(tmp_path, self.path)
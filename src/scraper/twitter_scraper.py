@@ -8,7 +8,14 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 
-from .driver_setup import get_driver
+from .dedup import DedupIndex
+from .driver_setup import get_driver, CommandCounter
+from .network_capture import TimelineCapture, parse_timeline_response
+from .records import TweetColumns
+from .scheduler import RateLimitError
+from .session import restore_session, save_cookies, SESSION_FILE
+from .waits import TimelineWaiter, WAIT_TIMEOUT, QUIET_PERIOD
+from monitoring.metrics import NullMetrics
 
 
 HASHTAGS = ["#nifty", "#nifty50", "#niftyanalysis", "#banknifty", "#sensex", "#indianstockmarket", 
@@ -16,21 +23,149 @@ HASHTAGS = ["#nifty", "#nifty50", "#niftyanalysis", "#banknifty", "#sensex", "#i
             "#nse", "#bse", "#intraday", "#intradaytrading", "#optionbuying", "#optionselling"]
 SCROLL_LIMIT = 50
 MIN_TWEETS_REQUIRED = 2000
+BASE_URL = "https://x.com"
+EXTRACTION_MODES = ("bulk", "dom", "network")
+
+TWEET_SELECTORS = [
+    "article[data-testid='tweet']",
+    "div[data-testid='cellInnerDiv']",
+    "article",
+]
+
+# Runs inside the page and returns every visible tweet in one WebDriver round
+# trip. Mirrors the selector fallbacks of the element-by-element ("dom") path;
+# count parsing and entity extraction stay in Python.
+EXTRACT_TWEETS_JS = """
+const selectors = arguments[0];
+let nodes = [];
+for (const s of selectors) {
+    nodes = document.querySelectorAll(s);
+    if (nodes.length) break;
+}
+const profileRe = /^https:\\/\\/(x|twitter)\\.com\\/[A-Za-z0-9_]+\\/?$/;
+const lastSegment = (href) => href.replace(/\\/+$/, '').split('/').pop();
+const records = [];
+for (const t of nodes) {
+    const textEl = t.querySelector("div[data-testid='tweetText']") || t.querySelector("div[lang]");
+    if (!textEl) continue;
+
+    let username = "NA";
+    const userLink = t.querySelector("div[data-testid='User-Name'] a[role='link']");
+    if (userLink && userLink.href) {
+        username = lastSegment(userLink.href);
+    } else {
+        for (const a of t.querySelectorAll("a[href]")) {
+            if (profileRe.test(a.href)) { username = lastSegment(a.href); break; }
+        }
+    }
+
+    const time = t.querySelector("time");
+    const statusLink = time ? time.closest("a[href*='/status/']") : null;
+    const statusMatch = statusLink ? statusLink.href.match(/\\/status\\/(\\d+)/) : null;
+
+    records.push({
+        content: textEl.innerText.trim(),
+        username: username,
+        timestamp: time ? time.getAttribute("datetime") : null,
+        tweet_id: statusMatch ? statusMatch[1] : null,
+        labels: Array.from(t.querySelectorAll("[aria-label]"), (b) => b.getAttribute("aria-label") || ""),
+    });
+}
+return records;
+"""
+
+# Text X shows in place of the timeline when requests are being rate limited
+RATE_LIMIT_MARKERS = ["rate limit exceeded", "something went wrong. try reloading", "you are over the daily limit"]
+
+RATE_LIMIT_JS = """
+const text = (document.body ? document.body.innerText : "").toLowerCase();
+return arguments[0].some((marker) => text.includes(marker));
+"""
+
+
+def search_query(hashtag, days_back=1, since_id=None, max_id=None, now=None):
+    """
+    Live search query for a hashtag.
+
+    A first poll searches the last ``days_back`` days up to and including
+    today (until: is exclusive). Incremental polls are bounded by tweet IDs
+    alone, so a date range cannot hide tweets posted since midnight.
+    """
+    # Remove spaces from hashtag for cleaner URL
+    query = hashtag.replace(" ", "")
+    if since_id or max_id:
+        if since_id:
+            query += f" since_id:{since_id}"
+        if max_id:
+            query += f" max_id:{max_id}"
+        return query
+
+    now = now or datetime.now()
+    start_date = (now - timedelta(days=days_back)).strftime("%Y-%m-%d")
+    tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+    return f"{query} since:{start_date} until:{tomorrow}"
 
 
 class TweetScraper:
-    def __init__(self):
-        self.driver = get_driver(headless=False)
+    def __init__(self, extraction="bulk", driver=None, wait_timeout=WAIT_TIMEOUT, quiet_period=QUIET_PERIOD,
+                 base_url=BASE_URL, lean=False, session_file=SESSION_FILE, dedup=None, metrics=None, throttle=None):
+        """
+        Args:
+            extraction: "bulk" pulls every visible tweet with a single
+                execute_script per scroll; "dom" walks tweet elements one
+                WebDriver call at a time (the original path); "network"
+                parses the SearchTimeline JSON responses the page receives.
+            driver: Existing WebDriver to use instead of starting a new one
+                (for "network" it must be created with capture_network=True)
+            wait_timeout: Maximum seconds to wait for new tweets after a scroll
+            quiet_period: Seconds without timeline changes after which a scroll is settled
+            base_url: Site root, e.g. a local stand-in server instead of x.com
+            lean: Start the browser without images, media, fonts and analytics
+            session_file: Saved cookies used to skip the manual login
+            dedup: DedupIndex shared with other scrapers/runs (default: a
+                private in-memory one, still shared across this scraper's hashtags)
+            metrics: RunMetrics that times every hashtag, extraction and scroll
+                and counts their WebDriver commands (default: not recorded)
+            throttle: Called with the hashtag before every search page load
+                and scroll, e.g. HashtagScheduler.throttle to pace requests
+                (default: no pacing)
+        """
+        if extraction not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction}")
+        self.extraction = extraction
+        self.base_url = base_url.rstrip("/")
+        self.session_file = session_file
+        self.dedup = dedup if dedup is not None else DedupIndex()
+        self.driver = driver or get_driver(headless=False, capture_network=(extraction == "network"), lean=lean)
+        self.capture = TimelineCapture(self.driver) if extraction == "network" else None
+        self.waiter = TimelineWaiter(self.driver, TWEET_SELECTORS[0], wait_timeout, quiet_period)
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.throttle = throttle
+        self.commands = CommandCounter(self.driver) if metrics is not None else None
         logging.basicConfig(filename="logs/scraper.log", level=logging.INFO)
         os.makedirs("debug_screenshots", exist_ok=True)
 
     # ------------------------------------------
     # LOGIN
     # ------------------------------------------
-    def login(self):
-        """Navigate to Twitter and wait for manual login"""
+    def login(self, interactive=True):
+        """
+        Reuse saved session cookies if still valid, otherwise wait for a manual login
+
+        Args:
+            interactive: Prompt for a manual login when there is no valid
+                session; False raises instead (for unattended runs)
+        """
+        if restore_session(self.driver, self.base_url, self.session_file):
+            print("✅ Logged in with saved session")
+            return
+
+        if not interactive:
+            raise RuntimeError(f"No valid saved session in {self.session_file}; "
+                               "run python src/main.py once to log in manually")
+
         print("\n🔐 Opening Twitter/X login page...")
-        self.driver.get("https://x.com/login")
+        self.driver.get(f"{self.base_url}/login")
         time.sleep(5)
 
         print("\n➡️ Please log in manually in the browser window.")
@@ -38,6 +173,7 @@ class TweetScraper:
         input("\nPress ENTER once you are fully logged in... ")
         
         time.sleep(3)
+        save_cookies(self.driver, self.session_file)
         print("✅ Login confirmed!")
 
     # ------------------------------------------
@@ -57,28 +193,31 @@ class TweetScraper:
         return list(set(re.findall(r'@\w+', text))) if text else []
 
     def extract_engagement_metrics(self, t):
-        metrics = {"replies": 0, "retweets": 0, "likes": 0, "views": 0, "bookmarks": 0}
-
         try:
             buttons = t.find_elements(By.CSS_SELECTOR, "[aria-label]")
-            for b in buttons:
-                label = b.get_attribute("aria-label") or ""
-                label_lower = label.lower()
-                num = self.parse_count(label)
-
-                if "repl" in label_lower:
-                    metrics["replies"] = num
-                elif "repost" in label_lower or "retweet" in label_lower:
-                    metrics["retweets"] = num
-                elif "like" in label_lower:
-                    metrics["likes"] = num
-                elif "view" in label_lower:
-                    metrics["views"] = num
-                elif "bookmark" in label_lower:
-                    metrics["bookmarks"] = num
-
+            labels = [b.get_attribute("aria-label") or "" for b in buttons]
         except:
-            pass
+            labels = []
+
+        return self.parse_engagement_labels(labels)
+
+    def parse_engagement_labels(self, labels):
+        metrics = {"replies": 0, "retweets": 0, "likes": 0, "views": 0, "bookmarks": 0}
+
+        for label in labels:
+            label_lower = label.lower()
+            num = self.parse_count(label)
+
+            if "repl" in label_lower:
+                metrics["replies"] = num
+            elif "repost" in label_lower or "retweet" in label_lower:
+                metrics["retweets"] = num
+            elif "like" in label_lower:
+                metrics["likes"] = num
+            elif "view" in label_lower:
+                metrics["views"] = num
+            elif "bookmark" in label_lower:
+                metrics["bookmarks"] = num
 
         return metrics
 
@@ -124,155 +263,291 @@ class TweetScraper:
 
         return False
 
-    def scroll_page(self):
-        self.driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight);"
-        )
-        time.sleep(2)
+    def is_rate_limited(self):
+        """True if the page shows a rate-limit or "Something went wrong" error instead of tweets."""
+        try:
+            return bool(self.driver.execute_script(RATE_LIMIT_JS, RATE_LIMIT_MARKERS))
+        except Exception:
+            return False
 
-    def get_tweet_elements(self):
-        selectors = [
-            "article[data-testid='tweet']",
-            "div[data-testid='cellInnerDiv']",
-            "article",
-        ]
+    def _request(self, hashtag):
+        if self.throttle:
+            self.throttle(hashtag)
 
-        for s in selectors:
+    def scroll_page(self, label=""):
+        """Scroll to the bottom and wait until new tweets render or the timeline settles."""
+        return self.waiter.scroll_and_wait(label)
+
+    def get_tweet_elements(self):
+        for s in TWEET_SELECTORS:
             tweets = self.driver.find_elements(By.CSS_SELECTOR, s)
             if tweets:
                 return tweets
 
         return []
 
+    # ------------------------------------------
+    # TWEET EXTRACTION
+    # ------------------------------------------
+    def extract_tweets_bulk(self):
+        """Return raw records for every visible tweet in one WebDriver call."""
+        return self.driver.execute_script(EXTRACT_TWEETS_JS, TWEET_SELECTORS) or []
+
+    def scrape_visible_bulk(self, hashtag, since_id=None):
+        tweets = TweetColumns()
+
+        for raw in self.extract_tweets_bulk():
+            try:
+                content = raw["content"]
+                if len(content) < 5:
+                    continue
+
+                if self.skip_known(tweets, raw["tweet_id"], since_id):
+                    continue
+                if self.dedup.check_and_add(content, owner=hashtag):
+                    continue
+
+                engagement = self.parse_engagement_labels(raw["labels"])
+                tweets.append(hashtag, raw["username"], raw["timestamp"], raw["tweet_id"], content, engagement)
+
+            except Exception as e:
+                logging.warning(f"Tweet parse error: {e}")
+                continue
+
+        return tweets.seal()
+
+    @staticmethod
+    def skip_known(tweets, tweet_id, since_id):
+        """
+        True if the tweet is at or below the high-water mark.
+
+        Checked before the dedup index, which already holds known tweets and
+        would otherwise hide that the timeline has caught up. Sets
+        ``tweets.reached_known`` when it skips one.
+        """
+        if since_id and tweet_id and int(tweet_id) <= int(since_id):
+            tweets.reached_known = True
+            return True
+        return False
+
+    def scrape_captured(self, hashtag, since_id=None):
+        """Build tweets from the timeline responses received since the last call."""
+        tweets = TweetColumns()
+
+        for payload in self.capture.drain():
+            try:
+                records = parse_timeline_response(payload)
+            except Exception as e:
+                logging.warning(f"Timeline parse error: {e}")
+                continue
+
+            for raw in records:
+                try:
+                    content = raw.pop("content")
+                    if len(content) < 5:
+                        continue
+
+                    if self.skip_known(tweets, raw["tweet_id"], since_id):
+                        continue
+                    if self.dedup.check_and_add(content, owner=hashtag):
+                        continue
+
+                    username, timestamp, tweet_id = raw.pop("username"), raw.pop("timestamp"), raw.pop("tweet_id")
+                    tweets.append(hashtag, username, timestamp, tweet_id, content, raw)
+
+                except Exception as e:
+                    logging.warning(f"Tweet parse error: {e}")
+                    continue
+
+        return tweets.seal()
+
+    def scrape_visible_dom(self, hashtag, since_id=None):
+        tweets = TweetColumns()
+
+        for t in self.get_tweet_elements():
+            try:
+                content = ""
+                try:
+                    content = t.find_element(By.CSS_SELECTOR, "div[data-testid='tweetText']").text.strip()
+                except:
+                    try:
+                        content = t.find_element(By.CSS_SELECTOR, "div[lang]").text.strip()
+                    except:
+                        continue
+
+                if len(content) < 5:
+                    continue
+
+                # timestamp + status id (the <time> sits inside the status permalink)
+                timestamp = None
+                tweet_id = None
+                try:
+                    time_el = t.find_element(By.TAG_NAME, "time")
+                    timestamp = time_el.get_attribute("datetime")
+                    status_href = time_el.find_element(By.XPATH, "./ancestor::a[1]").get_attribute("href") or ""
+                    match = re.search(r"/status/(\d+)", status_href)
+                    if match:
+                        tweet_id = match.group(1)
+                except:
+                    pass
+
+                # skip known tweets, then exact and near-duplicates, before the expensive lookups below
+                if self.skip_known(tweets, tweet_id, since_id):
+                    continue
+                if self.dedup.check_and_add(content, owner=hashtag):
+                    continue
+
+                # ✅ FIXED: Better username extraction
+                username = "NA"
+                try:
+                    # Try method 1: Look for user link in User-Name div
+                    user_link = t.find_element(By.CSS_SELECTOR, "div[data-testid='User-Name'] a[role='link']")
+                    href = user_link.get_attribute('href')
+                    if href:
+                        username = href.rstrip('/').split('/')[-1]
+                except:
+                    try:
+                        # Method 2: Find any link matching Twitter profile pattern
+                        user_links = t.find_elements(By.CSS_SELECTOR, "a[href]")
+                        for link in user_links:
+                            href = link.get_attribute("href") or ""
+                            # Match pattern: https://x.com/username or https://twitter.com/username
+                            if re.match(r"https://(x|twitter)\.com/[A-Za-z0-9_]+/?$", href):
+                                username = href.rstrip('/').split('/')[-1]
+                                break
+                    except:
+                        pass
+
+                engagement = self.extract_engagement_metrics(t)
+                tweets.append(hashtag, username, timestamp, tweet_id, content, engagement)
+
+            except Exception as e:
+                logging.warning(f"Tweet parse error: {e}")
+                continue
+
+        return tweets.seal()
+
     # ------------------------------------------
     # MAIN SCRAPER
     # ------------------------------------------
-    def search_and_scrape(self, hashtag, days_back=1):
+    def search_and_scrape(self, hashtag, days_back=1, on_batch=None, start_scroll=0, since_id=None, max_id=None,
+                          scroll_limit=SCROLL_LIMIT):
         """
         Scrape tweets for a hashtag
         
         Args:
             hashtag: Hashtag to search (e.g., '#nifty50')
-            days_back: Number of days to look back (default: 3)
+            days_back: Number of days to look back on a first poll (without since_id/max_id)
+            on_batch: Called as on_batch(hashtag, new_tweets, next_scroll) after
+                every scroll's extraction, e.g. to persist tweets as they arrive
+                (new_tweets is a TweetColumns batch)
+            start_scroll: Scroll position to resume from; earlier scrolls are
+                skipped without extracting
+            since_id: Newest tweet ID ingested by an earlier run; only newer
+                tweets are returned and scrolling stops once older ones appear
+            max_id: Newest tweet ID to search for, e.g. to fill a gap left by an
+                earlier poll (see HighWaterMarks.query)
+            scroll_limit: Most scrolls to extract, e.g. HashtagScheduler.scroll_limit(hashtag)
+
+        Returns:
+            TweetColumns: the new tweets; ``truncated`` is set if the scroll
+                limit was reached before any tweet at or below since_id
+
+        Raises:
+            RateLimitError: if the page shows a rate-limit error instead of
+                tweets (tweets of earlier scrolls were already passed to on_batch)
         """
-        # ✅ FIXED: Made date range configurable and wider
-        today = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+        with self.metrics.stage("scrape", commands=self.commands, hashtag=hashtag) as stage:
+            tweets = self._search_and_scrape(hashtag, days_back, on_batch, start_scroll, since_id, max_id, scroll_limit)
+            stage.rows_out = len(tweets)
+        return tweets
 
-        # Remove spaces from hashtag for cleaner URL
-        clean_hashtag = hashtag.replace(" ", "")
-        query = f"{clean_hashtag} since:{start_date} until:{today}"
-        
+    def _search_and_scrape(self, hashtag, days_back, on_batch, start_scroll, since_id, max_id, scroll_limit):
+        query = search_query(hashtag, days_back, since_id, max_id)
         encoded = (
             query.replace("#", "%23")
                  .replace(":", "%3A")
                  .replace(" ", "%20")
         )
 
-        url = f"https://x.com/search?q={encoded}&src=typed_query&f=live"
+        url = f"{self.base_url}/search?q={encoded}&src=typed_query&f=live"
         print(f"🔗 Searching: {url}")
+        if self.capture:
+            self.capture.reset()
+        self._request(hashtag)
         self.driver.get(url)
 
-        time.sleep(8)
-
         if not self.wait_for_tweets():
+            if self.is_rate_limited():
+                self.take_debug_screenshot("rate_limited")
+                raise RateLimitError(f"Rate limited while loading {hashtag}")
             print(f"⚠️ No tweets found for {hashtag}")
-            return []
-
-        tweets_data = []
-        seen = set()
-        no_new_scrolls = 0
+            return TweetColumns()
 
-        for scroll_i in range(SCROLL_LIMIT):
-            before = len(tweets_data)
-            tweet_elements = self.get_tweet_elements()
+        self.waiter.install()
 
-            for t in tweet_elements:
-                try:
-                    content = ""
-                    try:
-                        content = t.find_element(By.CSS_SELECTOR, "div[data-testid='tweetText']").text.strip()
-                    except:
-                        try:
-                            content = t.find_element(By.CSS_SELECTOR, "div[lang]").text.strip()
-                        except:
-                            continue
+        if start_scroll:
+            print(f"⏩ Resuming {hashtag} at scroll {start_scroll + 1}/{scroll_limit}")
+            for i in range(start_scroll):
+                self._request(hashtag)
+                self.scroll_page(f"[{hashtag}] fast-forward {i + 1}/{start_scroll}")
+            if self.capture:
+                self.capture.drain()
 
-                    if len(content) < 5:
-                        continue
-
-                    # unique signature (user + content)
-                    sig = hash(content)
-                    if sig in seen:
-                        continue
-
-                    seen.add(sig)
-
-                    # ✅ FIXED: Better username extraction
-                    username = "NA"
-                    try:
-                        # Try method 1: Look for user link in User-Name div
-                        user_link = t.find_element(By.CSS_SELECTOR, "div[data-testid='User-Name'] a[role='link']")
-                        href = user_link.get_attribute('href')
-                        if href:
-                            username = href.rstrip('/').split('/')[-1]
-                    except:
-                        try:
-                            # Method 2: Find any link matching Twitter profile pattern
-                            user_links = t.find_elements(By.CSS_SELECTOR, "a[href]")
-                            for link in user_links:
-                                href = link.get_attribute("href") or ""
-                                # Match pattern: https://x.com/username or https://twitter.com/username
-                                if re.match(r"https://(x|twitter)\.com/[A-Za-z0-9_]+/?$", href):
-                                    username = href.rstrip('/').split('/')[-1]
-                                    break
-                        except:
-                            pass
-
-                    # timestamp
-                    timestamp = None
-                    try:
-                        timestamp = t.find_element(By.TAG_NAME, "time").get_attribute("datetime")
-                    except:
-                        pass
-
-                    hashtags = self.extract_hashtags(content)
-                    mentions = self.extract_mentions(content)
-                    engagement = self.extract_engagement_metrics(t)
+        # Columnar, so a long run holds raw bytes rather than a dict per tweet
+        tweets_data = TweetColumns()
+        no_new_scrolls = 0
 
-                    tweet = {
-                        "username": username,
-                        "timestamp": timestamp,
-                        "content": content,
-                        "searched_tag": hashtag,
-                        "hashtags": hashtags,
-                        "mentions": mentions,
-                        "num_hashtags": len(hashtags),
-                        "num_mentions": len(mentions),
-                        **engagement
-                    }
+        for scroll_i in range(start_scroll, scroll_limit):
+            with self.metrics.stage("extract", commands=self.commands, hashtag=hashtag) as stage:
+                if self.extraction == "bulk":
+                    batch = self.scrape_visible_bulk(hashtag, since_id)
+                elif self.extraction == "network":
+                    batch = self.scrape_captured(hashtag, since_id)
+                else:
+                    batch = self.scrape_visible_dom(hashtag, since_id)
+                stage.rows_out = len(batch)
 
-                    tweets_data.append(tweet)
+            reached_known = batch.reached_known
 
-                except Exception as e:
-                    logging.warning(f"Tweet parse error: {e}")
-                    continue
+            tweets_data.extend(batch)
+            added = len(batch)
 
-            added = len(tweets_data) - before
+            if on_batch:
+                on_batch(hashtag, batch, scroll_i + 1)
             
             # ✅ IMPROVED: Show progress every 10 scrolls
             if scroll_i % 10 == 0 or added > 0:
-                print(f"[{hashtag}] +{added} tweets (total {len(tweets_data)}), scroll {scroll_i+1}/{SCROLL_LIMIT}")
+                print(f"[{hashtag}] +{added} tweets (total {len(tweets_data)}), scroll {scroll_i+1}/{scroll_limit}")
+
+            if reached_known:
+                print("✅ Reached tweets ingested by an earlier run. Stopping.")
+                break
 
             if added == 0:
+                if self.is_rate_limited():
+                    self.take_debug_screenshot("rate_limited")
+                    raise RateLimitError(f"Rate limited after {scroll_i} scrolls of {hashtag}")
                 no_new_scrolls += 1
                 if no_new_scrolls >= 4:
-                    print(f"⚠️ No new tweets after 4 scrolls. Stopping early.")
+                    print("⚠️ No new tweets after 4 scrolls. Stopping early.")
                     break
             else:
                 no_new_scrolls = 0
 
-            self.scroll_page()
+            self._request(hashtag)
+            with self.metrics.stage("scroll", commands=self.commands, hashtag=hashtag) as stage:
+                waited = self.scroll_page(f"[{hashtag}] {scroll_i + 1}/{scroll_limit}")
+                stage.extra.update(wait_reason=waited["reason"], new_cells=waited["new_cells"])
+
+            if self.waiter.exhausted():
+                print(f"⚠️ Timeline height stable for {self.waiter.stable_scrolls} scrolls. Reached the end.")
+                break
+        else:
+            # Out of scrolls with tweets newer than since_id possibly still below
+            tweets_data.truncated = bool(since_id)
+            if since_id:
+                print("⚠️ Scroll limit reached before tweets ingested by an earlier run")
 
         print(f"✅ Finished {hashtag}: {len(tweets_data)} tweets")
         return tweets_data
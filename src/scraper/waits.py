@@ -0,0 +1,121 @@
+import logging
+import time
+
+# Upper bound on how long one scroll waits for the timeline to react (seconds)
+WAIT_TIMEOUT = 8
+# Return early once the timeline has been mutation-free for this long (seconds)
+QUIET_PERIOD = 1.5
+# Consecutive scrolls with an unchanged scroll height before a page counts as exhausted
+STABLE_HEIGHT_SCROLLS = 3
+
+# Installs a MutationObserver on the timeline container that counts every
+# tweet cell the page inserts and stamps the time of the last DOM change.
+INSTALL_OBSERVER_JS = """
+const selector = arguments[0];
+if (window.__timelineWatch) {
+    window.__timelineWatch.observer.disconnect();
+}
+const container = document.querySelector("div[aria-label^='Timeline']")
+    || document.querySelector("main")
+    || document.body;
+const watch = {added: 0, lastChange: performance.now(), observer: null};
+watch.observer = new MutationObserver((mutations) => {
+    watch.lastChange = performance.now();
+    for (const m of mutations) {
+        for (const node of m.addedNodes) {
+            if (node.nodeType !== 1) continue;
+            if (node.matches(selector)) watch.added += 1;
+            else watch.added += node.querySelectorAll(selector).length;
+        }
+    }
+});
+watch.observer.observe(container, {childList: true, subtree: true});
+window.__timelineWatch = watch;
+return document.documentElement.scrollHeight;
+"""
+
+# Scrolls to the bottom, then resolves as soon as new tweet cells show up,
+# the timeline stays quiet for quietMs, or timeoutMs runs out.
+SCROLL_AND_WAIT_JS = """
+const [timeoutMs, quietMs, done] = arguments;
+const watch = window.__timelineWatch;
+const start = performance.now();
+const baseline = watch ? watch.added : 0;
+if (watch) watch.lastChange = start;
+window.scrollTo(0, document.body.scrollHeight);
+
+const finish = (reason) => done({
+    reason: reason,
+    waited_ms: performance.now() - start,
+    new_cells: watch ? watch.added - baseline : 0,
+    scroll_height: document.documentElement.scrollHeight,
+});
+const poll = () => {
+    const now = performance.now();
+    if (!watch) return finish("no_observer");
+    if (watch.added > baseline) return finish("new_cells");
+    if (now - watch.lastChange >= quietMs) return finish("quiet");
+    if (now - start >= timeoutMs) return finish("timeout");
+    setTimeout(poll, 25);
+};
+poll();
+"""
+
+
+class TimelineWaiter:
+    """
+    Event-driven replacement for the fixed sleeps in the scrape loop.
+
+    Args:
+        driver: WebDriver showing a search timeline
+        selector: CSS selector of a tweet cell
+        timeout: Maximum seconds to wait after each scroll
+        quiet_period: Seconds without DOM mutations after which a scroll is settled
+        stable_scrolls: Unchanged scroll heights in a row that mark the page as exhausted
+    """
+
+    def __init__(self, driver, selector, timeout=WAIT_TIMEOUT, quiet_period=QUIET_PERIOD,
+                 stable_scrolls=STABLE_HEIGHT_SCROLLS):
+        self.driver = driver
+        self.selector = selector
+        self.timeout = timeout
+        self.quiet_period = quiet_period
+        self.stable_scrolls = stable_scrolls
+        self.last_height = None
+        self.stable_count = 0
+
+    def install(self):
+        """Attach the observer to the current page; call after every driver.get."""
+        self.driver.set_script_timeout(self.timeout + 5)
+        self.last_height = self.driver.execute_script(INSTALL_OBSERVER_JS, self.selector)
+        self.stable_count = 0
+
+    def scroll_and_wait(self, label=""):
+        """
+        Scroll to the bottom and block until the timeline reacts.
+
+        Returns:
+            dict: reason ("new_cells", "quiet", "timeout"), waited_ms,
+                new_cells and scroll_height
+        """
+        start = time.perf_counter()
+        result = self.driver.execute_async_script(
+            SCROLL_AND_WAIT_JS, int(self.timeout * 1000), int(self.quiet_period * 1000)
+        )
+
+        if result["scroll_height"] == self.last_height and result["new_cells"] == 0:
+            self.stable_count += 1
+        else:
+            self.stable_count = 0
+        self.last_height = result["scroll_height"]
+
+        logging.info(
+            f"{label} scroll wait {result['waited_ms']:.0f} ms "
+            f"(round trip {(time.perf_counter() - start) * 1000:.0f} ms, {result['reason']}), "
+            f"+{result['new_cells']} cells, height {result['scroll_height']}"
+        )
+        return result
+
+    def exhausted(self):
+        """True once the scroll height has stopped changing for stable_scrolls scrolls."""
+        return self.stable_count >= self.stable_scrolls
@@ -0,0 +1,173 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import pyarrow as pa
+
+from processing.cleaner import clean_batches
+from processing.instruments import extract_instruments
+from processing.storage import ParquetStreamWriter, RAW_TWEET_SCHEMA, SCORED_TWEET_SCHEMA
+from analysis.vectorizer import IncrementalTfidf
+from analysis.signal_generator import generate_signals, lexicon_weights
+from analysis.aggregator import WindowedSentiment
+from monitoring.metrics import NullMetrics
+
+# Micro-batches waiting for analysis before scrapers block (backpressure)
+QUEUE_BATCHES = 32
+
+_DONE = object()
+
+
+class StreamingAnalyzer:
+    """
+    Consumer thread that cleans, vectorizes and scores tweets while scraping continues.
+
+    Scrapers hand every per-scroll batch to ``submit`` (e.g. from their
+    ``on_batch`` callback). Batches wait on a bounded queue; once
+    ``max_batches`` are pending, ``submit`` blocks, so a slow consumer slows
+    the scrapers down instead of growing memory. Each batch goes through
+    clean (deduplicated against earlier batches), extract_instruments, the
+    incremental TF-IDF and generate_signals, is added to the sentiment windows and written as
+    one part file of a scored Parquet dataset.
+
+    Args:
+        directory: Dataset directory for the scored tweets (None: no part
+            files, e.g. when ``on_scored`` stores the batches itself)
+        tfidf: IncrementalTfidf to vectorize with (its IDF keeps growing)
+        windows: WindowedSentiment updated with every scored batch
+        max_batches: Queue bound
+        metrics: RunMetrics to record an "analyze" stage per batch
+        on_scored: Called on the consumer thread as on_scored(df, latency)
+            with every scored batch and its seconds since ``submit``
+    """
+
+    def __init__(self, directory, tfidf=None, windows=None, max_batches=QUEUE_BATCHES, metrics=None, on_scored=None):
+        self.tfidf = tfidf if tfidf is not None else IncrementalTfidf()
+        self.windows = windows if windows is not None else WindowedSentiment()
+        self.writer = ParquetStreamWriter(directory, schema=SCORED_TWEET_SCHEMA) if directory else None
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.on_scored = on_scored
+        self.queue = queue.Queue(maxsize=max_batches)
+        self.weights = lexicon_weights(self.tfidf.n_features, self.tfidf)
+        # Held while a batch updates the TF-IDF, so the model can be saved mid-stream
+        self.lock = threading.Lock()
+
+        self.rows_in = 0
+        self.rows_scored = 0
+        self.first_signal_latency = None
+        self.max_latency = 0.0
+        self.error = None
+        # Batches accepted by submit, and batches scored (or dropped whole by clean) and handed to on_scored
+        self.batches_queued = 0
+        self.batches_done = 0
+        self._count_lock = threading.Lock()
+        self._submitted = deque()
+        self._thread = threading.Thread(target=self._run, name="analyzer", daemon=True)
+        self._thread.start()
+
+    @property
+    def directory(self):
+        return self.writer.directory if self.writer else None
+
+    @property
+    def pending(self):
+        """Batches queued and not yet scored."""
+        return self.queue.qsize()
+
+    def save_model(self, path=None):
+        """Save the TF-IDF counts so far without stopping the consumer."""
+        with self.lock:
+            if path is None:
+                self.tfidf.save()
+            else:
+                self.tfidf.save(path)
+
+    def submit(self, tweets):
+        """
+        Queue a batch of tweets (TweetColumns, dicts or a raw-tweet DataFrame); blocks while the queue is full.
+
+        Raises:
+            RuntimeError: if the consumer thread has died
+        """
+        if tweets is None or not len(tweets):
+            return
+        item = (time.perf_counter(), tweets)
+        while True:
+            if self.error is not None:
+                raise RuntimeError(f"Streaming analyzer failed: {self.error}")
+            try:
+                self.queue.put(item, timeout=1)
+                with self._count_lock:
+                    self.batches_queued += 1
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """Wait until every submitted batch is scored and written."""
+        if self._thread.is_alive():
+            self.queue.put(_DONE)
+            self._thread.join()
+        if self.writer:
+            self.writer.close()
+        if self.error is not None:
+            raise RuntimeError(f"Streaming analyzer failed: {self.error}")
+
+    def _batches(self):
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            submitted, tweets = item
+            if isinstance(tweets, list):
+                tweets = pa.Table.from_pylist(tweets, schema=RAW_TWEET_SCHEMA).to_pandas()
+            elif hasattr(tweets, "to_pandas"):
+                tweets = tweets.to_pandas()
+            self.rows_in += len(tweets)
+            # clean_batches yields exactly one frame per input batch, in order
+            self._submitted.append(submitted)
+            yield tweets
+
+    def _run(self):
+        try:
+            for df in clean_batches(self._batches()):
+                submitted = self._submitted.popleft()
+                if df.empty:
+                    self.batches_done += 1
+                    continue
+
+                with self.metrics.stage("analyze", rows_in=len(df)) as stage:
+                    df = extract_instruments(df)
+                    with self.lock:
+                        X = self.tfidf.partial_fit_transform(df["content"])
+                    signals = generate_signals(X, engagement=df, weights=self.weights)
+                    df["buy_signal"] = signals["buy"]
+                    df["sell_signal"] = signals["sell"]
+                    df["confidence"] = signals["confidence"]
+
+                    self.windows.add_batch(df["searched_tag"], df["timestamp"], df["buy_signal"],
+                                           df["sell_signal"], df["confidence"], instruments=df["instrument"])
+                    if self.writer:
+                        self.writer.write_frame(df)
+                    stage.rows_out = len(df)
+                    latency = time.perf_counter() - submitted
+                    stage.extra["latency_seconds"] = latency
+
+                if self.first_signal_latency is None:
+                    self.first_signal_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self.rows_scored += len(df)
+                if self.on_scored is not None:
+                    self.on_scored(df, latency)
+                self.batches_done += 1
+        except Exception as e:
+            logging.exception("Streaming analyzer stopped")
+            self.error = e
+            # Unblock producers waiting on a full queue
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import daemon
+from analysis.vectorizer import IncrementalTfidf
+from processing.storage import read_partitioned
+from scraper.records import TweetColumns
+from streaming import StreamingAnalyzer
+
+TAG = "#nifty"
+
+
+def tweet_batch(ids):
+    return [(str(i), f"nifty {i} ce looks bullish today, adding more on dips near support {i}") for i in ids]
+
+
+def fake_scrape(dm, batches):
+    """Stands in for scrape_parallel: dedups like the scrapers and returns one poll per due tag."""
+    def scrape_parallel(pool, hashtags, max_concurrency=None, delay=0, on_batch=None, tag_kwargs=None):
+        results = []
+        for tag in hashtags:
+            since_id = (tag_kwargs or {}).get(tag, {}).get("since_id")
+            tweets = TweetColumns()
+            for tweet_id, content in batches.pop(0):
+                if since_id and int(tweet_id) <= int(since_id):
+                    continue
+                if dm.dedup.check_and_add(content, owner=tag):
+                    continue
+                tweets.append(tag, "trader", "2026-10-18T09:30:00Z", tweet_id, content, {})
+            tweets.seal()
+            on_batch(tag, tweets, 1)
+            results.append((tag, tweets, None))
+        return results
+    return scrape_parallel
+
+
+def start_daemon(gate=None):
+    dm = daemon.CollectorDaemon(hashtags=[TAG])
+
+    def on_scored(df, latency):
+        if gate is not None and not gate.is_set() and (df["tweet_id"].astype(int) > 200).any():
+            gate.wait()
+        with dm._scored_lock:
+            dm._scored.append(df)
+
+    dm.analyzer = StreamingAnalyzer(None, IncrementalTfidf(), on_scored=on_scored)
+    dm.analyzer.save_model = lambda: None
+    return dm
+
+
+def poll(dm):
+    dm.scheduler.stats.get(TAG, {})["next_due"] = 0.0
+    dm.poll_once()
+
+
+def stored_ids():
+    return set(read_partitioned(daemon.SIGNALS_DATASET, columns=["tweet_id"])["tweet_id"])
+
+
+def test_crash_between_poll_and_flush_keeps_repeated_tweets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first, second = tweet_batch(range(101, 104)), tweet_batch(range(201, 204))
+
+    # Second poll's batch is still being scored when the flush runs, then the process dies
+    gate = threading.Event()
+    dm = start_daemon(gate)
+    monkeypatch.setattr(daemon, "scrape_parallel", fake_scrape(dm, [first, second]))
+    poll(dm)
+    while dm.analyzer.batches_done < 1:
+        time.sleep(0.01)
+    poll(dm)
+    dm.flush()
+    gate.set()
+    assert stored_ids() == {i for i, _ in first}
+
+    # Restart: the saved marks repeat the second poll and its tweets are not dropped as duplicates
+    dm = start_daemon()
+    monkeypatch.setattr(daemon, "scrape_parallel", fake_scrape(dm, [second]))
+    assert dm.polled_marks.query(TAG)["since_id"] == "103"
+    poll(dm)
+    dm.analyzer.close()
+    dm.flush()
+    assert stored_ids() == {i for i, _ in first + second}
+    assert dm.marks.since_id(TAG) == "203"
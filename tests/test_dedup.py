@@ -0,0 +1,22 @@
+from scraper.dedup import DedupIndex
+
+CALL = "Nifty 24300 CE looking strong here, buying for the day with a tight stop"
+
+
+def test_opposite_option_type_is_kept():
+    index = DedupIndex()
+    assert index.check_and_add(CALL) is None
+    assert index.check_and_add(CALL.replace("CE", "PE")) is None
+
+
+def test_opposite_direction_is_kept():
+    index = DedupIndex()
+    assert index.check_and_add("Banknifty will go up today after the RBI policy, watch the open") is None
+    assert index.check_and_add("Banknifty will go down today after the RBI policy, watch the open") is None
+
+
+def test_copy_paste_edit_is_still_near():
+    index = DedupIndex()
+    assert index.check_and_add(CALL) is None
+    assert index.check_and_add(CALL + "!! 🚀") == "exact"
+    assert index.check_and_add(CALL.replace("for the day", "for the day guys")) == "near"
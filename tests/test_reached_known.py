@@ -0,0 +1,33 @@
+from scraper.dedup import DedupIndex
+from scraper.twitter_scraper import TweetScraper
+
+
+class FakeDriver:
+    """Answers the bulk extraction script with fixed tweet records."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def execute_script(self, script, *args):
+        return self.records
+
+
+def record(tweet_id, content):
+    return {"content": content, "username": "trader", "timestamp": "2026-10-18T09:30:00Z",
+            "tweet_id": tweet_id, "labels": []}
+
+
+def test_known_tweet_stops_the_poll_even_when_indexed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    known = "Nifty holding 24300 support, adding longs for an intraday bounce"
+    dedup = DedupIndex()
+    # An earlier run ingested tweet 100, so the persisted index already holds it
+    dedup.check_and_add(known)
+
+    driver = FakeDriver([record("101", "Banknifty 52000 PE bought on the breakdown below vwap"),
+                         record("100", known)])
+    scraper = TweetScraper(driver=driver, dedup=dedup)
+    batch = scraper.scrape_visible_bulk("#nifty", since_id="100")
+
+    assert batch.column("tweet_id").to_pylist() == ["101"]
+    assert batch.reached_known
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from scraper.twitter_scraper import search_query
+
+NOW = datetime(2026, 10, 18, 10, 30)
+
+
+def test_first_poll_includes_today():
+    assert search_query("#nifty", days_back=1, now=NOW) == "#nifty since:2026-10-17 until:2026-10-19"
+
+
+def test_incremental_poll_has_no_date_range():
+    assert search_query("#nifty", since_id="1850000000000000000", now=NOW) == "#nifty since_id:1850000000000000000"
+
+
+def test_gap_poll_is_bounded_by_ids():
+    query = search_query("#bank nifty", since_id="100", max_id="179", now=NOW)
+    assert query == "#banknifty since_id:100 max_id:179"
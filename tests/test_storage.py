@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+import pytest
+
+from processing.storage import append_partitioned, read_partitioned
+
+
+def tweets(ids, **columns):
+    return pd.DataFrame({"tweet_id": [str(i) for i in ids], "content": [f"nifty tweet {i}" for i in ids],
+                         "timestamp": ["2026-10-18T09:30:00Z"] * len(ids), "searched_tag": ["#nifty"] * len(ids),
+                         **columns})
+
+
+def test_columns_added_later_survive_an_older_first_file(tmp_path):
+    # The oldest file predates the instrument columns
+    append_partitioned(tweets([1, 2]), tmp_path, run_id="a-old")
+    append_partitioned(tweets([3], instrument=["NIFTY"], strike=[24300.0], option_type=["CE"]), tmp_path,
+                       run_id="b-new")
+
+    df = read_partitioned(tmp_path).sort_values("tweet_id")
+    assert df["instrument"].astype(object).where(df["instrument"].notna(), None).tolist() == [None, None, "NIFTY"]
+    assert df["option_type"].iloc[-1] == "CE"
+    assert df["strike"].iloc[-1] == 24300.0
+
+
+def test_repeated_append_replaces_the_run(tmp_path):
+    two_days = tweets([1, 2])
+    two_days.loc[1, "timestamp"] = "2026-10-19T09:30:00Z"
+    append_partitioned(two_days, tmp_path, run_id="run")
+    written = append_partitioned(tweets([1]), tmp_path, run_id="run")
+
+    assert len(written) == 1
+    assert read_partitioned(tmp_path)["tweet_id"].tolist() == ["1"]
+
+
+def test_crash_while_moving_files_in_keeps_the_earlier_append(tmp_path, monkeypatch):
+    append_partitioned(tweets([1, 2]), tmp_path, run_id="run")
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        append_partitioned(tweets([1, 2, 3]), tmp_path, run_id="run")
+    monkeypatch.undo()
+
+    assert sorted(read_partitioned(tmp_path)["tweet_id"]) == ["1", "2"]